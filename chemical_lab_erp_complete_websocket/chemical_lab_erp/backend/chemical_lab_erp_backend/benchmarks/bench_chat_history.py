@@ -0,0 +1,77 @@
+"""Seed chat_messages in growing steps and time history fetches at each size.
+
+Usage: python benchmarks/bench_chat_history.py [--steps 100000,1000000,10000000] [--rooms 50]
+Latest-page and deep-page (10 pages back) latencies should stay flat as the
+table grows, because both are index range scans on (room, timestamp, id).
+Runs against the database configured in main.py and removes the rows it created.
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from main import app, db
+from models.chat_message import ChatMessage
+from models.user import User
+from services.chat_service import ChatService
+from utils.snowflake import next_id
+
+ROOM_PREFIX = 'bench-room-'
+
+def seed(count, rooms, user_id, start, batch_size=10000):
+    table = ChatMessage.__table__
+    for offset in range(0, count, batch_size):
+        rows = [{
+            'id': next_id(),
+            'user_id': user_id,
+            'room': f'{ROOM_PREFIX}{i % rooms}',
+            'message': f'benchmark message {i}',
+            'timestamp': start + timedelta(milliseconds=i),
+        } for i in range(offset, min(count, offset + batch_size))]
+        db.session.execute(db.insert(table), rows)
+        db.session.commit()
+
+def time_fetch(room, pages, repeat=50):
+    samples = []
+    for _ in range(repeat):
+        began = time.perf_counter()
+        cursor = None
+        for _ in range(pages):
+            _, cursor = ChatService.get_history(room=room, limit=50, before=cursor)
+        samples.append((time.perf_counter() - began) * 1000)
+        db.session.expunge_all()
+    return statistics.median(samples)
+
+def run(steps, rooms):
+    db.create_all()
+    user = User.query.filter_by(username='bench').first()
+    if user is None:
+        user = User(username='bench', email='bench@lab.com', full_name='Benchmark', password_hash='x')
+        db.session.add(user)
+        db.session.commit()
+    user_id = user.id
+
+    seeded = 0
+    start = datetime(2024, 1, 1)
+    try:
+        print(f"{'rows':>12}  {'latest page ms':>15}  {'10 pages back ms':>17}")
+        for target in steps:
+            seed(target - seeded, rooms, user_id, start + timedelta(milliseconds=seeded))
+            seeded = target
+            room = f'{ROOM_PREFIX}0'
+            print(f"{seeded:12,d}  {time_fetch(room, 1):15.2f}  {time_fetch(room, 10):17.2f}")
+    finally:
+        ChatMessage.query.filter(ChatMessage.room.like(f'{ROOM_PREFIX}%')).delete(synchronize_session=False)
+        db.session.commit()
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--steps', default='100000,1000000,10000000')
+    parser.add_argument('--rooms', type=int, default=50)
+    args = parser.parse_args()
+    with app.app_context():
+        run([int(step) for step in args.steps.split(',')], args.rooms)
@@ -0,0 +1,103 @@
+"""Per-call logging overhead: the old synchronous DEBUG StreamHandler vs the queue pipeline.
+
+Usage: python benchmarks/bench_logging.py [--calls 50000] [--sink-latency-us 50]
+
+Times the calling thread only, which is what a request or Socket.IO handler
+pays; for the queue pipeline the time until the listener has drained the
+backlog is reported separately. Every case runs twice: against a plain file,
+and against a sink whose writes take --sink-latency-us, like stdout piped to a
+busy log collector. The output file is removed afterwards.
+"""
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from utils.logger import configure_logging, sampled, stop_logging
+
+class SlowStream:
+    def __init__(self, stream, latency):
+        self.stream = stream
+        self.latency = latency
+
+    def write(self, data):
+        time.sleep(self.latency)
+        return self.stream.write(data)
+
+    def flush(self):
+        self.stream.flush()
+
+def timed(calls, fn):
+    start = time.perf_counter()
+    for i in range(calls):
+        fn(i)
+    return (time.perf_counter() - start) / calls * 1e9
+
+def reset(log):
+    root = logging.getLogger()
+    for logger in (log, root):
+        for handler in list(logger.handlers):
+            logger.removeHandler(handler)
+    log.setLevel(logging.NOTSET)
+    log.propagate = True
+
+def run_cases(log, stream, calls):
+    room, username = 'lab-1', 'alice'
+    results = []
+
+    # What setup_logger() used to do on every module logger
+    reset(log)
+    log.setLevel(logging.DEBUG)
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+    log.addHandler(handler)
+    log.propagate = False
+    results.append(('sync StreamHandler, f-string', timed(calls, lambda i: log.info(f"{username} joined room {room} #{i}")), None))
+
+    reset(log)
+    configure_logging('INFO', 'json', stream=stream)
+    start = time.perf_counter()
+    caller = timed(calls, lambda i: log.info("%s joined room %s #%d", username, room, i))
+    stop_logging()
+    results.append(('queue + JSON', caller, time.perf_counter() - start))
+
+    def sampled_call(i):
+        if sampled('chat.room'):
+            log.info("%s joined room %s #%d", username, room, i, extra={'sample': 'chat.room'})
+
+    reset(log)
+    configure_logging('INFO', 'json', sample_rates={'chat.room': 0.1}, stream=stream)
+    start = time.perf_counter()
+    caller = timed(calls, sampled_call)
+    stop_logging()
+    results.append(('queue + JSON, sampled 10%', caller, time.perf_counter() - start))
+
+    reset(log)
+    configure_logging('WARNING', 'json', stream=stream)
+    results.append(('below level, f-string', timed(calls, lambda i: log.debug(f"{username} joined room {room} #{i}")), None))
+    results.append(('below level, %-args', timed(calls, lambda i: log.debug("%s joined room %s #%d", username, room, i)), None))
+    stop_logging()
+    reset(log)
+    return results
+
+def run(args):
+    log = logging.getLogger('bench')
+    print(f"{args.calls} calls per case")
+    with open(args.output, 'w') as stream:
+        for sink, target in (('file', stream), (f'{args.sink_latency_us:g} us/write', SlowStream(stream, args.sink_latency_us / 1e6))):
+            print(f"\nsink: {sink}")
+            print(f"{'case':<32} {'ns/call (caller)':>17} {'total incl. drain':>18}")
+            for name, ns, total in run_cases(log, target, args.calls):
+                print(f"{name:<32} {ns:>17.0f} {(f'{total:.2f}s' if total is not None else '-'):>18}")
+    os.unlink(args.output)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--calls', type=int, default=50000)
+    parser.add_argument('--sink-latency-us', type=float, default=50)
+    parser.add_argument('--output', default=os.path.join(tempfile.gettempdir(), 'bench_logging.log'))
+    run(parser.parse_args())
@@ -0,0 +1,113 @@
+"""Login storm: hashing inline on request threads vs the bounded hashing pool.
+
+Usage: python benchmarks/bench_login.py [--threads 64] [--logins 10] [--rounds 12] [--workers 4] [--max-queue 16]
+Fires concurrent POST /api/auth/login requests through the Flask test client
+while a probe thread keeps calling a cheap endpoint, and reports login
+throughput, 503s shed and the probe's latency for both modes. Runs against the
+database configured in main.py and removes the users it created.
+"""
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from main import app, db, rate_limiter
+from models.user import User
+from utils.passwords import password_hasher
+
+PASSWORD = 'bench-password'
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+def run(mode, args, usernames):
+    if mode == 'inline':
+        # What authenticate() did before: hash on whichever thread handles the request
+        password_hasher._submit = lambda fn, *a: fn(*a)
+    else:
+        password_hasher.__dict__.pop('_submit', None)
+        password_hasher.workers = args.workers
+        password_hasher.max_queue = args.max_queue
+        password_hasher.slots = threading.BoundedSemaphore(args.workers + args.max_queue)
+        password_hasher.shutdown()
+
+    statuses = {}
+    login_latencies = []
+    probe_latencies = []
+    lock = threading.Lock()
+    done = threading.Event()
+
+    def login_worker(username):
+        client = app.test_client()
+        for _ in range(args.logins):
+            start = time.perf_counter()
+            response = client.post('/api/auth/login', json={'username': username, 'password': PASSWORD})
+            elapsed = (time.perf_counter() - start) * 1000
+            with lock:
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+                if response.status_code == 200:
+                    login_latencies.append(elapsed)
+
+    def probe():
+        client = app.test_client()
+        while not done.is_set():
+            start = time.perf_counter()
+            client.get('/api/cache/stats')
+            probe_latencies.append((time.perf_counter() - start) * 1000)
+            time.sleep(0.005)
+
+    prober = threading.Thread(target=probe)
+    prober.start()
+    workers = [threading.Thread(target=login_worker, args=(usernames[i % len(usernames)],)) for i in range(args.threads)]
+    start = time.perf_counter()
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    elapsed = time.perf_counter() - start
+    done.set()
+    prober.join()
+
+    ok = statuses.get(200, 0)
+    print(f"{mode:>6}: {ok / elapsed:7.1f} logins/s  statuses={dict(sorted(statuses.items()))}")
+    if login_latencies:
+        print(f"        login ms  p50={statistics.median(login_latencies):.0f}  p95={percentile(login_latencies, 95):.0f}")
+    if probe_latencies:
+        print(f"        probe ms  p50={statistics.median(probe_latencies):.1f}  p95={percentile(probe_latencies, 95):.1f}  "
+              f"max={max(probe_latencies):.1f}")
+
+def main(args):
+    rate_limiter.calls = 10 ** 9
+    password_hasher.rounds = args.rounds
+    with app.app_context():
+        db.create_all()
+        users = []
+        for i in range(args.users):
+            user = User(username=f'bench_login_{i}', email=f'bench_login_{i}@example.com', full_name='Bench', role='Visiteur')
+            user.set_password(PASSWORD)
+            users.append(user)
+        db.session.add_all(users)
+        db.session.commit()
+        usernames = [u.username for u in users]
+        try:
+            print(f"threads={args.threads} logins/thread={args.logins} bcrypt rounds={args.rounds}")
+            for mode in ('inline', 'pool'):
+                run(mode, args, usernames)
+        finally:
+            User.query.filter(User.username.like('bench_login_%')).delete(synchronize_session=False)
+            db.session.commit()
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--threads', type=int, default=64)
+    parser.add_argument('--logins', type=int, default=10, help='logins per thread')
+    parser.add_argument('--users', type=int, default=16)
+    parser.add_argument('--rounds', type=int, default=12)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 2)
+    parser.add_argument('--max-queue', type=int, default=16)
+    main(parser.parse_args())
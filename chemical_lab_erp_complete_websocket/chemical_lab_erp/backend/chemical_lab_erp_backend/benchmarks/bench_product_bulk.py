@@ -0,0 +1,72 @@
+"""Compare product import throughput: one create_product() per row vs bulk_upsert_products().
+
+Usage: python benchmarks/bench_product_bulk.py [--rows 5000] [--batch-size 1000]
+Runs against the database configured in main.py and removes the rows it created.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from main import app, db
+from models.product import Product
+from models.supplier import Supplier
+from services.product_service import ProductService
+
+def make_rows(prefix, count, supplier_id):
+    return [{
+        'name': f'Bench reagent {i}',
+        'reference': f'{prefix}-{i:07d}',
+        'cas_number': f'{1000 + i}-00-0',
+        'formula': 'C2H6O',
+        'category': 'Solvants',
+        'supplier_id': supplier_id,
+        'unit_price': 10.0 + i % 50,
+        'stock_quantity': float(i % 100),
+        'min_stock_level': 5.0,
+    } for i in range(count)]
+
+def cleanup(prefix):
+    Product.query.filter(Product.reference.like(f'{prefix}-%')).delete(synchronize_session=False)
+    db.session.commit()
+
+def run(rows, batch_size):
+    db.create_all()
+    supplier = Supplier.query.filter_by(code='BENCH').first()
+    if supplier is None:
+        supplier = Supplier(name='Benchmark Supplier', code='BENCH')
+        db.session.add(supplier)
+        db.session.commit()
+
+    results = {}
+    try:
+        single = make_rows('BENCH-SINGLE', rows, supplier.id)
+        start = time.perf_counter()
+        for row in single:
+            ProductService.create_product(**row)
+        results['create_product (per row)'] = time.perf_counter() - start
+
+        bulk = make_rows('BENCH-BULK', rows, supplier.id)
+        start = time.perf_counter()
+        ProductService.bulk_upsert_products(bulk, batch_size=batch_size)
+        results['bulk_upsert_products (insert)'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        ProductService.bulk_upsert_products(bulk, batch_size=batch_size)
+        results['bulk_upsert_products (update)'] = time.perf_counter() - start
+    finally:
+        cleanup('BENCH-SINGLE')
+        cleanup('BENCH-BULK')
+
+    for label, elapsed in results.items():
+        print(f"{label:32s} {rows / elapsed:12,.0f} rows/s  ({elapsed:.2f}s)")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=5000)
+    parser.add_argument('--batch-size', type=int, default=1000)
+    args = parser.parse_args()
+    with app.app_context():
+        run(args.rows, args.batch_size)
@@ -0,0 +1,104 @@
+"""List endpoints: ORM instances + to_dict() vs plain column rows serialized directly.
+
+Usage: python benchmarks/bench_row_mode.py [--rows 100000] [--repeat 3]
+Seeds --rows products and orders into the database configured in main.py
+(reusing them if already there), then reports wall time and peak Python
+memory (tracemalloc) for get_all_products/get_all_orders/get_all_suppliers in
+both modes, scaled to 100k rows. Seeded rows are removed afterwards.
+"""
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from main import app, db
+from models.order import Order
+from models.product import Product
+from models.supplier import Supplier
+from models.user import User
+from services.order_service import OrderService
+from services.product_service import ProductService
+from services.supplier_service import SupplierService
+
+PREFIX = 'BENCH-ROWS-'
+
+def seed(rows):
+    supplier = Supplier(name='Bench rows supplier', code=f'{PREFIX}SUP')
+    user = User(username='bench_rows', email='bench_rows@example.com', full_name='Bench', password_hash='x')
+    db.session.add_all([supplier, user])
+    db.session.flush()
+    products = Product.__table__
+    db.session.execute(products.insert(), [
+        {'name': f'Reagent {i}', 'reference': f'{PREFIX}{i}', 'cas_number': '67-64-1', 'formula': 'C3H6O',
+         'molecular_weight': 58.08, 'category': 'Solvents', 'supplier_id': supplier.id, 'unit_price': 12.5,
+         'stock_quantity': float(i % 300), 'min_stock_level': 10.0, 'storage_conditions': 'Cool, dry place',
+         'safety_info': 'Flammable'}
+        for i in range(rows)
+    ])
+    product_ids = db.session.scalars(db.select(products.c.id).where(products.c.reference.like(f'{PREFIX}%'))).all()
+    db.session.execute(Order.__table__.insert(), [
+        {'user_id': user.id, 'product_id': product_id, 'quantity': 1, 'status': 'pending'} for product_id in product_ids
+    ])
+    db.session.execute(Supplier.__table__.insert(), [
+        {'name': f'Supplier {i}', 'code': f'{PREFIX}S{i}'} for i in range(rows // 10)
+    ])
+    db.session.commit()
+
+def cleanup():
+    user_ids = db.session.scalars(db.select(User.id).where(User.username == 'bench_rows')).all()
+    db.session.execute(Order.__table__.delete().where(Order.__table__.c.user_id.in_(user_ids)))
+    db.session.execute(Product.__table__.delete().where(Product.__table__.c.reference.like(f'{PREFIX}%')))
+    db.session.execute(Supplier.__table__.delete().where(Supplier.__table__.c.code.like(f'{PREFIX}%')))
+    db.session.execute(User.__table__.delete().where(User.__table__.c.id.in_(user_ids)))
+    db.session.commit()
+
+def measure(fn, repeat):
+    """Best wall time over `repeat` runs, then one more run under tracemalloc for the peak (it slows things down)."""
+    best = None
+    for _ in range(repeat):
+        db.session.expunge_all()
+        gc.collect()
+        start = time.perf_counter()
+        count = len(fn())
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    db.session.expunge_all()
+    gc.collect()
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    db.session.expunge_all()
+    return best, peak, count
+
+def report(label, orm, rows):
+    orm_time, orm_peak, count = measure(orm, args.repeat)
+    row_time, row_peak, _ = measure(rows, args.repeat)
+    scale = 100000 / count
+    print(f"{label:<22} ORM {orm_time * scale:6.2f} s {orm_peak * scale / 2 ** 20:7.1f} MiB   "
+          f"rows {row_time * scale:6.2f} s {row_peak * scale / 2 ** 20:7.1f} MiB   (per 100k, n={count})")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    with app.app_context():
+        db.create_all()
+        seed(args.rows)
+        try:
+            report('products', lambda: [p.to_dict() for p in ProductService.get_all_products()],
+                   lambda: ProductService.get_all_products(as_rows=True))
+            report('orders', lambda: [o.to_dict() for o in OrderService.get_all_orders()],
+                   lambda: OrderService.get_all_orders(as_rows=True))
+            report('orders?expand=product',
+                   lambda: [o.to_dict(('product',)) for o in OrderService.get_all_orders(expand=('product',))],
+                   lambda: OrderService.get_all_orders(expand=('product',), as_rows=True))
+            report('suppliers', lambda: [s.to_dict() for s in SupplierService.get_all_suppliers()],
+                   lambda: SupplierService.get_all_suppliers(as_rows=True))
+        finally:
+            cleanup()
@@ -0,0 +1,83 @@
+"""Serialization micro-benchmark: hand-written to_dict() + Flask's default JSON vs generated serializers + orjson.
+
+Usage: python benchmarks/bench_serialization.py [--rows 100000] [--repeat 3]
+Builds transient Product and Order instances in memory (no database) and
+reports rows/sec for turning a list of them into a JSON response body.
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from flask.json.provider import DefaultJSONProvider
+from main import app
+from models.order import Order
+from models.product import Product
+from utils import serialization
+
+def legacy_product_dict(p):
+    # to_dict() as it was written by hand before the serializers were generated
+    return {
+        'id': p.id, 'name': p.name, 'reference': p.reference, 'cas_number': p.cas_number,
+        'formula': p.formula, 'molecular_weight': p.molecular_weight, 'category': p.category,
+        'supplier_id': p.supplier_id, 'unit_price': p.unit_price, 'stock_quantity': p.stock_quantity,
+        'min_stock_level': p.min_stock_level, 'storage_conditions': p.storage_conditions,
+        'safety_info': p.safety_info,
+        'created_at': p.created_at.isoformat() if p.created_at else None,
+        'updated_at': p.updated_at.isoformat() if p.updated_at else None,
+    }
+
+def legacy_order_dict(o):
+    return {
+        'id': o.id, 'user_id': o.user_id, 'product_id': o.product_id, 'quantity': o.quantity,
+        'order_date': o.order_date.isoformat() if o.order_date else None, 'status': o.status,
+        'created_at': o.created_at.isoformat() if o.created_at else None,
+        'updated_at': o.updated_at.isoformat() if o.updated_at else None,
+    }
+
+def build(rows):
+    now = datetime(2024, 1, 1)
+    products = [Product(id=i, name=f'Reagent {i}', reference=f'REF-{i}', cas_number='67-64-1', formula='C3H6O',
+                        molecular_weight=58.08, category='Solvents', supplier_id=i % 50, unit_price=12.5,
+                        stock_quantity=float(i % 300), min_stock_level=10.0, storage_conditions='Cool, dry place',
+                        safety_info='Flammable', created_at=now, updated_at=now + timedelta(seconds=i))
+                for i in range(rows)]
+    orders = [Order(id=i, user_id=i % 20, product_id=i, quantity=3, order_date=now, status='pending',
+                    created_at=now, updated_at=now) for i in range(rows)]
+    return products, orders
+
+def measure(label, rows, fn, repeat):
+    best = min(timed(fn) for _ in range(repeat))
+    print(f"  {label:<40} {rows / best:>12,.0f} rows/s  ({best * 1000:.0f} ms)")
+
+def timed(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+def main(args):
+    products, orders = build(args.rows)
+    default_provider = DefaultJSONProvider(app)
+    fast_provider = serialization.FastJSONProvider(app)
+    backend = 'orjson' if serialization.orjson is not None else 'stdlib json (orjson not installed)'
+    print(f"rows={args.rows} fast provider backend: {backend}")
+    for name, items, legacy in (('Product', products, legacy_product_dict), ('Order', orders, legacy_order_dict)):
+        print(name)
+        with app.app_context():
+            measure('to_dict (hand-written) + default json', len(items),
+                    lambda: default_provider.dumps([legacy(x) for x in items]), args.repeat)
+            measure('to_dict (generated) + default json', len(items),
+                    lambda: default_provider.dumps([x.to_dict() for x in items]), args.repeat)
+            measure('to_dict (generated) + fast provider', len(items),
+                    lambda: serialization.dumps_bytes([x.to_dict() for x in items]), args.repeat)
+            measure('  of which encoding only', len(items),
+                    lambda dicts=[x.to_dict() for x in items]: fast_provider.dumps(dicts), args.repeat)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=3)
+    main(parser.parse_args())
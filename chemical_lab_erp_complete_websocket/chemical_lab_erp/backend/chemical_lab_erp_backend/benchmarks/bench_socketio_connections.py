@@ -0,0 +1,203 @@
+"""Concurrent connections per worker: threading vs gevent Socket.IO servers.
+
+Usage:
+    python benchmarks/bench_socketio_connections.py --modes threading,gevent --connections 2000
+
+For each async mode, starts one worker through src/serve.py, opens raw
+Socket.IO websocket connections to it in batches and keeps them all open. It
+then reports the server's resident memory and OS thread count, and the round
+trip of `heartbeat` acks from a probe socket while every connection is held.
+Modes whose package is not installed are skipped. Each worker uses a throwaway
+SQLite database unless DATABASE_URL is set.
+"""
+import argparse
+import importlib.util
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import simple_websocket
+
+SRC = os.path.abspath(os.path.join(os.path.dirname(__file__), '../src'))
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+def process_status(pid):
+    status = {}
+    with open(f'/proc/{pid}/status') as f:
+        for line in f:
+            key, _, value = line.partition(':')
+            status[key] = value.strip()
+    return int(status['VmRSS'].split()[0]) / 1024.0, int(status['Threads'])
+
+class Connection:
+    """A bare Engine.IO v4 websocket that joins the default Socket.IO namespace."""
+
+    def __init__(self, url):
+        self.ws = simple_websocket.Client(url)
+        open_packet = self.ws.receive(timeout=10)
+        if not open_packet or open_packet[0] != '0':
+            raise RuntimeError(f"Unexpected open packet: {open_packet!r}")
+        self.ws.send('40')
+        while True:
+            packet = self.ws.receive(timeout=10)
+            if packet is None:
+                raise RuntimeError("No namespace connect reply")
+            if packet.startswith('40'):
+                break
+        self.acks = 0
+
+    def pump(self):
+        """Answer server pings; returns the packets that were not pings."""
+        packets = []
+        while True:
+            packet = self.ws.receive(timeout=0)
+            if packet is None:
+                return packets
+            if packet == '2':
+                self.ws.send('3')
+            else:
+                packets.append(packet)
+
+    def heartbeat(self):
+        self.acks += 1
+        ack_id = self.acks
+        start = time.perf_counter()
+        self.ws.send(f'42{ack_id}["heartbeat",{{}}]')
+        while True:
+            packet = self.ws.receive(timeout=30)
+            if packet is None:
+                raise RuntimeError("Heartbeat ack timed out")
+            if packet == '2':
+                self.ws.send('3')
+            elif packet.startswith(f'43{ack_id}'):
+                return (time.perf_counter() - start) * 1000
+
+    def close(self):
+        try:
+            self.ws.close()
+        except Exception:
+            pass
+
+def wait_for_server(url, process, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Worker exited with status {process.returncode}")
+        try:
+            return Connection(url)
+        except Exception:
+            time.sleep(0.25)
+    raise RuntimeError("Worker did not start")
+
+def run_mode(mode, args):
+    env = dict(os.environ, SOCKETIO_ASYNC_MODE=mode, PORT=str(args.port))
+    database = None
+    if 'DATABASE_URL' not in env:
+        database = tempfile.NamedTemporaryFile(suffix='.db', delete=False)
+        env['DATABASE_URL'] = f'sqlite:///{database.name}'
+    server = subprocess.Popen([sys.executable, 'serve.py', '--host', '127.0.0.1'], cwd=SRC, env=env,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url = f'ws://127.0.0.1:{args.port}/socket.io/?EIO=4&transport=websocket'
+    connections = []
+    stop = threading.Event()
+    try:
+        probe = wait_for_server(url, server)
+        idle_rss, idle_threads = process_status(server.pid)
+
+        def pump_all():
+            # Opening thousands of sockets can outlast the server's ping interval
+            while not stop.is_set():
+                for connection in [probe] + connections:
+                    try:
+                        connection.pump()
+                    except Exception:
+                        pass
+                stop.wait(1)
+
+        pumper = threading.Thread(target=pump_all, daemon=True)
+        pumper.start()
+
+        start = time.perf_counter()
+        failed = 0
+        while len(connections) + failed < args.connections:
+            batch = min(args.batch, args.connections - len(connections) - failed)
+            results = [None] * batch
+
+            def open_one(i):
+                try:
+                    results[i] = Connection(url)
+                except Exception:
+                    pass
+
+            openers = [threading.Thread(target=open_one, args=(i,)) for i in range(batch)]
+            for opener in openers:
+                opener.start()
+            for opener in openers:
+                opener.join()
+            opened = [connection for connection in results if connection is not None]
+            failed += batch - len(opened)
+            connections.extend(opened)
+        connect_seconds = time.perf_counter() - start
+        stop.set()
+        pumper.join()
+
+        time.sleep(args.settle)
+        rss, threads = process_status(server.pid)
+        latencies = [probe.heartbeat() for _ in range(args.probes)]
+        return {
+            'mode': mode,
+            'held': len(connections),
+            'failed': failed,
+            'connect_s': connect_seconds,
+            'rss_mb': rss,
+            'kb_per_conn': (rss - idle_rss) * 1024 / max(1, len(connections)),
+            'threads': threads,
+            'idle_threads': idle_threads,
+            'ack_p50': statistics.median(latencies),
+            'ack_p95': percentile(latencies, 95),
+        }
+    finally:
+        stop.set()
+        for connection in connections:
+            connection.close()
+        server.terminate()
+        server.wait()
+        if database is not None:
+            os.unlink(database.name)
+
+def main(args):
+    # Every socket needs a descriptor on both ends
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+    results = []
+    for mode in args.modes.split(','):
+        if mode != 'threading' and importlib.util.find_spec(mode) is None:
+            print(f"{mode}: not installed, skipped")
+            continue
+        results.append(run_mode(mode, args))
+        print(json.dumps(results[-1]))
+        args.port += 1
+    print(f"{'mode':<10} {'held':>6} {'failed':>6} {'conn s':>7} {'RSS MB':>7} {'KB/conn':>8} {'threads':>8} "
+          f"{'ack p50':>8} {'ack p95':>8}")
+    for r in results:
+        print(f"{r['mode']:<10} {r['held']:>6} {r['failed']:>6} {r['connect_s']:>7.1f} {r['rss_mb']:>7.1f} "
+              f"{r['kb_per_conn']:>8.1f} {r['threads']:>8} {r['ack_p50']:>7.1f}ms {r['ack_p95']:>7.1f}ms")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--modes', default='threading,gevent')
+    parser.add_argument('--connections', type=int, default=1000)
+    parser.add_argument('--batch', type=int, default=50, help='connections opened concurrently')
+    parser.add_argument('--probes', type=int, default=50, help='heartbeat round trips to time')
+    parser.add_argument('--settle', type=float, default=2.0, help='seconds to wait before measuring')
+    parser.add_argument('--port', type=int, default=5200)
+    main(parser.parse_args())
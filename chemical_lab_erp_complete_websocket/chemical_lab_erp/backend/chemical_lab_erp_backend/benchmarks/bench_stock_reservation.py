@@ -0,0 +1,92 @@
+"""N threads ordering the same reagent at once: atomic reservation vs client-side read-modify-write.
+
+Usage: python benchmarks/bench_stock_reservation.py [--threads 16] [--orders 50] [--stock 400]
+Runs against the database configured in main.py and removes the rows it created.
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from main import app, db
+from models.order import Order
+from models.product import Product
+from models.supplier import Supplier
+from models.user import User
+from services.order_service import OrderService, InsufficientStockError
+
+def naive_order(user_id, product_id):
+    # What clients do today: read the stock, decide, write it back
+    product = db.session.get(Product, product_id)
+    if product.stock_quantity < 1:
+        raise InsufficientStockError(product_id, 1)
+    product.stock_quantity = product.stock_quantity - 1
+    db.session.add(Order(user_id=user_id, product_id=product_id, quantity=1))
+    db.session.commit()
+
+def reserved_order(user_id, product_id):
+    OrderService.create_order(user_id=user_id, product_id=product_id, quantity=1)
+
+def run(mode, threads, orders, stock, user_id, supplier_id):
+    product = Product(name='Benchmark reagent', reference=f'BENCH-RESERVE-{mode}', supplier_id=supplier_id,
+                      stock_quantity=stock)
+    db.session.add(product)
+    db.session.commit()
+    product_id = product.id
+    place = naive_order if mode == 'naive' else reserved_order
+    counts = {'ok': 0, 'rejected': 0, 'errors': 0}
+    lock = threading.Lock()
+
+    def worker():
+        with app.app_context():
+            for _ in range(orders):
+                try:
+                    place(user_id, product_id)
+                    outcome = 'ok'
+                except InsufficientStockError:
+                    db.session.rollback()
+                    outcome = 'rejected'
+                except Exception:
+                    db.session.rollback()
+                    outcome = 'errors'
+                with lock:
+                    counts[outcome] += 1
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    start = time.perf_counter()
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    db.session.expire_all()
+    final = db.session.get(Product, product_id).stock_quantity
+    placed = Order.query.filter_by(product_id=product_id).count()
+    oversold = placed - (stock - final)
+    print(f"{mode:9s} {threads * orders / elapsed:9,.0f} orders/s  accepted={counts['ok']} "
+          f"rejected={counts['rejected']} errors={counts['errors']} final_stock={final:g} "
+          f"lost_updates={oversold:g}")
+
+    Order.query.filter_by(product_id=product_id).delete()
+    db.session.delete(db.session.get(Product, product_id))
+    db.session.commit()
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--orders', type=int, default=50)
+    parser.add_argument('--stock', type=int, default=400)
+    args = parser.parse_args()
+    with app.app_context():
+        db.create_all()
+        supplier = Supplier.query.filter_by(code='BENCH').first() or Supplier(name='Benchmark Supplier', code='BENCH')
+        user = User.query.filter_by(username='bench').first() or User(
+            username='bench', email='bench@lab.com', full_name='Benchmark', password_hash='x')
+        db.session.add_all([supplier, user])
+        db.session.commit()
+        for mode in ('naive', 'reserved'):
+            run(mode, args.threads, args.orders, args.stock, user.id, supplier.id)
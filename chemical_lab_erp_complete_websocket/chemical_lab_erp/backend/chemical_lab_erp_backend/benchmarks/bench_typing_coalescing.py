@@ -0,0 +1,65 @@
+"""Typing indicator traffic: one broadcast per keystroke vs periodic per-room snapshots.
+
+Usage: python benchmarks/bench_typing_coalescing.py [--users 200] [--seconds 60] [--interval-ms 500]
+Simulates a busy room on a virtual clock: users type in bursts at a few
+keystrokes per second, each keystroke sending user_typing, with a stop event
+at the end of every burst. Reports emitted events and per-client deliveries
+per second for both strategies.
+"""
+import argparse
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from utils.typing_tracker import TypingTracker
+
+def keystroke_events(users, seconds, typing_share, keys_per_second, rng):
+    events = []
+    for user in range(users):
+        t = rng.uniform(0, 10)
+        while t < seconds:
+            burst = rng.uniform(2, 8)
+            if rng.random() < typing_share:
+                keys = int(burst * keys_per_second)
+                for k in range(keys):
+                    events.append((t + k / keys_per_second, f'user{user}', True))
+                events.append((t + burst, f'user{user}', False))
+            t += burst + rng.uniform(5, 30)
+    events.sort()
+    return events
+
+def run(args):
+    rng = random.Random(42)
+    events = keystroke_events(args.users, args.seconds, args.typing_share, args.keys_per_second, rng)
+
+    before = len(events)
+
+    tracker = TypingTracker(ttl=args.ttl)
+    interval = args.interval_ms / 1000.0
+    after = 0
+    tick = interval
+    for at, user, is_typing in events:
+        while tick <= at:
+            after += len(tracker.collect(tick))
+            tick += interval
+        tracker.update('general', user, is_typing, at)
+    while tick <= args.seconds + args.ttl:
+        after += len(tracker.collect(tick))
+        tick += interval
+
+    print(f"users={args.users} seconds={args.seconds} keystroke events={before}")
+    for label, emitted in (('per-keystroke broadcast', before), ('coalesced snapshots', after)):
+        print(f"{label:24s} {emitted / args.seconds:9.1f} events/s  {emitted * args.users / args.seconds:11.1f} deliveries/s")
+    print(f"reduction: {before / max(after, 1):.1f}x")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--seconds', type=int, default=60)
+    parser.add_argument('--interval-ms', type=int, default=500)
+    parser.add_argument('--ttl', type=float, default=5.0)
+    parser.add_argument('--typing-share', type=float, default=0.5)
+    parser.add_argument('--keys-per-second', type=float, default=5.0)
+    run(parser.parse_args())
@@ -0,0 +1,109 @@
+"""Fan-out load test: N Socket.IO clients spread over M worker processes sharing one message queue.
+
+Usage:
+    python benchmarks/load_socketio_fanout.py --workers 4 --clients 200 --messages 100 \\
+        --message-queue redis://localhost:6379/1
+
+Starts M copies of the app on consecutive ports (all pointed at --message-queue),
+connects the clients round-robin, has them join one room, then sends messages
+from a single client and measures send-to-receive latency on every client.
+Needs a reachable queue plus `pip install "python-socketio[client]"`.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+import socketio
+
+SRC = os.path.abspath(os.path.join(os.path.dirname(__file__), '../src'))
+WORKER = "from main import app, socketio; socketio.run(app, host='127.0.0.1', port={port}, allow_unsafe_werkzeug=True)"
+ROOM = 'loadtest'
+
+def start_workers(count, base_port, message_queue):
+    env = dict(os.environ, SOCKETIO_MESSAGE_QUEUE=message_queue, RATELIMIT_BACKEND='memory')
+    workers = []
+    for i in range(count):
+        workers.append(subprocess.Popen(
+            [sys.executable, '-c', WORKER.format(port=base_port + i)],
+            cwd=SRC, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        ))
+    return workers
+
+def connect(url, latencies, lock, retries=50):
+    client = socketio.Client()
+
+    @client.on('receive_message')
+    def on_message(data):
+        received = time.time()
+        try:
+            sent = json.loads(data['message'])['sent']
+        except (KeyError, TypeError, ValueError):
+            return
+        with lock:
+            latencies.append((received - sent) * 1000)
+
+    for _ in range(retries):
+        try:
+            client.connect(url, transports=['websocket'])
+            break
+        except socketio.exceptions.ConnectionError:
+            time.sleep(0.2)
+    else:
+        raise RuntimeError(f"Could not connect to {url}")
+    client.emit('join_room', {'room': ROOM, 'username': f'load-{id(client)}'})
+    return client
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+def run(args):
+    workers = start_workers(args.workers, args.port, args.message_queue)
+    clients = []
+    latencies = []
+    lock = threading.Lock()
+    try:
+        for i in range(args.clients):
+            clients.append(connect(f'http://127.0.0.1:{args.port + i % args.workers}', latencies, lock))
+        time.sleep(1)
+
+        sender = clients[0]
+        for seq in range(args.messages):
+            sender.emit('send_message', {
+                'user_id': args.user_id,
+                'room': ROOM,
+                'message': json.dumps({'sent': time.time(), 'seq': seq}),
+            })
+            time.sleep(args.interval)
+        time.sleep(args.drain)
+
+        expected = args.messages * args.clients
+        print(f"workers={args.workers} clients={args.clients} messages={args.messages}")
+        print(f"delivered {len(latencies)}/{expected} ({100.0 * len(latencies) / expected:.1f}%)")
+        if latencies:
+            print(f"latency ms  p50={statistics.median(latencies):.1f}  p95={percentile(latencies, 95):.1f}  "
+                  f"p99={percentile(latencies, 99):.1f}  max={max(latencies):.1f}")
+    finally:
+        for client in clients:
+            client.disconnect()
+        for worker in workers:
+            worker.terminate()
+        for worker in workers:
+            worker.wait()
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--clients', type=int, default=200)
+    parser.add_argument('--messages', type=int, default=100)
+    parser.add_argument('--interval', type=float, default=0.01, help='seconds between sends')
+    parser.add_argument('--drain', type=float, default=3.0, help='seconds to wait for stragglers')
+    parser.add_argument('--port', type=int, default=5100)
+    parser.add_argument('--user-id', type=int, default=1)
+    parser.add_argument('--message-queue', default='redis://localhost:6379/1')
+    run(parser.parse_args())
@@ -1,10 +1,18 @@
 from datetime import datetime
 from main import db
+from utils.serialization import model_serializer
+from utils.snowflake import next_id
 
 class ChatMessage(db.Model):
     __tablename__ = 'chat_messages'
+    __table_args__ = (
+        # Serves "latest N in a room" and backwards paging without a sort
+        db.Index('ix_chat_messages_room_timestamp_id', 'room', 'timestamp', 'id'),
+    )
 
-    id = db.Column(db.Integer, primary_key=True)
+    # Snowflake ids are assigned before the row is written, so a message can be broadcast first
+    id = db.Column(db.BigInteger().with_variant(db.Integer, 'sqlite'), primary_key=True,
+                   autoincrement=False, default=next_id)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     room = db.Column(db.String(100), default='general')
     message = db.Column(db.Text, nullable=False)
@@ -16,10 +24,7 @@ class ChatMessage(db.Model):
         return f"<ChatMessage {self.id} - User {self.user_id} - Room {self.room}>"
 
     def to_dict(self):
-        return {
-            'id': self.id,
-            'user_id': self.user_id,
-            'room': self.room,
-            'message': self.message,
-            'timestamp': self.timestamp.isoformat() if self.timestamp else None,
-        }
+        return _serialize(self)
+
+# Column-driven to_dict(), generated once at import
+_serialize = model_serializer(ChatMessage)
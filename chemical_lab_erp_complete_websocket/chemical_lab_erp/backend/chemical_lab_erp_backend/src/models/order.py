@@ -1,8 +1,13 @@
 from datetime import datetime
 from main import db
+from utils.serialization import model_serializer
 
 class Order(db.Model):
     __tablename__ = 'orders'
+    __table_args__ = (
+        # Serves max(updated_at) for collection ETags and changed-since scans
+        db.Index('ix_orders_updated_at_id', 'updated_at', 'id'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -19,14 +24,13 @@ class Order(db.Model):
     def __repr__(self):
         return f"<Order {self.id} - User {self.user_id} - Product {self.product_id}>"
 
-    def to_dict(self):
-        return {
-            'id': self.id,
-            'user_id': self.user_id,
-            'product_id': self.product_id,
-            'quantity': self.quantity,
-            'order_date': self.order_date.isoformat() if self.order_date else None,
-            'status': self.status,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
-        }
+    def to_dict(self, expand=()):
+        data = _serialize(self)
+        if 'product' in expand:
+            data['product'] = self.product.to_dict() if self.product else None
+        if 'user' in expand:
+            data['user'] = self.user.to_dict() if self.user else None
+        return data
+
+# Column-driven to_dict(), generated once at import
+_serialize = model_serializer(Order)
@@ -1,13 +1,30 @@
 from datetime import datetime
 from main import db
+from utils.serialization import model_serializer
 
 class Product(db.Model):
     __tablename__ = 'products'
+    __table_args__ = (
+        db.Index('ix_products_updated_at_id', 'updated_at', 'id'),
+        # Partial index: only rows below their minimum are indexed, so low-stock scans stay small
+        db.Index('ix_products_low_stock', 'id',
+                 postgresql_where=db.text('stock_quantity < min_stock_level'),
+                 sqlite_where=db.text('stock_quantity < min_stock_level')),
+        # Trigram indexes back ILIKE/similarity() search on PostgreSQL only
+        db.Index('ix_products_name_trgm', 'name', postgresql_using='gin',
+                 postgresql_ops={'name': 'gin_trgm_ops'}).ddl_if(dialect='postgresql'),
+        db.Index('ix_products_reference_trgm', 'reference', postgresql_using='gin',
+                 postgresql_ops={'reference': 'gin_trgm_ops'}).ddl_if(dialect='postgresql'),
+        db.Index('ix_products_formula_trgm', 'formula', postgresql_using='gin',
+                 postgresql_ops={'formula': 'gin_trgm_ops'}).ddl_if(dialect='postgresql'),
+        db.Index('ix_products_cas_number_trgm', 'cas_number', postgresql_using='gin',
+                 postgresql_ops={'cas_number': 'gin_trgm_ops'}).ddl_if(dialect='postgresql'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(255), nullable=False)
     reference = db.Column(db.String(100), unique=True, nullable=False)
-    cas_number = db.Column(db.String(50))
+    cas_number = db.Column(db.String(50), index=True)
     formula = db.Column(db.String(100))
     molecular_weight = db.Column(db.Float)
     category = db.Column(db.String(100))
@@ -26,20 +43,13 @@ class Product(db.Model):
         return f"<Product {self.name} ({self.reference})>"
 
     def to_dict(self):
-        return {
-            'id': self.id,
-            'name': self.name,
-            'reference': self.reference,
-            'cas_number': self.cas_number,
-            'formula': self.formula,
-            'molecular_weight': self.molecular_weight,
-            'category': self.category,
-            'supplier_id': self.supplier_id,
-            'unit_price': self.unit_price,
-            'stock_quantity': self.stock_quantity,
-            'min_stock_level': self.min_stock_level,
-            'storage_conditions': self.storage_conditions,
-            'safety_info': self.safety_info,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
-        }
+        return _serialize(self)
+
+# Column-driven to_dict(), generated once at import
+_serialize = model_serializer(Product)
+
+db.event.listen(
+    Product.__table__,
+    'before_create',
+    db.DDL('CREATE EXTENSION IF NOT EXISTS pg_trgm').execute_if(dialect='postgresql')
+)
@@ -0,0 +1,32 @@
+from datetime import datetime
+from main import db
+from utils.serialization import model_serializer
+
+class ReportJob(db.Model):
+    """A background report run and its stored result, reused while the source tables are unchanged."""
+    __tablename__ = 'report_jobs'
+    __table_args__ = (
+        # Finds a finished or in-flight run for the same report, parameters and data version
+        db.Index('ix_report_jobs_lookup', 'kind', 'params_key', 'fingerprint'),
+    )
+
+    id = db.Column(db.String(32), primary_key=True)
+    kind = db.Column(db.String(50), nullable=False)
+    params = db.Column(db.JSON, nullable=False)
+    params_key = db.Column(db.String(40), nullable=False)
+    fingerprint = db.Column(db.String(40), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='pending')
+    result = db.Column(db.JSON)
+    error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+
+    def __repr__(self):
+        return f"<ReportJob {self.id} {self.kind} {self.status}>"
+
+    def to_dict(self):
+        return _serialize(self)
+
+# Column-driven to_dict(), generated once at import
+_serialize = model_serializer(ReportJob, exclude=('params_key', 'fingerprint'))
@@ -1,8 +1,13 @@
 from datetime import datetime
 from main import db
+from utils.serialization import model_serializer
 
 class Supplier(db.Model):
     __tablename__ = 'suppliers'
+    __table_args__ = (
+        # Serves max(updated_at) for collection ETags and changed-since scans
+        db.Index('ix_suppliers_updated_at_id', 'updated_at', 'id'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(255), nullable=False)
@@ -23,17 +28,7 @@ class Supplier(db.Model):
         return f"<Supplier {self.name} ({self.code})>"
 
     def to_dict(self):
-        return {
-            'id': self.id,
-            'name': self.name,
-            'code': self.code,
-            'contact_person': self.contact_person,
-            'email': self.email,
-            'phone': self.phone,
-            'website': self.website,
-            'supplier_type': self.supplier_type,
-            'reliability_score': self.reliability_score,
-            'specialties': self.specialties,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
-        }
+        return _serialize(self)
+
+# Column-driven to_dict(), generated once at import
+_serialize = model_serializer(Supplier)
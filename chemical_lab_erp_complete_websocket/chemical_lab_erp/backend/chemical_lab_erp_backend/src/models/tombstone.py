@@ -0,0 +1,35 @@
+from datetime import datetime
+from sqlalchemy.orm import Session
+from main import db
+
+class Tombstone(db.Model):
+    """One row per deleted product, supplier or order, so delta sync can report deletes."""
+    __tablename__ = 'tombstones'
+    __table_args__ = (
+        db.Index('ix_tombstones_deleted_at_id', 'deleted_at', 'id'),
+        # Last delete per table, for collection Last-Modified
+        db.Index('ix_tombstones_entity_deleted_at', 'entity', 'deleted_at'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    entity = db.Column(db.String(50), nullable=False)
+    entity_id = db.Column(db.Integer, nullable=False)
+    deleted_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<Tombstone {self.entity} {self.entity_id}>"
+
+# Tables whose deletes are recorded; ORM cascades (supplier -> products) are included
+TRACKED_TABLES = frozenset(('products', 'suppliers', 'orders'))
+
+@db.event.listens_for(Session, 'after_flush')
+def record_deletes(session, flush_context):
+    # session.deleted still lists this flush's deletes here; one executemany covers them all
+    now = datetime.utcnow()
+    rows = [
+        {'entity': obj.__table__.name, 'entity_id': obj.id, 'deleted_at': now}
+        for obj in session.deleted
+        if getattr(obj, '__table__', None) is not None and obj.__table__.name in TRACKED_TABLES
+    ]
+    if rows:
+        session.connection().execute(Tombstone.__table__.insert(), rows)
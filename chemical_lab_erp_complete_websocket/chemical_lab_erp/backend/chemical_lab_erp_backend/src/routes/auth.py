@@ -1,15 +1,15 @@
 from flask import Blueprint, request, jsonify
-import jwt
+import time
+import uuid
 from datetime import datetime, timedelta
 from services.user_service import UserService
-from main import app
+from utils.auth import current_user, login_required, token_verifier
 from utils.logger import setup_logger
+from utils.passwords import HashingOverloaded
 
 auth_bp = Blueprint('auth', __name__)
 logger = setup_logger(__name__)
 
-SECRET_KEY = app.config['SECRET_KEY']
-
 @auth_bp.route('/auth/login', methods=['POST'])
 def login():
     data = request.get_json()
@@ -19,7 +19,11 @@ def login():
     if not username or not password:
         return jsonify({'error': 'Username and password are required'}), 400
 
-    user = UserService.authenticate(username, password)
+    try:
+        user = UserService.authenticate(username, password)
+    except HashingOverloaded:
+        # Shed instead of queueing: the client retries and other endpoints stay responsive
+        return jsonify({'error': 'Server busy, please retry'}), 503, {'Retry-After': '1'}
     if not user:
         return jsonify({'error': 'Invalid username or password'}), 401
 
@@ -27,11 +31,25 @@ def login():
         'user_id': user.id,
         'username': user.username,
         'role': user.role,
-        'exp': datetime.utcnow() + timedelta(hours=24)
+        'exp': datetime.utcnow() + timedelta(hours=24),
+        'iat': time.time(),
+        'jti': uuid.uuid4().hex
     }
-    token = jwt.encode(token_payload, SECRET_KEY, algorithm='HS256')
+    token = token_verifier.encode(token_payload)
 
     return jsonify({
         'token': token,
         'user': user.to_dict()
     })
+
+@auth_bp.route('/auth/me', methods=['GET'])
+@login_required
+def me():
+    # Served from the verified token claims, no database round trip
+    return jsonify(dict(current_user))
+
+@auth_bp.route('/auth/logout', methods=['POST'])
+@login_required
+def logout():
+    token_verifier.revoke(current_user)
+    return jsonify({'message': 'Logged out'})
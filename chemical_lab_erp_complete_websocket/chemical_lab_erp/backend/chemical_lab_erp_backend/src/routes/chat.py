@@ -1,6 +1,9 @@
 from flask import Blueprint, request, jsonify
-from src.services.chat_service import ChatService
-from src.utils.logger import setup_logger
+from services.chat_service import ChatService
+from utils.logger import setup_logger
+from utils.pagination import parse_limit
+
+MAX_HISTORY_LIMIT = 200
 
 chat_bp = Blueprint('chat', __name__)
 logger = setup_logger(__name__)
@@ -9,9 +12,11 @@ logger = setup_logger(__name__)
 def get_messages():
     try:
         room = request.args.get('room', 'general')
-        limit = int(request.args.get('limit', 50))
-        messages = ChatService.get_messages(room=room, limit=limit)
-        return jsonify({'messages': [m.to_dict() for m in reversed(messages)]})
+        limit = parse_limit(request.args.get('limit'), default=50, maximum=MAX_HISTORY_LIMIT)
+        messages, next_cursor = ChatService.get_history(room=room, limit=limit, before=request.args.get('before'))
+        return jsonify({'messages': [m.to_dict() for m in reversed(messages)], 'next_cursor': next_cursor})
+    except ValueError as ve:
+        return jsonify({'error': str(ve)}), 400
     except Exception as e:
         logger.error(f"Error fetching chat messages: {e}")
         return jsonify({'error': 'Internal server error'}), 500
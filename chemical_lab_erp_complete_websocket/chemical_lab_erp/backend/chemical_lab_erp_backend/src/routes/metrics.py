@@ -0,0 +1,33 @@
+from flask import Blueprint, Response, jsonify
+from utils.cache import cache
+from utils.database import pool_metrics
+from utils.monitoring import request_metrics
+from utils.passwords import password_hasher
+
+metrics_bp = Blueprint('metrics', __name__)
+
+@metrics_bp.route('/cache/stats', methods=['GET'])
+def cache_stats():
+    return jsonify(cache.stats())
+
+@metrics_bp.route('/hashing/stats', methods=['GET'])
+def hashing_stats():
+    return jsonify(password_hasher.stats())
+
+@metrics_bp.route('/db/pool/stats', methods=['GET'])
+def pool_stats():
+    return jsonify(pool_metrics.stats())
+
+@metrics_bp.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    gauges = {}
+    for prefix, stats in (('cache', cache.stats()), ('password_hashing', password_hasher.stats())):
+        for name, value in stats.items():
+            if isinstance(value, (int, float)):
+                gauges[f'{prefix}_{name}'] = value
+    body = request_metrics.render_prometheus(gauges) + pool_metrics.render_prometheus()
+    return Response(body, mimetype='text/plain; version=0.0.4')
+
+@metrics_bp.route('/metrics/requests', methods=['GET'])
+def request_summary():
+    return jsonify(request_metrics.summary())
@@ -1,14 +1,33 @@
-from src.services.order_service import OrderService
-from src.utils.logger import setup_logger
+from flask import Blueprint, request, jsonify
+from services.order_service import OrderService, InsufficientStockError
+from utils.logger import setup_logger
+from utils.validation import sanitize_input
+from utils.pagination import parse_fields
+from utils.export import export_response, parse_format
+from utils.serialization import row_mode
+from utils.http_cache import conditional_collection, item_response
+from models.order import Order
+from models.product import Product
 
 order_bp = Blueprint('order', __name__)
 logger = setup_logger(__name__)
 
 @order_bp.route('/orders', methods=['GET'])
+# Users have no updated_at, so ?expand=user responses are not validated
+@conditional_collection(Order.__table__, expand={'product': Product.__table__, 'user': None})
 def get_orders():
     try:
-        orders = OrderService.get_all_orders()
-        return jsonify({'orders': [o.to_dict() for o in orders]})
+        fmt = parse_format(request.args.get('format'))
+        if fmt != 'json':
+            fields = parse_fields(request.args.get('fields'), OrderService.FIELDS) or list(OrderService.FIELDS)
+            return export_response(OrderService.iter_orders(fields), fields, fmt, 'orders')
+        expand = parse_fields(request.args.get('expand'), OrderService.EXPANDABLE) or ()
+        if row_mode('orders'):
+            return jsonify({'orders': OrderService.get_all_orders(expand=expand, as_rows=True)})
+        orders = OrderService.get_all_orders(expand=expand)
+        return jsonify({'orders': [o.to_dict(expand) for o in orders]})
+    except ValueError as ve:
+        return jsonify({'error': str(ve)}), 400
     except Exception as e:
         logger.error(f"Error fetching orders: {e}")
         return jsonify({'error': 'Internal server error'}), 500
@@ -16,10 +35,15 @@ def get_orders():
 @order_bp.route('/orders/<int:order_id>', methods=['GET'])
 def get_order(order_id):
     try:
-        order = OrderService.get_order_by_id(order_id)
+        expand = parse_fields(request.args.get('expand'), OrderService.EXPANDABLE) or ()
+        order = OrderService.get_order_by_id(order_id, expand=expand)
         if not order:
             return jsonify({'error': 'Order not found'}), 404
-        return jsonify(order.to_dict())
+        if expand:
+            return jsonify(order.to_dict(expand))
+        return item_response('order', order.to_dict())
+    except ValueError as ve:
+        return jsonify({'error': str(ve)}), 400
     except Exception as e:
         logger.error(f"Error fetching order {order_id}: {e}")
         return jsonify({'error': 'Internal server error'}), 500
@@ -28,68 +52,33 @@ def get_order(order_id):
 def create_order():
     try:
         data = request.get_json()
+        data = {k: sanitize_input(v) for k, v in data.items()}
         order = OrderService.create_order(**data)
         return jsonify(order.to_dict()), 201
+    except InsufficientStockError as se:
+        return jsonify({'error': str(se), 'product_id': se.product_id}), 409
+    except ValueError as ve:
+        return jsonify({'error': str(ve)}), 400
     except Exception as e:
         logger.error(f"Error creating order: {e}")
         return jsonify({'error': 'Internal server error'}), 500
 
-@order_bp.route('/orders/<int:order_id>', methods=['PUT'])
-def update_order(order_id):
+@order_bp.route('/orders/batch', methods=['POST'])
+def create_orders():
     try:
         data = request.get_json()
-        order = OrderService.update_order(order_id, **data)
-        return jsonify(order.to_dict())
+        user_id = sanitize_input(data.get('user_id'))
+        lines = data.get('lines')
+        if not user_id or not isinstance(lines, list):
+            return jsonify({'error': 'User ID and a list of lines are required'}), 400
+        orders = OrderService.create_orders(user_id, lines, status=sanitize_input(data.get('status', 'pending')))
+        return jsonify({'orders': [o.to_dict() for o in orders]}), 201
+    except InsufficientStockError as se:
+        return jsonify({'error': str(se), 'product_id': se.product_id}), 409
+    except ValueError as ve:
+        return jsonify({'error': str(ve)}), 400
     except Exception as e:
-        logger.error(f"Error updating order {order_id}: {e}")
-        return jsonify({'error': 'Internal server error'}), 500
-
-@order_bp.route('/orders/<int:order_id>', methods=['DELETE'])
-def delete_order(order_id):
-    try:
-        OrderService.delete_order(order_id)
-        return jsonify({'message': 'Order deleted'})
-    except Exception as e:
-        logger.error(f"Error deleting order {order_id}: {e}")
-        return jsonify({'error': 'Internal server error'}), 500
-=======
-from flask import Blueprint, request, jsonify
-from src.services.order_service import OrderService
-from src.utils.logger import setup_logger
-from src.utils.validation import sanitize_input
-
-order_bp = Blueprint('order', __name__)
-logger = setup_logger(__name__)
-
-@order_bp.route('/orders', methods=['GET'])
-def get_orders():
-    try:
-        orders = OrderService.get_all_orders()
-        return jsonify({'orders': [o.to_dict() for o in orders]})
-    except Exception as e:
-        logger.error(f"Error fetching orders: {e}")
-        return jsonify({'error': 'Internal server error'}), 500
-
-@order_bp.route('/orders/<int:order_id>', methods=['GET'])
-def get_order(order_id):
-    try:
-        order = OrderService.get_order_by_id(order_id)
-        if not order:
-            return jsonify({'error': 'Order not found'}), 404
-        return jsonify(order.to_dict())
-    except Exception as e:
-        logger.error(f"Error fetching order {order_id}: {e}")
-        return jsonify({'error': 'Internal server error'}), 500
-
-@order_bp.route('/orders', methods=['POST'])
-def create_order():
-    try:
-        data = request.get_json()
-        data = {k: sanitize_input(v) for k, v in data.items()}
-        order = OrderService.create_order(**data)
-        return jsonify(order.to_dict()), 201
-    except Exception as e:
-        logger.error(f"Error creating order: {e}")
+        logger.error(f"Error creating orders: {e}")
         return jsonify({'error': 'Internal server error'}), 500
 
 @order_bp.route('/orders/<int:order_id>', methods=['PUT'])
@@ -99,6 +88,10 @@ def update_order(order_id):
         data = {k: sanitize_input(v) for k, v in data.items()}
         order = OrderService.update_order(order_id, **data)
         return jsonify(order.to_dict())
+    except InsufficientStockError as se:
+        return jsonify({'error': str(se), 'product_id': se.product_id}), 409
+    except ValueError as ve:
+        return jsonify({'error': str(ve)}), 400
     except Exception as e:
         logger.error(f"Error updating order {order_id}: {e}")
         return jsonify({'error': 'Internal server error'}), 500
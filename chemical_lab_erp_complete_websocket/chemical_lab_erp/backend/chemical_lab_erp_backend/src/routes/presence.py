@@ -0,0 +1,17 @@
+from flask import Blueprint, jsonify
+from utils.logger import setup_logger
+from utils.presence import presence
+from utils.validation import sanitize_input
+
+presence_bp = Blueprint('presence', __name__)
+logger = setup_logger(__name__)
+
+@presence_bp.route('/presence/<room>', methods=['GET'])
+def get_room_presence(room):
+    try:
+        room = sanitize_input(room)
+        users = presence.room_members(room)
+        return jsonify({'room': room, 'users': users, 'count': len(users)})
+    except Exception as e:
+        logger.error(f"Error fetching presence for room {room}: {e}")
+        return jsonify({'error': 'Internal server error'}), 500
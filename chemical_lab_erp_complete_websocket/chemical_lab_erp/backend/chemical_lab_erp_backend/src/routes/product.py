@@ -1,87 +1,84 @@
+import csv
+import io
+from flask import Blueprint, request, jsonify
 from services.product_service import ProductService
 from utils.logger import setup_logger
-from flask import Blueprint, request, jsonify
 from utils.validation import sanitize_input
+from utils.pagination import parse_limit, parse_fields
+from utils.export import export_response, parse_format
+from utils.http_cache import conditional_collection, item_response
+from models.product import Product
 
 product_bp = Blueprint('product', __name__)
 logger = setup_logger(__name__)
 
 @product_bp.route('/products', methods=['GET'])
+@conditional_collection(Product.__table__)
 def get_products():
     try:
-        products = ProductService.get_all_products()
-        return jsonify({'products': [p.to_dict() for p in products]})
+        fmt = parse_format(request.args.get('format'))
+        if fmt != 'json':
+            fields = parse_fields(request.args.get('fields'), ProductService.FIELDS) or list(ProductService.FIELDS)
+            return export_response(ProductService.iter_products(fields), fields, fmt, 'products')
+        limit = parse_limit(request.args.get('limit'))
+        sort = request.args.get('sort', 'id')
+        if sort not in ProductService.SORT_KEYS:
+            return jsonify({'error': f"Invalid sort: {sort}"}), 400
+        fields = parse_fields(request.args.get('fields'), ProductService.FIELDS)
+        products, next_cursor = ProductService.get_products_page(
+            limit=limit,
+            after=request.args.get('after'),
+            fields=fields,
+            sort=sort
+        )
+        return jsonify({'products': products, 'next_cursor': next_cursor})
+    except ValueError as ve:
+        return jsonify({'error': str(ve)}), 400
     except Exception as e:
         logger.error(f"Error fetching products: {e}")
         return jsonify({'error': 'Internal server error'}), 500
 
-@product_bp.route('/products/<int:product_id>', methods=['GET'])
-def get_product(product_id):
+@product_bp.route('/products/search', methods=['GET'])
+def search_products():
     try:
-        product = ProductService.get_product_by_id(product_id)
-        if not product:
-            return jsonify({'error': 'Product not found'}), 404
-        return jsonify(product.to_dict())
+        query = request.args.get('q', '')
+        if not query.strip():
+            return jsonify({'error': 'Query parameter q is required'}), 400
+        limit = parse_limit(request.args.get('limit'), default=20, maximum=100)
+        products = ProductService.search_products(query, limit=limit)
+        return jsonify({'products': products})
+    except ValueError as ve:
+        return jsonify({'error': str(ve)}), 400
     except Exception as e:
-        logger.error(f"Error fetching product {product_id}: {e}")
+        logger.error(f"Error searching products: {e}")
         return jsonify({'error': 'Internal server error'}), 500
 
-@product_bp.route('/products', methods=['POST'])
-def create_product():
+@product_bp.route('/products/low-stock', methods=['GET'])
+@conditional_collection(Product.__table__)
+def get_low_stock_products():
     try:
-        data = request.get_json()
-        # Sanitize inputs
-        data = {k: sanitize_input(v) for k, v in data.items()}
-        product = ProductService.create_product(**data)
-        return jsonify(product.to_dict()), 201
+        limit = parse_limit(request.args.get('limit'))
+        fields = parse_fields(request.args.get('fields'), ProductService.FIELDS)
+        products, next_cursor = ProductService.get_products_page(
+            limit=limit,
+            after=request.args.get('after'),
+            fields=fields,
+            low_stock=True
+        )
+        return jsonify({'products': products, 'next_cursor': next_cursor})
+    except ValueError as ve:
+        return jsonify({'error': str(ve)}), 400
     except Exception as e:
-        logger.error(f"Error creating product: {e}")
-        return jsonify({'error': 'Internal server error'}), 500
-
-@product_bp.route('/products/<int:product_id>', methods=['PUT'])
-def update_product(product_id):
-    try:
-        data = request.get_json()
-        # Sanitize inputs
-        data = {k: sanitize_input(v) for k, v in data.items()}
-        product = ProductService.update_product(product_id, **data)
-        return jsonify(product.to_dict())
-    except Exception as e:
-        logger.error(f"Error updating product {product_id}: {e}")
-        return jsonify({'error': 'Internal server error'}), 500
-
-@product_bp.route('/products/<int:product_id>', methods=['DELETE'])
-def delete_product(product_id):
-    try:
-        ProductService.delete_product(product_id)
-        return jsonify({'message': 'Product deleted'})
-    except Exception as e:
-        logger.error(f"Error deleting product {product_id}: {e}")
-        return jsonify({'error': 'Internal server error'}), 500
-from flask import Blueprint, request, jsonify
-from services.product_service import ProductService
-from utils.logger import setup_logger
-from utils.validation import sanitize_input
-
-product_bp = Blueprint('product', __name__)
-logger = setup_logger(__name__)
-
-@product_bp.route('/products', methods=['GET'])
-def get_products():
-    try:
-        products = ProductService.get_all_products()
-        return jsonify({'products': [p.to_dict() for p in products]})
-    except Exception as e:
-        logger.error(f"Error fetching products: {e}")
+        logger.error(f"Error fetching low stock products: {e}")
         return jsonify({'error': 'Internal server error'}), 500
 
 @product_bp.route('/products/<int:product_id>', methods=['GET'])
 def get_product(product_id):
     try:
-        product = ProductService.get_product_by_id(product_id)
+        product = ProductService.get_product_dict(product_id)
         if not product:
             return jsonify({'error': 'Product not found'}), 404
-        return jsonify(product.to_dict())
+        return item_response('product', product)
     except Exception as e:
         logger.error(f"Error fetching product {product_id}: {e}")
         return jsonify({'error': 'Internal server error'}), 500
@@ -98,6 +95,28 @@ def create_product():
         logger.error(f"Error creating product: {e}")
         return jsonify({'error': 'Internal server error'}), 500
 
+@product_bp.route('/products/bulk', methods=['POST'])
+def bulk_upsert_products():
+    try:
+        upload = request.files.get('file')
+        if upload is not None:
+            rows = csv.DictReader(io.StringIO(upload.read().decode('utf-8-sig')))
+        elif request.mimetype == 'text/csv':
+            rows = csv.DictReader(io.StringIO(request.get_data(as_text=True)))
+        else:
+            rows = request.get_json()
+            if not isinstance(rows, list):
+                return jsonify({'error': 'Expected a JSON array of products'}), 400
+        # Sanitize inputs
+        rows = ({k: sanitize_input(v) for k, v in row.items()} if isinstance(row, dict) else row for row in rows)
+        result = ProductService.bulk_upsert_products(rows)
+        return jsonify(result)
+    except UnicodeDecodeError:
+        return jsonify({'error': 'CSV upload must be UTF-8 encoded'}), 400
+    except Exception as e:
+        logger.error(f"Error importing products: {e}")
+        return jsonify({'error': 'Internal server error'}), 500
+
 @product_bp.route('/products/<int:product_id>', methods=['PUT'])
 def update_product(product_id):
     try:
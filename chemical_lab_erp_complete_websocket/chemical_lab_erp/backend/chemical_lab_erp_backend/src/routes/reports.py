@@ -0,0 +1,51 @@
+from flask import Blueprint, request, jsonify, url_for
+from services.report_service import ReportService, SUCCEEDED
+from tasks.reports import run_report
+from utils.database import primary_only
+from utils.logger import setup_logger
+
+reports_bp = Blueprint('reports', __name__)
+logger = setup_logger(__name__)
+
+def job_response(job, status_code):
+    data = job.to_dict()
+    data['status_url'] = url_for('reports.get_report_job', job_id=job.id)
+    if job.status != SUCCEEDED:
+        data.pop('result', None)
+    return jsonify(data), status_code
+
+@reports_bp.route('/reports/<kind>', methods=['POST'])
+def request_report(kind):
+    """Queue report `kind`; 200 with the stored result when an up-to-date one exists, else 202 with a job to poll."""
+    try:
+        job, created = ReportService.request_report(kind, request.get_json(silent=True) or {})
+        if created:
+            try:
+                # Runs on a Celery worker, never in this HTTP worker
+                run_report.apply_async(args=[job.id], task_id=job.id)
+            except Exception as e:
+                logger.error(f"Could not enqueue report job {job.id}: {e}")
+                ReportService.fail_job(job.id, 'Could not enqueue the report')
+                return jsonify({'error': 'Report queue unavailable'}), 503
+            # An eager Celery (tests) has already run it
+            job = ReportService.get_job(job.id)
+        return job_response(job, 200 if job.status == SUCCEEDED else 202)
+    except ValueError as ve:
+        return jsonify({'error': str(ve)}), 400
+    except Exception as e:
+        logger.error(f"Error requesting report {kind}: {e}")
+        return jsonify({'error': 'Internal server error'}), 500
+
+@reports_bp.route('/reports/jobs/<job_id>', methods=['GET'])
+# A job created a moment ago may not have reached the replica yet
+@primary_only
+def get_report_job(job_id):
+    try:
+        job = ReportService.get_job(job_id)
+        if job is None:
+            return jsonify({'error': 'Report job not found'}), 404
+        # The poll itself succeeded; a failed job is reported in the body with its error
+        return job_response(job, 200)
+    except Exception as e:
+        logger.error(f"Error fetching report job {job_id}: {e}")
+        return jsonify({'error': 'Internal server error'}), 500
@@ -1,16 +1,30 @@
+from flask import Blueprint, request, jsonify
 from services.supplier_service import SupplierService
 from utils.logger import setup_logger
-from flask import Blueprint, request, jsonify
 from utils.validation import sanitize_input
+from utils.pagination import parse_fields
+from utils.export import export_response, parse_format
+from utils.serialization import row_mode
+from utils.http_cache import conditional_collection, item_response
+from models.supplier import Supplier
 
 supplier_bp = Blueprint('supplier', __name__)
 logger = setup_logger(__name__)
 
 @supplier_bp.route('/suppliers', methods=['GET'])
+@conditional_collection(Supplier.__table__)
 def get_suppliers():
     try:
+        fmt = parse_format(request.args.get('format'))
+        if fmt != 'json':
+            fields = parse_fields(request.args.get('fields'), SupplierService.FIELDS) or list(SupplierService.FIELDS)
+            return export_response(SupplierService.iter_suppliers(fields), fields, fmt, 'suppliers')
+        if row_mode('suppliers'):
+            return jsonify({'suppliers': SupplierService.get_all_suppliers(as_rows=True)})
         suppliers = SupplierService.get_all_suppliers()
         return jsonify({'suppliers': [s.to_dict() for s in suppliers]})
+    except ValueError as ve:
+        return jsonify({'error': str(ve)}), 400
     except Exception as e:
         logger.error(f"Error fetching suppliers: {e}")
         return jsonify({'error': 'Internal server error'}), 500
@@ -18,68 +32,10 @@ def get_suppliers():
 @supplier_bp.route('/suppliers/<int:supplier_id>', methods=['GET'])
 def get_supplier(supplier_id):
     try:
-        supplier = SupplierService.get_supplier_by_id(supplier_id)
+        supplier = SupplierService.get_supplier_dict(supplier_id)
         if not supplier:
             return jsonify({'error': 'Supplier not found'}), 404
-        return jsonify(supplier.to_dict())
-    except Exception as e:
-        logger.error(f"Error fetching supplier {supplier_id}: {e}")
-        return jsonify({'error': 'Internal server error'}), 500
-
-@supplier_bp.route('/suppliers', methods=['POST'])
-def create_supplier():
-    try:
-        data = request.get_json()
-        data = {k: sanitize_input(v) for k, v in data.items()}
-        supplier = SupplierService.create_supplier(**data)
-        return jsonify(supplier.to_dict()), 201
-    except Exception as e:
-        logger.error(f"Error creating supplier: {e}")
-        return jsonify({'error': 'Internal server error'}), 500
-
-@supplier_bp.route('/suppliers/<int:supplier_id>', methods=['PUT'])
-def update_supplier(supplier_id):
-    try:
-        data = request.get_json()
-        data = {k: sanitize_input(v) for k, v in data.items()}
-        supplier = SupplierService.update_supplier(supplier_id, **data)
-        return jsonify(supplier.to_dict())
-    except Exception as e:
-        logger.error(f"Error updating supplier {supplier_id}: {e}")
-        return jsonify({'error': 'Internal server error'}), 500
-
-@supplier_bp.route('/suppliers/<int:supplier_id>', methods=['DELETE'])
-def delete_supplier(supplier_id):
-    try:
-        SupplierService.delete_supplier(supplier_id)
-        return jsonify({'message': 'Supplier deleted'})
-    except Exception as e:
-        logger.error(f"Error deleting supplier {supplier_id}: {e}")
-        return jsonify({'error': 'Internal server error'}), 500
-from flask import Blueprint, request, jsonify
-from src.services.supplier_service import SupplierService
-from src.utils.logger import setup_logger
-from src.utils.validation import sanitize_input
-
-supplier_bp = Blueprint('supplier', __name__)
-logger = setup_logger(__name__)
-
-@supplier_bp.route('/suppliers', methods=['GET'])
-def get_suppliers():
-    try:
-        suppliers = SupplierService.get_all_suppliers()
-        return jsonify({'suppliers': [s.to_dict() for s in suppliers]})
-    except Exception as e:
-        logger.error(f"Error fetching suppliers: {e}")
-        return jsonify({'error': 'Internal server error'}), 500
-
-@supplier_bp.route('/suppliers/<int:supplier_id>', methods=['GET'])
-def get_supplier(supplier_id):
-    try:
-        supplier = SupplierService.get_supplier_by_id(supplier_id)
-        if not supplier:
-            return jsonify({'error': 'Supplier not found'}), 404
-        return jsonify(supplier.to_dict())
+        return item_response('supplier', supplier)
     except Exception as e:
         logger.error(f"Error fetching supplier {supplier_id}: {e}")
         return jsonify({'error': 'Internal server error'}), 500
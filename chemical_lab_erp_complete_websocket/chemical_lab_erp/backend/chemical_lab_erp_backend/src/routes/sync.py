@@ -0,0 +1,25 @@
+from flask import Blueprint, request, jsonify
+from services.sync_service import SyncService, SyncTokenExpired
+from utils.database import primary_only
+from utils.logger import setup_logger
+from utils.pagination import parse_limit
+
+MAX_SYNC_LIMIT = 5000
+
+sync_bp = Blueprint('sync', __name__)
+logger = setup_logger(__name__)
+
+@sync_bp.route('/sync', methods=['GET'])
+# Replication lag longer than the safety window would make a client skip rows for good
+@primary_only
+def sync():
+    try:
+        limit = parse_limit(request.args.get('limit'), default=500, maximum=MAX_SYNC_LIMIT)
+        return jsonify(SyncService.changes_since(request.args.get('since'), limit=limit))
+    except SyncTokenExpired as e:
+        return jsonify({'error': str(e)}), 410
+    except ValueError as ve:
+        return jsonify({'error': str(ve)}), 400
+    except Exception as e:
+        logger.error(f"Error computing sync delta: {e}")
+        return jsonify({'error': 'Internal server error'}), 500
@@ -1,18 +1,23 @@
 from flask import Blueprint, request, jsonify
 from services.user_service import UserService
 from utils.logger import setup_logger
+from utils.passwords import HashingOverloaded
 from utils.validation import validate_email, validate_username, validate_password, sanitize_input
 
 user_bp = Blueprint('user', __name__)
 logger = setup_logger(__name__)
 
+def hashing_overloaded():
+    # Same shedding answer as login: the client retries and other endpoints stay responsive
+    return jsonify({'error': 'Server busy, please retry'}), 503, {'Retry-After': '1'}
+
 @user_bp.route('/users/<int:user_id>', methods=['GET'])
 def get_user(user_id):
     try:
-        user = UserService.get_user_by_id(user_id)
+        user = UserService.get_user_dict(user_id)
         if not user:
             return jsonify({'error': 'User not found'}), 404
-        return jsonify(user.to_dict())
+        return jsonify(user)
     except Exception as e:
         logger.error(f"Error fetching user {user_id}: {e}")
         return jsonify({'error': 'Internal server error'}), 500
@@ -42,6 +47,8 @@ def create_user():
             password=password
         )
         return jsonify(user.to_dict()), 201
+    except HashingOverloaded:
+        return hashing_overloaded()
     except ValueError as ve:
         return jsonify({'error': str(ve)}), 400
     except Exception as e:
@@ -62,6 +69,8 @@ def update_user(user_id):
 
         user = UserService.update_user(user_id, **data)
         return jsonify(user.to_dict())
+    except HashingOverloaded:
+        return hashing_overloaded()
     except ValueError as ve:
         return jsonify({'error': str(ve)}), 404
     except Exception as e:
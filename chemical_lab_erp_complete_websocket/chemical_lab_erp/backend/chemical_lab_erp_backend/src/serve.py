@@ -0,0 +1,31 @@
+"""Production entry point for the Socket.IO server.
+
+Usage:
+    SOCKETIO_ASYNC_MODE=gevent python serve.py --port 5000
+    SOCKETIO_ASYNC_MODE=gevent gunicorn -k gevent -w 1 serve:app
+
+With gevent each connection costs a green thread instead of an OS thread, so
+one worker holds thousands of sockets. The standard library is monkey-patched
+here, before anything else is imported, and blocking database calls from the
+chat handlers go through utils.offload.db_executor. Scale out with more workers
+sharing SOCKETIO_MESSAGE_QUEUE. Without SOCKETIO_ASYNC_MODE nothing is patched
+and the server runs in threading mode. eventlet is not supported.
+"""
+import os
+
+ASYNC_MODE = os.environ.get('SOCKETIO_ASYNC_MODE')
+
+if ASYNC_MODE == 'gevent':
+    from gevent import monkey
+    monkey.patch_all()
+
+from main import app, socketio  # noqa: E402
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default=os.environ.get('HOST', '0.0.0.0'))
+    parser.add_argument('--port', type=int, default=int(os.environ.get('PORT', 5000)))
+    args = parser.parse_args()
+    socketio.run(app, host=args.host, port=args.port, allow_unsafe_werkzeug=socketio.async_mode == 'threading')
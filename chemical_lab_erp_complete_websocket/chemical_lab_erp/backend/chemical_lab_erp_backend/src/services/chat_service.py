@@ -1,10 +1,74 @@
+import atexit
+from datetime import datetime
+from sqlalchemy.exc import DataError, IntegrityError
 from models.chat_message import ChatMessage
 from main import db
+from utils.offload import db_executor
+from utils.snowflake import next_id
+from utils.write_behind import WriteBehindQueue
+from utils.pagination import encode_cursor, decode_cursor
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+DURABILITY_MODES = ('write_behind', 'sync')
+
+def _insert_messages(rows):
+    statement = db.insert(ChatMessage.__table__)
+    try:
+        with db.session.begin_nested():
+            db.session.execute(statement, rows)
+    except (IntegrityError, DataError):
+        # Retry row by row so one bad message (unknown user_id, duplicate id) does not block the
+        # queue forever; other errors (database down) propagate and the whole batch is retried
+        for row in rows:
+            try:
+                with db.session.begin_nested():
+                    db.session.execute(statement, row)
+            except (IntegrityError, DataError) as e:
+                logger.error(f"Dropped chat message {row.get('id')} in room {row.get('room')}: "
+                             f"{getattr(e, 'orig', None) or e}")
+    db.session.commit()
+
+def _flush_messages(rows):
+    # The flusher is a green thread under gevent; keep the INSERT off the hub
+    db_executor.call(_insert_messages, rows)
+
+message_writer = WriteBehindQueue(_flush_messages)
 
 class ChatService:
+    durability = 'write_behind'
+
+    @staticmethod
+    def init_app(app):
+        durability = app.config.get('CHAT_DURABILITY', 'write_behind')
+        if durability not in DURABILITY_MODES:
+            raise ValueError(f"Unknown chat durability mode: {durability}")
+        ChatService.durability = durability
+        message_writer.batch_size = app.config.get('CHAT_FLUSH_BATCH_SIZE', 200)
+        message_writer.interval = app.config.get('CHAT_FLUSH_INTERVAL_MS', 50) / 1000.0
+        atexit.register(message_writer.stop)
+
     @staticmethod
     def get_messages(room='general', limit=50):
-        return ChatMessage.query.filter_by(room=room).order_by(ChatMessage.timestamp.desc()).limit(limit).all()
+        return (ChatMessage.query.filter_by(room=room)
+                .order_by(ChatMessage.timestamp.desc(), ChatMessage.id.desc())
+                .limit(limit).all())
+
+    @staticmethod
+    def get_history(room='general', limit=50, before=None):
+        """Return up to `limit` messages older than the `before` cursor, newest first, and the cursor for the page after."""
+        query = ChatMessage.query.filter_by(room=room)
+        if before:
+            timestamp, message_id = decode_cursor(before, (datetime, int))
+            query = query.filter(db.tuple_(ChatMessage.timestamp, ChatMessage.id) < db.tuple_(timestamp, message_id))
+        messages = (query.order_by(ChatMessage.timestamp.desc(), ChatMessage.id.desc())
+                    .limit(limit + 1).all())
+        next_cursor = None
+        if len(messages) > limit:
+            messages = messages[:limit]
+            next_cursor = encode_cursor([messages[-1].timestamp, messages[-1].id])
+        return messages, next_cursor
 
     @staticmethod
     def add_message(user_id, room, message_text):
@@ -12,3 +76,27 @@ class ChatService:
         db.session.add(message)
         db.session.commit()
         return message
+
+    @staticmethod
+    def post_message(user_id, room, message_text):
+        """Persist a chat message according to the durability mode and return its payload.
+
+        In 'sync' mode the row is committed before returning. In 'write_behind' mode
+        the payload (with its final snowflake id) is returned at once and the row is
+        inserted by the next batch flush.
+        """
+        if ChatService.durability == 'sync':
+            return db_executor.call(lambda: ChatService.add_message(user_id, room, message_text).to_dict())
+        row = {
+            'id': next_id(),
+            'user_id': user_id,
+            'room': room,
+            'message': message_text,
+            'timestamp': datetime.utcnow(),
+        }
+        message_writer.put(row)
+        return dict(row, timestamp=row['timestamp'].isoformat())
+
+    @staticmethod
+    def flush_pending():
+        return message_writer.flush()
@@ -1,30 +1,226 @@
+from datetime import datetime
+from functools import lru_cache
+from sqlalchemy.orm import joinedload
 from models.order import Order
+from models.product import Product
+from models.user import User
 from main import db
+from services.product_service import ProductService
+from utils.cache import cache
+from utils.serialization import row_serializer
+
+CANCELLED = 'cancelled'
+
+class InsufficientStockError(ValueError):
+    def __init__(self, product_id, requested):
+        super().__init__(f"Insufficient stock for product {product_id}")
+        self.product_id = product_id
+        self.requested = requested
 
 class OrderService:
+    FIELDS = tuple(c.key for c in Order.__table__.columns)
+    # Relationships that `expand=` may embed; both are many-to-one, so a join loads them in the same query
+    EXPANDABLE = {
+        'product': Order.product,
+        'user': Order.user,
+    }
+
+    @staticmethod
+    def _expand_options(expand):
+        options = []
+        for name in expand:
+            if name not in OrderService.EXPANDABLE:
+                raise ValueError(f"Cannot expand: {name}")
+            options.append(joinedload(OrderService.EXPANDABLE[name]))
+        return options
+
+    # Columns each expandable relationship contributes to a row-mode select
+    EXPANDABLE_COLUMNS = {
+        'product': (Product.__table__, ()),
+        'user': (User.__table__, ('password_hash',)),
+    }
+
+    @staticmethod
+    def get_all_orders(expand=(), as_rows=False):
+        if as_rows:
+            return OrderService._get_all_order_rows(expand)
+        return Order.query.options(*OrderService._expand_options(expand)).order_by(Order.id).all()
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def _order_row_plan(expand):
+        """Columns, FROM clause and compiled serializers for a row-mode select; built once per `expand`."""
+        orders = Order.__table__
+        columns = list(orders.c)
+        nested = []
+        query_from = orders
+        for name in expand:
+            if name not in OrderService.EXPANDABLE_COLUMNS:
+                raise ValueError(f"Cannot expand: {name}")
+            table, exclude = OrderService.EXPANDABLE_COLUMNS[name]
+            related = [column for column in table.c if column.key not in exclude]
+            # The related id is None when the outer join found nothing
+            nested.append((name, row_serializer(related, offset=len(columns)), len(columns)))
+            columns.extend(related)
+            query_from = query_from.outerjoin(table, orders.c[f'{name}_id'] == table.c.id)
+        return columns, query_from, row_serializer(list(orders.c)), nested
+
+    @staticmethod
+    def _get_all_order_rows(expand):
+        """Orders as to_dict(expand)-shaped dicts from one joined select of plain column tuples."""
+        columns, query_from, serialize, nested = OrderService._order_row_plan(tuple(expand))
+        result = db.session.execute(db.select(*columns).select_from(query_from).order_by(Order.__table__.c.id))
+        data = []
+        for row in result:
+            item = serialize(row)
+            for name, serialize_related, id_position in nested:
+                item[name] = serialize_related(row) if row[id_position] is not None else None
+            data.append(item)
+        return data
+
+    @staticmethod
+    def iter_orders(fields=None, batch_size=1000):
+        table = Order.__table__
+        names = list(fields) if fields else list(OrderService.FIELDS)
+        query = db.select(*[table.c[name] for name in names]).order_by(table.c.id)
+        return db.session.execute(query.execution_options(yield_per=batch_size)).mappings()
+
     @staticmethod
-    def get_all_orders():
-        return Order.query.all()
+    def get_order_by_id(order_id, expand=()):
+        return Order.query.options(*OrderService._expand_options(expand)).filter_by(id=order_id).first()
 
     @staticmethod
-    def get_order_by_id(order_id):
-        return Order.query.get(order_id)
+    def _parse_quantity(value):
+        try:
+            quantity = int(value)
+        except (TypeError, ValueError):
+            raise ValueError("Quantity must be an integer")
+        if quantity <= 0:
+            raise ValueError("Quantity must be positive")
+        return quantity
+
+    @staticmethod
+    def _check_new_status(status):
+        # A new order always holds a reservation; cancelling is only a transition (update_order)
+        if status == CANCELLED:
+            raise ValueError("An order cannot be created as cancelled")
+
+    @staticmethod
+    def _reserve(product_id, quantity):
+        """Take `quantity` out of stock with one conditional UPDATE; the row lock lasts until commit.
+
+        A NULL stock_quantity means the product's stock is not tracked: the order
+        is accepted and the quantity stays NULL (NULL - n is NULL). Returns True
+        when this reservation took the product below its minimum stock level,
+        i.e. when a low stock alert is due.
+        """
+        table = Product.__table__
+        row = db.session.execute(
+            db.update(table)
+            .where(table.c.id == product_id,
+                   db.or_(table.c.stock_quantity.is_(None), table.c.stock_quantity >= quantity))
+            .values(stock_quantity=table.c.stock_quantity - quantity, updated_at=datetime.utcnow())
+            .returning(table.c.stock_quantity, table.c.min_stock_level)
+        ).first()
+        if row is None:
+            if db.session.execute(db.select(table.c.id).where(table.c.id == product_id)).first() is None:
+                raise ValueError("Product not found")
+            raise InsufficientStockError(product_id, quantity)
+        stock, minimum = row
+        return stock is not None and minimum is not None and stock < minimum <= stock + quantity
+
+    @staticmethod
+    def _release(product_id, quantity):
+        table = Product.__table__
+        db.session.execute(
+            db.update(table)
+            .where(table.c.id == product_id)
+            .values(stock_quantity=table.c.stock_quantity + quantity, updated_at=datetime.utcnow())
+        )
+
+    @staticmethod
+    def _stock_changed(product_ids, became_low=()):
+        cache.invalidate('product', *product_ids)
+        # Same rule as ProductService.update_product: alert on the transition only, never on a release
+        if became_low:
+            ProductService._queue_low_stock_check(sorted(became_low))
 
     @staticmethod
     def create_order(**kwargs):
-        order = Order(**kwargs)
-        db.session.add(order)
-        db.session.commit()
+        kwargs['quantity'] = OrderService._parse_quantity(kwargs.get('quantity'))
+        OrderService._check_new_status(kwargs.get('status'))
+        try:
+            became_low = OrderService._reserve(kwargs.get('product_id'), kwargs['quantity'])
+            order = Order(**kwargs)
+            db.session.add(order)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        OrderService._stock_changed([order.product_id], [order.product_id] if became_low else ())
         return order
 
+    @staticmethod
+    def create_orders(user_id, lines, status='pending'):
+        """Create one order per line, reserving stock for all of them in a single transaction.
+
+        Either every line is reserved or none is. Products are locked in id order
+        so concurrent multi-line orders cannot deadlock each other.
+        """
+        if not lines:
+            raise ValueError("At least one order line is required")
+        OrderService._check_new_status(status)
+        parsed = []
+        totals = {}
+        for line in lines:
+            if not isinstance(line, dict) or line.get('product_id') is None:
+                raise ValueError("Each line needs a product_id and a quantity")
+            product_id = int(line['product_id'])
+            quantity = OrderService._parse_quantity(line.get('quantity'))
+            parsed.append((product_id, quantity))
+            totals[product_id] = totals.get(product_id, 0) + quantity
+
+        try:
+            became_low = [product_id for product_id in sorted(totals)
+                          if OrderService._reserve(product_id, totals[product_id])]
+            orders = [Order(user_id=user_id, product_id=product_id, quantity=quantity, status=status)
+                      for product_id, quantity in parsed]
+            db.session.add_all(orders)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        OrderService._stock_changed(sorted(totals), became_low)
+        return orders
+
     @staticmethod
     def update_order(order_id, **kwargs):
         order = Order.query.get(order_id)
         if not order:
             raise ValueError("Order not found")
-        for key, value in kwargs.items():
-            setattr(order, key, value)
-        db.session.commit()
+        if 'quantity' in kwargs:
+            kwargs['quantity'] = OrderService._parse_quantity(kwargs['quantity'])
+        was_active = order.status != CANCELLED
+        old_product_id, old_quantity = order.product_id, order.quantity
+        try:
+            for key, value in kwargs.items():
+                setattr(order, key, value)
+            is_active = order.status != CANCELLED
+            # Keep the reservation in step with the order: release what it held, take what it now needs
+            touched, became_low = set(), set()
+            if was_active and (not is_active or order.product_id != old_product_id or order.quantity != old_quantity):
+                OrderService._release(old_product_id, old_quantity)
+                touched.add(old_product_id)
+            if is_active and (not was_active or order.product_id != old_product_id or order.quantity != old_quantity):
+                if OrderService._reserve(order.product_id, order.quantity):
+                    became_low.add(order.product_id)
+                touched.add(order.product_id)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        if touched:
+            OrderService._stock_changed(sorted(touched), became_low)
         return order
 
     @staticmethod
@@ -32,5 +228,15 @@ class OrderService:
         order = Order.query.get(order_id)
         if not order:
             raise ValueError("Order not found")
-        db.session.delete(order)
-        db.session.commit()
+        active = order.status != CANCELLED
+        try:
+            # The reservation goes back to stock in the same transaction as the delete
+            if active:
+                OrderService._release(order.product_id, order.quantity)
+            db.session.delete(order)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        if active:
+            OrderService._stock_changed([order.product_id])
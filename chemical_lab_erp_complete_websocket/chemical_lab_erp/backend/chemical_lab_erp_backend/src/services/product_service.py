@@ -1,20 +1,299 @@
+import re
+from collections import defaultdict
+from datetime import datetime
+from sqlalchemy.exc import SQLAlchemyError
 from models.product import Product
 from main import db
+from utils.pagination import encode_cursor, decode_cursor, serialize_row
+from utils.serialization import row_serializer
+from utils.search_index import InvertedIndex
+from utils.cache import cache
+from utils.logger import setup_logger
+from utils.database import reading_primary
+from tasks.inventory import evaluate_low_stock
+
+logger = setup_logger(__name__)
+
+CAS_NUMBER_RE = re.compile(r'^\d{2,7}-\d{2}-\d$')
+
+# Fallback index for databases without pg_trgm; loaded lazily on first search
+search_index = InvertedIndex(
+    weights={'reference': 3.0, 'cas_number': 3.0, 'name': 2.0, 'formula': 1.0},
+    exact_fields=('reference', 'cas_number', 'formula')
+)
+
+_serialize_row = row_serializer(list(Product.__table__.columns))
 
 class ProductService:
+    FIELDS = tuple(c.key for c in Product.__table__.columns)
+    # Keyset columns for each supported sort order; `id` breaks ties so cursors are stable.
+    SORT_KEYS = {
+        'id': (('id', int),),
+        'updated_at': (('updated_at', datetime), ('id', int)),
+    }
+    SEARCH_FIELDS = ('id', 'name', 'reference', 'cas_number', 'formula',
+                     'category', 'supplier_id', 'stock_quantity')
+    INDEXED_FIELDS = ('name', 'reference', 'cas_number', 'formula')
+    BULK_FIELDS = tuple(name for name in FIELDS if name not in ('id', 'created_at', 'updated_at'))
+    REQUIRED_FIELDS = ('name', 'reference', 'supplier_id')
+    STOCK_FIELDS = frozenset(('stock_quantity', 'min_stock_level'))
+
     @staticmethod
-    def get_all_products():
+    def get_all_products(as_rows=False):
+        """All products as ORM instances, or with `as_rows` as to_dict()-shaped dicts built from plain rows."""
+        if as_rows:
+            table = Product.__table__
+            result = db.session.execute(db.select(*table.c).order_by(table.c.id))
+            return [_serialize_row(row) for row in result]
         return Product.query.all()
 
+    @staticmethod
+    def iter_products(fields=None, batch_size=1000):
+        """Stream products as row mappings through a server-side cursor."""
+        table = Product.__table__
+        names = list(fields) if fields else list(ProductService.FIELDS)
+        query = db.select(*[table.c[name] for name in names]).order_by(table.c.id)
+        return db.session.execute(query.execution_options(yield_per=batch_size)).mappings()
+
+    @staticmethod
+    def get_products_page(limit=100, after=None, fields=None, sort='id', low_stock=False):
+        """Return one keyset page of products as dicts plus the cursor of the next page.
+
+        Only the requested `fields` are selected, so large text columns are never
+        read unless asked for. The keyset columns are always included.
+        """
+        keys = ProductService.SORT_KEYS[sort]
+        names = list(fields) if fields else list(ProductService.FIELDS)
+        for key, _ in reversed(keys):
+            if key not in names:
+                names.insert(0, key)
+
+        table = Product.__table__
+        order = [table.c[key] for key, _ in keys]
+        query = db.select(*[table.c[name] for name in names]).order_by(*order).limit(limit + 1)
+        if low_stock:
+            # Matches the predicate of ix_products_low_stock so the partial index is used
+            query = query.where(table.c.stock_quantity < table.c.min_stock_level)
+        if after:
+            values = decode_cursor(after, [t for _, t in keys])
+            if len(order) == 1:
+                query = query.where(order[0] > values[0])
+            else:
+                query = query.where(db.tuple_(*order) > db.tuple_(*values))
+
+        rows = db.session.execute(query).mappings().all()
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor([rows[-1][key] for key, _ in keys])
+        return [serialize_row(row) for row in rows], next_cursor
+
+    @staticmethod
+    def search_products(query, limit=20):
+        """Ranked search over name, reference, CAS number and formula."""
+        query = query.strip()
+        if not query:
+            return []
+        table = Product.__table__
+        columns = [table.c[name] for name in ProductService.SEARCH_FIELDS]
+
+        # An exact CAS number is answered straight from the btree index
+        if CAS_NUMBER_RE.match(query):
+            rows = db.session.execute(
+                db.select(*columns).where(table.c.cas_number == query).order_by(table.c.id).limit(limit)
+            ).mappings().all()
+            if rows:
+                return [dict(serialize_row(row), score=1.0) for row in rows]
+
+        if db.engine.dialect.name == 'postgresql':
+            return ProductService._search_postgresql(query, limit, columns)
+        return ProductService._search_index(query, limit, columns)
+
+    @staticmethod
+    def _search_postgresql(query, limit, columns):
+        table = Product.__table__
+        pattern = '%' + re.sub(r'([\\%_])', r'\\\1', query) + '%'
+        score = db.func.greatest(
+            db.func.similarity(table.c.name, query),
+            db.func.similarity(table.c.reference, query),
+            db.func.similarity(table.c.formula, query),
+            db.func.similarity(table.c.cas_number, query)
+        ) + db.case(
+            (db.func.lower(table.c.reference) == query.lower(), 1.0),
+            else_=0.0
+        )
+        rows = db.session.execute(
+            db.select(*columns, score.label('score'))
+            .where(db.or_(
+                table.c.name.ilike(pattern),
+                table.c.reference.ilike(pattern),
+                table.c.formula.ilike(pattern),
+                table.c.cas_number.ilike(pattern)
+            ))
+            .order_by(db.desc('score'), table.c.id)
+            .limit(limit)
+        ).mappings().all()
+        return [serialize_row(row) for row in rows]
+
+    @staticmethod
+    def _search_index(query, limit, columns):
+        table = Product.__table__
+        with search_index.lock:
+            if not search_index.loaded:
+                fields = [table.c.id] + [table.c[name] for name in ProductService.INDEXED_FIELDS]
+                for row in db.session.execute(db.select(*fields)).mappings():
+                    search_index.add(row['id'], row)
+                search_index.loaded = True
+        ranked = search_index.search(query, limit)
+        if not ranked:
+            return []
+        rows = db.session.execute(
+            db.select(*columns).where(table.c.id.in_([doc_id for doc_id, _ in ranked]))
+        ).mappings().all()
+        by_id = {row['id']: row for row in rows}
+        return [dict(serialize_row(by_id[doc_id]), score=score)
+                for doc_id, score in ranked if doc_id in by_id]
+
+    @staticmethod
+    def _index_product(product):
+        if search_index.loaded:
+            search_index.add(product.id, {name: getattr(product, name) for name in ProductService.INDEXED_FIELDS})
+
+    @staticmethod
+    def bulk_upsert_products(rows, batch_size=1000):
+        """Insert or update products keyed on `reference`, in batched INSERT ... ON CONFLICT statements.
+
+        Invalid rows are reported in `errors` (with their position in `rows`) and
+        skipped; they never abort the rest of the import. When the same reference
+        appears twice, the last occurrence wins.
+        """
+        errors = []
+        entries = {}
+        received = 0
+        for index, row in enumerate(rows):
+            received += 1
+            try:
+                if not isinstance(row, dict):
+                    raise ValueError("Row must be an object")
+                values = ProductService._coerce_product_row(row)
+            except (ValueError, TypeError) as e:
+                reference = row.get('reference') if isinstance(row, dict) else None
+                errors.append({'index': index, 'reference': reference, 'error': str(e)})
+                continue
+            entries.pop(values['reference'], None)
+            entries[values['reference']] = (index, values)
+
+        entries = list(entries.values())
+        now = datetime.utcnow()
+        upserted = 0
+        table = Product.__table__
+        for start in range(0, len(entries), batch_size):
+            chunk = entries[start:start + batch_size]
+            upserted += ProductService._upsert_chunk(chunk, now, errors)
+            db.session.commit()
+            references = [values['reference'] for _, values in chunk]
+            ids = db.session.execute(db.select(table.c.id).where(table.c.reference.in_(references))).scalars().all()
+            cache.invalidate('product', *ids)
+            if any(ProductService.STOCK_FIELDS.intersection(values) for _, values in chunk):
+                ProductService._queue_low_stock_check(ids)
+
+        search_index.clear()
+        errors.sort(key=lambda error: error['index'])
+        return {'received': received, 'upserted': upserted, 'errors': errors}
+
+    @staticmethod
+    def _coerce_product_row(row):
+        table = Product.__table__
+        values = {}
+        for key, value in row.items():
+            if key not in ProductService.BULK_FIELDS:
+                raise ValueError(f"Unknown field: {key}")
+            if value == '':
+                value = None
+            if value is not None:
+                value = table.c[key].type.python_type(value)
+            values[key] = value
+        missing = [name for name in ProductService.REQUIRED_FIELDS if values.get(name) is None]
+        if missing:
+            raise ValueError(f"Missing required fields: {', '.join(missing)}")
+        return values
+
+    @staticmethod
+    def _upsert_statement(keys):
+        dialect = db.engine.dialect.name
+        if dialect == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert
+        elif dialect == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            raise RuntimeError(f"Bulk upsert is not supported on {dialect}")
+        statement = insert(Product.__table__)
+        update = {key: statement.excluded[key] for key in keys if key != 'reference'}
+        update['updated_at'] = statement.excluded.updated_at
+        return statement.on_conflict_do_update(index_elements=['reference'], set_=update)
+
+    @staticmethod
+    def _upsert_chunk(chunk, now, errors):
+        # executemany needs identical keys per parameter set, so group rows by the columns they provide
+        groups = defaultdict(list)
+        for index, values in chunk:
+            groups[tuple(sorted(values))].append((index, dict(values, created_at=now, updated_at=now)))
+
+        upserted = 0
+        for keys, group in groups.items():
+            statement = ProductService._upsert_statement(keys)
+            try:
+                with db.session.begin_nested():
+                    db.session.execute(statement, [values for _, values in group])
+                upserted += len(group)
+            except SQLAlchemyError:
+                # Retry row by row so a single bad line does not sink the rest of the chunk
+                for index, values in group:
+                    try:
+                        with db.session.begin_nested():
+                            db.session.execute(statement, values)
+                        upserted += 1
+                    except SQLAlchemyError as e:
+                        errors.append({
+                            'index': index,
+                            'reference': values['reference'],
+                            'error': str(getattr(e, 'orig', None) or e)
+                        })
+        return upserted
+
+    @staticmethod
+    def _is_low_stock(product):
+        return (product.stock_quantity is not None and product.min_stock_level is not None
+                and product.stock_quantity < product.min_stock_level)
+
+    @staticmethod
+    def _queue_low_stock_check(product_ids):
+        try:
+            # Called on the request path: fail fast instead of retrying an unreachable broker
+            evaluate_low_stock.apply_async(args=[list(product_ids)], retry=False)
+        except Exception as e:
+            logger.warning(f"Could not queue low stock check for {len(product_ids)} product(s): {e}")
+
     @staticmethod
     def get_product_by_id(product_id):
         return Product.query.get(product_id)
 
+    @staticmethod
+    def get_product_dict(product_id):
+        """Serialized product, served from the cache when possible."""
+        def load():
+            # The cache outlives replication lag, so never fill it from the replica
+            with reading_primary():
+                product = Product.query.get(product_id)
+                return product.to_dict() if product else None
+        return cache.get_or_load('product', product_id, load)
+
     @staticmethod
     def create_product(**kwargs):
         product = Product(**kwargs)
         db.session.add(product)
         db.session.commit()
+        ProductService._index_product(product)
         return product
 
     @staticmethod
@@ -22,9 +301,16 @@ class ProductService:
         product = Product.query.get(product_id)
         if not product:
             raise ValueError("Product not found")
+        was_low = ProductService._is_low_stock(product)
         for key, value in kwargs.items():
             setattr(product, key, value)
+        # Only a change that pushes the product below its minimum needs an alert
+        became_low = not was_low and ProductService._is_low_stock(product)
         db.session.commit()
+        cache.invalidate('product', product_id)
+        ProductService._index_product(product)
+        if became_low and ProductService.STOCK_FIELDS.intersection(kwargs):
+            ProductService._queue_low_stock_check([product_id])
         return product
 
     @staticmethod
@@ -34,3 +320,5 @@ class ProductService:
             raise ValueError("Product not found")
         db.session.delete(product)
         db.session.commit()
+        cache.invalidate('product', product_id)
+        search_index.remove(product_id)
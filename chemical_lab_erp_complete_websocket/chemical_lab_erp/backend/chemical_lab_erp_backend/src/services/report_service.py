@@ -0,0 +1,191 @@
+import hashlib
+import uuid
+from datetime import datetime, timedelta
+from flask import current_app
+from models.order import Order
+from models.product import Product
+from models.report_job import ReportJob
+from models.supplier import Supplier
+from main import db
+from services.order_service import CANCELLED
+from utils.http_cache import table_versions
+from utils.serialization import dumps
+
+PENDING, RUNNING, SUCCEEDED, FAILED = 'pending', 'running', 'succeeded', 'failed'
+
+def _parse_date(value, name):
+    if not value:
+        raise ValueError(f"'{name}' is required")
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"'{name}' must be an ISO 8601 date or datetime")
+
+def _valuation_params(data):
+    return {}
+
+def _consumption_params(data):
+    start, end = _parse_date(data.get('start'), 'start'), _parse_date(data.get('end'), 'end')
+    if end <= start:
+        raise ValueError("'end' must be after 'start'")
+    return {'start': start.isoformat(), 'end': end.isoformat()}
+
+def _rows(statement):
+    return [dict(row) for row in db.session.execute(statement).mappings()]
+
+class ReportService:
+    # A pending or running job older than this is presumed lost (worker killed) and not reused
+    STALE_AFTER = timedelta(minutes=15)
+
+    @staticmethod
+    def inventory_valuation():
+        """Stock value (unit_price * stock_quantity) per category, per supplier and in total.
+
+        Products without a price or a stock level add nothing to the value.
+        """
+        p, s = Product.__table__, Supplier.__table__
+        products = db.func.count(p.c.id).label('products')
+        quantity = db.func.coalesce(db.func.sum(p.c.stock_quantity), 0).label('stock_quantity')
+        value = db.func.coalesce(db.func.sum(p.c.unit_price * p.c.stock_quantity), 0).label('value')
+        return {
+            'by_category': _rows(
+                db.select(p.c.category, products, quantity, value)
+                .group_by(p.c.category).order_by(value.desc(), p.c.category)
+            ),
+            'by_supplier': _rows(
+                db.select(s.c.id.label('supplier_id'), s.c.name.label('supplier'), products, quantity, value)
+                .select_from(p.join(s, p.c.supplier_id == s.c.id))
+                .group_by(s.c.id, s.c.name).order_by(value.desc(), s.c.id)
+            ),
+            'total': _rows(db.select(products, value))[0],
+        }
+
+    @staticmethod
+    def order_consumption(start, end):
+        """Quantities ordered in [start, end), cancelled orders excluded, per product, category and day.
+
+        `value` prices the quantities at the products' current unit_price.
+        """
+        o, p = Order.__table__, Product.__table__
+        source = o.join(p, o.c.product_id == p.c.id)
+        window = db.and_(o.c.order_date >= start, o.c.order_date < end,
+                         db.func.coalesce(o.c.status, '') != CANCELLED)
+        orders = db.func.count(o.c.id).label('orders')
+        quantity = db.func.coalesce(db.func.sum(o.c.quantity), 0).label('quantity')
+        value = db.func.coalesce(db.func.sum(o.c.quantity * p.c.unit_price), 0).label('value')
+        day = db.func.date(o.c.order_date).label('day')
+        by_day = _rows(db.select(day, orders, quantity, value).select_from(source).where(window)
+                       .group_by(day).order_by(day))
+        for row in by_day:
+            # PostgreSQL returns a date, SQLite a string
+            row['day'] = str(row['day'])
+        return {
+            'start': start.isoformat(),
+            'end': end.isoformat(),
+            'by_product': _rows(
+                db.select(p.c.id.label('product_id'), p.c.name, p.c.reference, p.c.category, orders, quantity, value)
+                .select_from(source).where(window)
+                .group_by(p.c.id, p.c.name, p.c.reference, p.c.category).order_by(quantity.desc(), p.c.id)
+            ),
+            'by_category': _rows(
+                db.select(p.c.category, orders, quantity, value).select_from(source).where(window)
+                .group_by(p.c.category).order_by(quantity.desc(), p.c.category)
+            ),
+            'by_day': by_day,
+        }
+
+    # kind -> (tables whose changes invalidate the result, params parser, runner)
+    REPORTS = {
+        'inventory_valuation': (
+            (Product.__table__, Supplier.__table__),
+            _valuation_params,
+            lambda params: ReportService.inventory_valuation(),
+        ),
+        'order_consumption': (
+            (Order.__table__, Product.__table__),
+            _consumption_params,
+            lambda params: ReportService.order_consumption(
+                datetime.fromisoformat(params['start']), datetime.fromisoformat(params['end'])
+            ),
+        ),
+    }
+
+    @staticmethod
+    def _fingerprint(tables):
+        versions = [(name, count, newest.isoformat() if newest else '')
+                    for name, count, newest in table_versions(db.session, *tables)]
+        return hashlib.sha1(dumps(versions).encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def request_report(kind, data):
+        """The job for report `kind` with `data`'s parameters, and whether it was newly created.
+
+        A run that succeeded, or is still in flight and not stale, for the same
+        parameters is reused as long as none of the report's tables changed since
+        it was requested (same row counts and max(updated_at)). Otherwise a new
+        pending job is committed; the caller enqueues it with tasks.reports.run_report.
+        """
+        if kind not in ReportService.REPORTS:
+            raise ValueError(f"Unknown report: {kind}")
+        tables, parse_params, _ = ReportService.REPORTS[kind]
+        params = parse_params(data or {})
+        params_key = hashlib.sha1(dumps(params).encode('utf-8')).hexdigest()
+        fingerprint = ReportService._fingerprint(tables)
+        existing = (ReportJob.query
+                    .filter_by(kind=kind, params_key=params_key, fingerprint=fingerprint)
+                    .filter(db.or_(
+                        ReportJob.status == SUCCEEDED,
+                        db.and_(ReportJob.status.in_((PENDING, RUNNING)),
+                                ReportJob.created_at >= datetime.utcnow() - ReportService.STALE_AFTER),
+                    ))
+                    .order_by(ReportJob.created_at.desc())
+                    .first())
+        if existing is not None:
+            return existing, False
+        job = ReportJob(id=uuid.uuid4().hex, kind=kind, params=params, params_key=params_key,
+                        fingerprint=fingerprint, status=PENDING)
+        db.session.add(job)
+        db.session.commit()
+        return job, True
+
+    @staticmethod
+    def get_job(job_id):
+        # The worker updates the row from another session; never answer from the identity map
+        return db.session.get(ReportJob, job_id, populate_existing=True)
+
+    @staticmethod
+    def run_job(job_id):
+        """Compute and store the result of a pending job; called from the Celery worker."""
+        job = db.session.get(ReportJob, job_id)
+        if job is None or job.status not in (PENDING, RUNNING):
+            return job
+        job.status, job.started_at = RUNNING, datetime.utcnow()
+        db.session.commit()
+        _, _, run = ReportService.REPORTS[job.kind]
+        try:
+            ReportService._extend_statement_timeout()
+            job.result = run(job.params)
+            job.status = SUCCEEDED
+        except Exception as e:
+            db.session.rollback()
+            job = db.session.get(ReportJob, job_id)
+            job.status, job.error = FAILED, str(e)
+        job.finished_at = datetime.utcnow()
+        db.session.commit()
+        return job
+
+    @staticmethod
+    def _extend_statement_timeout():
+        # Reports scan whole tables; the DB_STATEMENT_TIMEOUT_MS meant for requests would cancel them.
+        # set_config(..., true) is SET LOCAL: it ends with the transaction, the pooled connection keeps the default.
+        timeout = current_app.config.get('REPORT_STATEMENT_TIMEOUT_MS')
+        if timeout and db.engine.dialect.name == 'postgresql':
+            db.session.execute(db.text("SELECT set_config('statement_timeout', :timeout, true)"),
+                               {'timeout': str(int(timeout))})
+
+    @staticmethod
+    def fail_job(job_id, error):
+        job = db.session.get(ReportJob, job_id)
+        if job is not None:
+            job.status, job.error, job.finished_at = FAILED, error, datetime.utcnow()
+            db.session.commit()
@@ -0,0 +1,69 @@
+from models.supplier import Supplier
+from main import db
+from utils.cache import cache
+from utils.serialization import row_serializer
+from utils.database import reading_primary
+
+_serialize_row = row_serializer(list(Supplier.__table__.columns))
+
+class SupplierService:
+    FIELDS = tuple(c.key for c in Supplier.__table__.columns)
+
+    @staticmethod
+    def get_all_suppliers(as_rows=False):
+        """All suppliers as ORM instances, or with `as_rows` as to_dict()-shaped dicts built from plain rows."""
+        if as_rows:
+            table = Supplier.__table__
+            result = db.session.execute(db.select(*table.c).order_by(table.c.id))
+            return [_serialize_row(row) for row in result]
+        return Supplier.query.all()
+
+    @staticmethod
+    def iter_suppliers(fields=None, batch_size=1000):
+        table = Supplier.__table__
+        names = list(fields) if fields else list(SupplierService.FIELDS)
+        query = db.select(*[table.c[name] for name in names]).order_by(table.c.id)
+        return db.session.execute(query.execution_options(yield_per=batch_size)).mappings()
+
+    @staticmethod
+    def get_supplier_by_id(supplier_id):
+        return Supplier.query.get(supplier_id)
+
+    @staticmethod
+    def get_supplier_dict(supplier_id):
+        def load():
+            # The cache outlives replication lag, so never fill it from the replica
+            with reading_primary():
+                supplier = Supplier.query.get(supplier_id)
+                return supplier.to_dict() if supplier else None
+        return cache.get_or_load('supplier', supplier_id, load)
+
+    @staticmethod
+    def create_supplier(**kwargs):
+        supplier = Supplier(**kwargs)
+        db.session.add(supplier)
+        db.session.commit()
+        return supplier
+
+    @staticmethod
+    def update_supplier(supplier_id, **kwargs):
+        supplier = Supplier.query.get(supplier_id)
+        if not supplier:
+            raise ValueError("Supplier not found")
+        for key, value in kwargs.items():
+            setattr(supplier, key, value)
+        db.session.commit()
+        cache.invalidate('supplier', supplier_id)
+        return supplier
+
+    @staticmethod
+    def delete_supplier(supplier_id):
+        supplier = Supplier.query.get(supplier_id)
+        if not supplier:
+            raise ValueError("Supplier not found")
+        # Products go with their supplier (delete-orphan), so their cached copies must too
+        product_ids = [product.id for product in supplier.products]
+        db.session.delete(supplier)
+        db.session.commit()
+        cache.invalidate('supplier', supplier_id)
+        cache.invalidate('product', *product_ids)
@@ -0,0 +1,93 @@
+from datetime import datetime, timedelta
+from models.order import Order
+from models.product import Product
+from models.supplier import Supplier
+from models.tombstone import Tombstone
+from main import db
+from utils.pagination import encode_cursor, decode_cursor
+from utils.serialization import row_serializer
+
+class SyncTokenExpired(Exception):
+    """The token predates the tombstone retention window; the client must resync from scratch."""
+
+class SyncService:
+    # Response key, table and compiled row serializer for each synced collection
+    STREAMS = tuple(
+        (key, model.__table__, row_serializer(list(model.__table__.columns)))
+        for key, model in (('products', Product), ('suppliers', Supplier), ('orders', Order))
+    )
+    # Rows written less than this long ago are left for the next sync, so a transaction
+    # that stamped updated_at before we read but committed after is not skipped
+    SAFETY_WINDOW = timedelta(seconds=2)
+    TOMBSTONE_RETENTION = timedelta(days=30)
+
+    @staticmethod
+    def _decode_token(token):
+        count = len(SyncService.STREAMS) + 1
+        if not token:
+            return [(None, None)] * count
+        values = decode_cursor(token, [datetime, int] * count)
+        return [(values[i], values[i + 1]) for i in range(0, len(values), 2)]
+
+    @staticmethod
+    def _scan(table, time_column, position, until, limit):
+        """Rows with (time, id) after `position` and time <= `until`, oldest first, via the (time, id) index."""
+        time_col, id_col = table.c[time_column], table.c.id
+        query = db.select(*table.c).where(time_col <= until)
+        since, last_id = position
+        if since is not None:
+            if last_id is None:
+                query = query.where(time_col > since)
+            else:
+                query = query.where(db.tuple_(time_col, id_col) > db.tuple_(since, last_id))
+        rows = db.session.execute(query.order_by(time_col, id_col).limit(limit + 1)).all()
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            return rows, (getattr(last, time_column), last.id), True
+        # Exhausted up to `until`: the next sync starts strictly after it
+        return rows, (until, None), False
+
+    @staticmethod
+    def changes_since(token=None, limit=500, now=None):
+        """Changed rows and deleted ids since `token`, plus the token to send next time.
+
+        Each collection is read with a keyset scan over its (updated_at, id) index,
+        so the cost follows the number of changes rather than the table size. When
+        any collection has more than `limit` changes, `has_more` is set and the
+        returned token continues where this page stopped.
+        """
+        positions = SyncService._decode_token(token)
+        now = now or datetime.utcnow()
+        tombstone_since = positions[-1][0]
+        if tombstone_since is not None and tombstone_since < now - SyncService.TOMBSTONE_RETENTION:
+            raise SyncTokenExpired("Sync token has expired, start a full sync")
+        until = now - SyncService.SAFETY_WINDOW
+
+        result = {'deleted': {}}
+        next_positions = []
+        has_more = False
+        for (key, table, serialize), position in zip(SyncService.STREAMS, positions):
+            rows, next_position, more = SyncService._scan(table, 'updated_at', position, until, limit)
+            result[key] = [serialize(row) for row in rows]
+            result['deleted'][key] = []
+            next_positions.append(next_position)
+            has_more = has_more or more
+
+        rows, next_position, more = SyncService._scan(Tombstone.__table__, 'deleted_at', positions[-1], until, limit)
+        for row in rows:
+            result['deleted'][row.entity].append(row.entity_id)
+        next_positions.append(next_position)
+
+        result['has_more'] = has_more or more
+        result['next'] = encode_cursor([value for position in next_positions for value in position])
+        return result
+
+    @staticmethod
+    def purge_tombstones(now=None):
+        """Drop tombstones older than the retention window; tokens that old get SyncTokenExpired."""
+        cutoff = (now or datetime.utcnow()) - SyncService.TOMBSTONE_RETENTION
+        table = Tombstone.__table__
+        deleted = db.session.execute(table.delete().where(table.c.deleted_at < cutoff)).rowcount
+        db.session.commit()
+        return deleted
@@ -1,7 +1,10 @@
 from models.user import User
 from main import db
-from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime
+from utils.cache import cache
+from utils.database import reading_primary
+from utils.passwords import password_hasher
+from utils.auth import token_verifier
 
 class UserService:
     @staticmethod
@@ -17,17 +20,25 @@ class UserService:
             role=role,
             created_at=datetime.utcnow()
         )
-        user.password_hash = generate_password_hash(password)
+        user.password_hash = password_hasher.hash(password)
         db.session.add(user)
         db.session.commit()
         return user
 
     @staticmethod
     def authenticate(username, password):
+        """Raises HashingOverloaded when the hashing pool is saturated."""
         user = User.query.filter_by(username=username).first()
-        if user and check_password_hash(user.password_hash, password):
+        if not user:
+            return None
+        ok, new_hash = password_hasher.verify_and_update(password, user.password_hash)
+        if ok:
+            if new_hash is not None:
+                # Stored with an older scheme or cost: upgrade transparently now that we know the password
+                user.password_hash = new_hash
             user.last_login = datetime.utcnow()
             db.session.commit()
+            cache.invalidate('user', user.id)
             return user
         return None
 
@@ -35,14 +46,50 @@ class UserService:
     def get_user_by_id(user_id):
         return User.query.get(user_id)
 
+    @staticmethod
+    def get_user_dict(user_id):
+        def load():
+            # The cache outlives replication lag, so never fill it from the replica
+            with reading_primary():
+                user = User.query.get(user_id)
+                return user.to_dict() if user else None
+        return cache.get_or_load('user', user_id, load)
+
+    @staticmethod
+    def apply_presence(changes):
+        """Write a batch of presence transitions ({user_id: (is_online, unix_time)}) in two executemany UPDATEs.
+
+        Coming online also moves last_login to the time the first socket joined.
+        """
+        users = User.__table__
+        online = [{'uid': user_id, 'seen': datetime.utcfromtimestamp(at)} for user_id, (is_online, at) in changes.items() if is_online]
+        offline = [{'uid': user_id} for user_id, (is_online, _) in changes.items() if not is_online]
+        if online:
+            db.session.execute(
+                users.update().where(users.c.id == db.bindparam('uid')).values(is_online=True, last_login=db.bindparam('seen')),
+                online
+            )
+        if offline:
+            db.session.execute(users.update().where(users.c.id == db.bindparam('uid')).values(is_online=False), offline)
+        db.session.commit()
+        cache.invalidate('user', *changes)
+        return len(changes)
+
     @staticmethod
     def update_user(user_id, **kwargs):
         user = User.query.get(user_id)
         if not user:
             raise ValueError("User not found")
+        revoke = 'password' in kwargs or 'role' in kwargs or kwargs.get('is_active') is False
+        if 'password' in kwargs:
+            user.password_hash = password_hasher.hash(kwargs.pop('password'))
         for key, value in kwargs.items():
             setattr(user, key, value)
         db.session.commit()
+        cache.invalidate('user', user_id)
+        if revoke:
+            # Issued tokens carry the old role/credentials; force a fresh login
+            token_verifier.revoke_user(user_id)
         return user
 
     @staticmethod
@@ -52,3 +99,5 @@ class UserService:
             raise ValueError("User not found")
         db.session.delete(user)
         db.session.commit()
+        cache.invalidate('user', user_id)
+        token_verifier.revoke_user(user_id)
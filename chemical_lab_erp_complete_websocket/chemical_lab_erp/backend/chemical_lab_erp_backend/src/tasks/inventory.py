@@ -0,0 +1,24 @@
+from main import celery, socketio, db
+from models.product import Product
+from utils.pagination import serialize_row
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+ALERT_FIELDS = ('id', 'name', 'reference', 'category', 'supplier_id', 'stock_quantity', 'min_stock_level')
+
+# Nothing reads the return value; storing it would make every publish touch the result backend too
+@celery.task(name='inventory.evaluate_low_stock', ignore_result=True)
+def evaluate_low_stock(product_ids):
+    """Re-check only the given products and emit a `low_stock` event for each one below its minimum."""
+    table = Product.__table__
+    rows = db.session.execute(
+        db.select(*[table.c[name] for name in ALERT_FIELDS])
+        .where(table.c.id.in_(product_ids))
+        .where(table.c.stock_quantity < table.c.min_stock_level)
+    ).mappings().all()
+    for row in rows:
+        socketio.emit('low_stock', serialize_row(row))
+    if rows:
+        logger.info(f"Emitted low_stock for {len(rows)} product(s)")
+    return [row['id'] for row in rows]
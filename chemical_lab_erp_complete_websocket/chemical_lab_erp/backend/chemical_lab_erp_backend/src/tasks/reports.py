@@ -0,0 +1,16 @@
+from main import celery
+from services.report_service import ReportService
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+@celery.task(name='reports.run_report')
+def run_report(job_id):
+    """Compute a queued report and store its result on the job row; the API only polls it."""
+    job = ReportService.run_job(job_id)
+    if job is None:
+        logger.warning("Report job %s not found", job_id)
+        return None
+    if job.error:
+        logger.error("Report job %s (%s) failed: %s", job_id, job.kind, job.error)
+    return job.status
@@ -0,0 +1,13 @@
+from main import celery
+from services.sync_service import SyncService
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+@celery.task(name='sync.purge_tombstones')
+def purge_tombstones():
+    """Drop tombstones past the retention window; meant to run daily from celery beat."""
+    deleted = SyncService.purge_tombstones()
+    if deleted:
+        logger.info(f"Purged {deleted} tombstone(s)")
+    return deleted
@@ -0,0 +1,162 @@
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+import jwt
+from flask import g, jsonify, request
+from werkzeug.local import LocalProxy
+
+logger = logging.getLogger(__name__)
+
+class MemoryRevocations:
+    """Revoked token ids plus a per-user "not before" time, kept until the tokens would expire anyway."""
+
+    def __init__(self):
+        self.tokens = {}
+        self.users = {}
+        self.lock = threading.Lock()
+
+    def revoke(self, jti, exp):
+        with self.lock:
+            self.tokens[jti] = exp
+            now = time.time()
+            for revoked, expires_at in list(self.tokens.items()):
+                if expires_at <= now:
+                    del self.tokens[revoked]
+
+    def revoke_user(self, user_id, before):
+        with self.lock:
+            self.users[user_id] = before
+
+    def is_revoked(self, claims):
+        with self.lock:
+            if claims.get('jti') in self.tokens:
+                return True
+            not_before = self.users.get(claims.get('user_id'))
+        return not_before is not None and claims.get('iat', 0) < not_before
+
+class RedisRevocations:
+    """Same checks shared by every worker; keys expire on their own once the tokens could no longer be used."""
+
+    def __init__(self, client, max_age, prefix='revoked:'):
+        self.client = client
+        self.max_age = max_age
+        self.prefix = prefix
+
+    def revoke(self, jti, exp):
+        ttl = max(1, int(exp - time.time()))
+        self.client.set(f"{self.prefix}jti:{jti}", 1, ex=ttl)
+
+    def revoke_user(self, user_id, before):
+        self.client.set(f"{self.prefix}user:{user_id}", before, ex=self.max_age)
+
+    def is_revoked(self, claims):
+        try:
+            revoked, not_before = self.client.mget(
+                f"{self.prefix}jti:{claims.get('jti')}", f"{self.prefix}user:{claims.get('user_id')}"
+            )
+        except Exception as e:
+            logger.warning(f"Revocation backend unavailable: {e}")
+            return False
+        return revoked is not None or (not_before is not None and claims.get('iat', 0) < float(not_before))
+
+class TokenVerifier:
+    """Verifies bearer JWTs once and caches the decoded claims until they expire.
+
+    Entries are keyed by the SHA-256 of the token, so the cache never holds
+    usable credentials, and evicted LRU-first beyond `max_entries`. Revocation is
+    checked on every request, hits included.
+    """
+
+    def __init__(self, secret=None, algorithms=('HS256',), max_entries=10000, max_age=86400):
+        self.secret = secret
+        self.algorithms = list(algorithms)
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.revocations = MemoryRevocations()
+
+    def init_app(self, app):
+        config = app.config
+        self.secret = config['SECRET_KEY']
+        self.max_entries = config.get('AUTH_TOKEN_CACHE_SIZE', 10000)
+        self.max_age = config.get('AUTH_TOKEN_MAX_AGE', 86400)
+        redis_url = config.get('AUTH_REVOCATION_REDIS_URL')
+        if redis_url:
+            import redis
+            self.revocations = RedisRevocations(redis.Redis.from_url(redis_url), self.max_age)
+        else:
+            self.revocations = MemoryRevocations()
+        app.before_request(self.load_current_user)
+        app.extensions['token_verifier'] = self
+
+    def encode(self, claims):
+        return jwt.encode(claims, self.secret, algorithm=self.algorithms[0])
+
+    def verify(self, token):
+        """Return the token's claims; raises jwt.InvalidTokenError when it is invalid, expired or revoked."""
+        key = hashlib.sha256(token.encode('utf-8')).digest()
+        now = time.time()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                if entry['exp'] > now:
+                    self.entries.move_to_end(key)
+                else:
+                    del self.entries[key]
+                    entry = None
+        if entry is None:
+            entry = jwt.decode(token, self.secret, algorithms=self.algorithms, options={'require': ['exp']})
+            with self.lock:
+                self.entries[key] = entry
+                while len(self.entries) > self.max_entries:
+                    self.entries.popitem(last=False)
+        if self.revocations.is_revoked(entry):
+            raise jwt.InvalidTokenError("Token has been revoked")
+        return entry
+
+    def revoke(self, claims):
+        self.revocations.revoke(claims.get('jti'), claims['exp'])
+
+    def revoke_user(self, user_id):
+        """Invalidate every token issued to `user_id` so far (password change, deactivation, deletion)."""
+        self.revocations.revoke_user(user_id, time.time())
+
+    def load_current_user(self):
+        g.current_user = None
+        g.auth_error = None
+        header = request.headers.get('Authorization', '')
+        if not header.startswith('Bearer '):
+            return
+        try:
+            g.current_user = self.verify(header[7:].strip())
+        except jwt.InvalidTokenError as e:
+            # Public endpoints ignore a bad token; login_required turns it into a 401
+            g.auth_error = str(e)
+
+token_verifier = TokenVerifier()
+
+# Claims of the authenticated caller for this request, or None
+current_user = LocalProxy(lambda: g.get('current_user'))
+
+def login_required(f):
+    @wraps(f)
+    def wrapped(*args, **kwargs):
+        if g.get('current_user') is None:
+            return jsonify({'error': g.get('auth_error') or 'Authentication required'}), 401
+        return f(*args, **kwargs)
+    return wrapped
+
+def roles_required(*roles):
+    def decorator(f):
+        @wraps(f)
+        @login_required
+        def wrapped(*args, **kwargs):
+            if g.current_user.get('role') not in roles:
+                return jsonify({'error': 'Forbidden'}), 403
+            return f(*args, **kwargs)
+        return wrapped
+    return decorator
@@ -0,0 +1,147 @@
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries also expire after `ttl` seconds."""
+
+    def __init__(self, max_entries=10000, ttl=30):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self.lock:
+            self.entries[key] = (value, time.monotonic() + self.ttl)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def delete(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+class RedisTier:
+    def __init__(self, client, ttl=300, prefix='cache:'):
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def get(self, key):
+        raw = self.client.get(self.prefix + key)
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, key, value):
+        self.client.set(self.prefix + key, json.dumps(value), ex=self.ttl)
+
+    def delete(self, key):
+        self.client.delete(self.prefix + key)
+
+class Cache:
+    """Read-through cache for serialized rows: an in-process TTL+LRU tier in front of optional Redis.
+
+    Each worker has its own local tier, so after an update in another worker a
+    local entry can be stale for at most CACHE_LOCAL_TTL seconds; the Redis tier is
+    invalidated immediately.
+    """
+
+    def __init__(self):
+        self.local = TTLCache()
+        self.remote = None
+        self.enabled = True
+        self.counters = {'hits': 0, 'misses': 0, 'local_hits': 0, 'remote_hits': 0, 'invalidations': 0}
+        self.counter_lock = threading.Lock()
+
+    def init_app(self, app):
+        config = app.config
+        self.enabled = config.get('CACHE_ENABLED', True)
+        self.local = TTLCache(
+            max_entries=config.get('CACHE_MAX_ENTRIES', 10000),
+            ttl=config.get('CACHE_LOCAL_TTL', 30)
+        )
+        redis_url = config.get('CACHE_REDIS_URL')
+        if redis_url:
+            import redis
+            self.remote = RedisTier(redis.Redis.from_url(redis_url), ttl=config.get('CACHE_TTL', 300))
+        app.extensions['cache'] = self
+
+    def _count(self, *names):
+        with self.counter_lock:
+            for name in names:
+                self.counters[name] += 1
+
+    def get_or_load(self, namespace, key, loader):
+        """Return the cached payload for `namespace:key`, calling `loader()` on a miss.
+
+        `loader` returns a JSON-serializable payload, or None when the row does not
+        exist; None is never cached.
+        """
+        if not self.enabled:
+            return loader()
+        cache_key = f"{namespace}:{key}"
+        value = self.local.get(cache_key)
+        if value is not None:
+            self._count('hits', 'local_hits')
+            return value
+        if self.remote is not None:
+            try:
+                value = self.remote.get(cache_key)
+            except Exception as e:
+                logger.warning(f"Cache backend unavailable: {e}")
+            if value is not None:
+                self._count('hits', 'remote_hits')
+                self.local.set(cache_key, value)
+                return value
+        self._count('misses')
+        value = loader()
+        if value is not None:
+            self.local.set(cache_key, value)
+            if self.remote is not None:
+                try:
+                    self.remote.set(cache_key, value)
+                except Exception as e:
+                    logger.warning(f"Cache backend unavailable: {e}")
+        return value
+
+    def invalidate(self, namespace, *keys):
+        for key in keys:
+            cache_key = f"{namespace}:{key}"
+            self.local.delete(cache_key)
+            if self.remote is not None:
+                try:
+                    self.remote.delete(cache_key)
+                except Exception as e:
+                    logger.warning(f"Cache backend unavailable: {e}")
+            self._count('invalidations')
+
+    def stats(self):
+        with self.counter_lock:
+            stats = dict(self.counters)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_ratio'] = stats['hits'] / lookups if lookups else 0.0
+        stats['local_entries'] = len(self.local.entries)
+        stats['redis'] = self.remote is not None
+        return stats
+
+cache = Cache()
@@ -3,10 +3,16 @@ from celery import Celery
 def make_celery(app):
     celery = Celery(
         app.import_name,
-        backend='redis://localhost:6379/0',
-        broker='redis://localhost:6379/0'
+        backend=app.config.get('TASKS_RESULT_BACKEND', 'redis://localhost:6379/0'),
+        broker=app.config.get('TASKS_BROKER_URL', 'redis://localhost:6379/0')
     )
     celery.conf.update(app.config)
+    # Runs tasks in-process, e.g. for tests or a single-node setup without a broker
+    celery.conf.task_always_eager = app.config.get('TASKS_ALWAYS_EAGER', False)
+    # Publishing happens inside requests; bound how long an unreachable broker can stall one
+    publish_timeout = app.config.get('TASKS_PUBLISH_TIMEOUT', 2)
+    celery.conf.broker_connection_timeout = publish_timeout
+    celery.conf.broker_transport_options = {'socket_connect_timeout': publish_timeout}
     TaskBase = celery.Task
 
     class ContextTask(TaskBase):
@@ -0,0 +1,56 @@
+import gzip
+from flask import request
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_TYPES = ('application/json', 'application/x-ndjson', 'text/csv', 'text/plain', 'text/html')
+
+class Compression:
+    """Compresses large buffered responses with brotli (when installed) or gzip, per Accept-Encoding.
+
+    Streamed exports are left alone: compressing them here would buffer the
+    whole body and defeat the streaming.
+    """
+
+    def __init__(self):
+        self.min_size = 1024
+        self.gzip_level = 6
+        self.brotli_quality = 4
+
+    def init_app(self, app):
+        config = app.config
+        self.min_size = config.get('COMPRESS_MIN_SIZE', 1024)
+        self.gzip_level = config.get('COMPRESS_GZIP_LEVEL', 6)
+        self.brotli_quality = config.get('COMPRESS_BROTLI_QUALITY', 4)
+        if config.get('COMPRESS_ENABLED', True):
+            app.after_request(self.compress_response)
+        app.extensions['compression'] = self
+
+    def choose_encoding(self, accept_encoding):
+        if brotli is not None and accept_encoding['br'] > 0:
+            return 'br'
+        if accept_encoding['gzip'] > 0:
+            return 'gzip'
+        return None
+
+    def compress(self, data, encoding):
+        if encoding == 'br':
+            return brotli.compress(data, quality=self.brotli_quality)
+        return gzip.compress(data, compresslevel=self.gzip_level, mtime=0)
+
+    def compress_response(self, response):
+        if (response.status_code != 200 or response.direct_passthrough or response.is_streamed
+                or 'Content-Encoding' in response.headers or response.mimetype not in COMPRESSIBLE_TYPES):
+            return response
+        response.vary.add('Accept-Encoding')
+        encoding = self.choose_encoding(request.accept_encodings)
+        if encoding is None or (response.content_length or 0) < self.min_size:
+            return response
+        response.set_data(self.compress(response.get_data(), encoding))
+        response.headers['Content-Encoding'] = encoding
+        return response
+
+compression = Compression()
@@ -0,0 +1,151 @@
+import threading
+from contextlib import contextmanager
+from functools import wraps
+from time import perf_counter
+from flask import current_app, g, has_app_context, has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import create_engine, exc
+from sqlalchemy.pool import QueuePool
+from sqlalchemy.sql.dml import UpdateBase
+from utils.monitoring import Histogram, histogram_lines
+
+# Checkout wait upper bounds in seconds; an uncontended checkout takes microseconds
+WAIT_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+class PoolMetrics:
+    """Checkout wait histograms, timeout counts and current pool gauges, per named engine."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pools = {}
+        self.waits = {}
+        self.timeouts = {}
+
+    def register(self, name, pool):
+        with self.lock:
+            # engine.dispose() recreates the pool under the same name
+            self.pools[name] = pool
+            self.waits.setdefault(name, Histogram(WAIT_BUCKETS))
+            self.timeouts.setdefault(name, 0)
+
+    def record_wait(self, name, seconds, timed_out=False):
+        with self.lock:
+            self.waits[name].observe(seconds)
+            if timed_out:
+                self.timeouts[name] += 1
+
+    def stats(self):
+        with self.lock:
+            return {
+                name: {
+                    'size': pool.size(),
+                    'checked_out': pool.checkedout(),
+                    'overflow': pool.overflow(),
+                    'checkouts': self.waits[name].count,
+                    'timeouts': self.timeouts[name],
+                    'wait_p99_ms': (self.waits[name].quantile(0.99) or 0.0) * 1000,
+                }
+                for name, pool in self.pools.items()
+            }
+
+    def render_prometheus(self):
+        with self.lock:
+            names = sorted(self.pools)
+            lines = list(histogram_lines(
+                'db_pool_checkout_wait_seconds', 'Time spent waiting for a pooled connection.',
+                [({'pool': name}, self.waits[name]) for name in names]
+            ))
+            lines.append('# TYPE db_pool_checkout_timeouts_total counter')
+            lines.extend(f'db_pool_checkout_timeouts_total{{pool="{name}"}} {self.timeouts[name]}' for name in names)
+            for gauge, read in (('size', QueuePool.size), ('checked_out', QueuePool.checkedout),
+                                ('overflow', QueuePool.overflow)):
+                lines.append(f'# TYPE db_pool_{gauge} gauge')
+                lines.extend(f'db_pool_{gauge}{{pool="{name}"}} {read(self.pools[name])}' for name in names)
+        return '\n'.join(lines) + '\n'
+
+pool_metrics = PoolMetrics()
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited, including when it timed out.
+
+    The wait also covers opening a new connection when the pool has to grow.
+    """
+
+    def __init__(self, creator, **kwargs):
+        super().__init__(creator, **kwargs)
+        self.metrics_name = kwargs.get('logging_name') or 'default'
+        pool_metrics.register(self.metrics_name, self)
+
+    def _do_get(self):
+        start = perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            pool_metrics.record_wait(self.metrics_name, perf_counter() - start, timed_out=True)
+            raise
+        pool_metrics.record_wait(self.metrics_name, perf_counter() - start)
+        return connection
+
+def engine_options(config, uri, name='primary'):
+    """create_engine() keyword arguments for `uri` from the DB_* settings in `config`.
+
+    SQLite keeps SQLAlchemy's defaults, whose pools do not take these settings.
+    """
+    if uri.startswith('sqlite'):
+        return {}
+    options = {
+        'poolclass': TimedQueuePool,
+        'pool_logging_name': name,
+        'pool_size': config['DB_POOL_SIZE'],
+        'max_overflow': config['DB_MAX_OVERFLOW'],
+        'pool_timeout': config['DB_POOL_TIMEOUT'],
+        # Keep below PgBouncer's server_lifetime and idle timeouts so we retire connections first
+        'pool_recycle': config['DB_POOL_RECYCLE'],
+        # One cheap round trip per checkout instead of an error on the first query after a restart
+        'pool_pre_ping': config['DB_POOL_PRE_PING'],
+    }
+    timeout = config.get('DB_STATEMENT_TIMEOUT_MS')
+    if timeout and uri.startswith('postgresql'):
+        # Sent as a startup parameter; behind PgBouncer in transaction mode set it on the role instead
+        options['connect_args'] = {'options': f'-c statement_timeout={int(timeout)}'}
+    return options
+
+def init_replica(app):
+    """Create the read-replica engine from SQLALCHEMY_REPLICA_URI, if configured."""
+    uri = app.config.get('SQLALCHEMY_REPLICA_URI')
+    app.extensions['db_replica'] = create_engine(uri, **engine_options(app.config, uri, 'replica')) if uri else None
+
+def primary_only(f):
+    """Serve a GET from the primary, for views that cannot tolerate replication lag."""
+    @wraps(f)
+    def wrapped(*args, **kwargs):
+        g.use_primary = True
+        return f(*args, **kwargs)
+    return wrapped
+
+@contextmanager
+def reading_primary():
+    """Route the reads inside the block to the primary, e.g. to fill a shared cache."""
+    if not has_app_context():
+        yield
+        return
+    previous = g.get('use_primary', False)
+    g.use_primary = True
+    try:
+        yield
+    finally:
+        g.use_primary = previous
+
+class RoutingSession(Session):
+    """Sends the reads of GET/HEAD requests to the replica engine when one is configured.
+
+    Flushes and INSERT/UPDATE/DELETE statements always go to the primary, as does
+    everything outside a request (Celery tasks, background flushers, scripts).
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and not isinstance(clause, UpdateBase) and has_request_context():
+            replica = current_app.extensions.get('db_replica')
+            if replica is not None and request.method in ('GET', 'HEAD') and not g.get('use_primary'):
+                return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
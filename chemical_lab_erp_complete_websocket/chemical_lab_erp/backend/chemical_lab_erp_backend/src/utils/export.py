@@ -0,0 +1,58 @@
+import csv
+import io
+from datetime import datetime
+from flask import Response, stream_with_context
+from utils.serialization import dumps
+
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+def parse_format(value):
+    """The ?format= of a collection request: 'json' (the default) or one of EXPORT_FORMATS."""
+    fmt = value or 'json'
+    if fmt != 'json' and fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Invalid format: {fmt} (expected json, {', '.join(EXPORT_FORMATS)})")
+    return fmt
+
+def _csv_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+def generate_ndjson(rows):
+    # dumps() writes datetimes as ISO 8601 itself
+    for row in rows:
+        yield dumps(dict(row)) + '\n'
+
+def generate_csv(rows, fields, chunk_size=500):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fields)
+    pending = 0
+    for row in rows:
+        writer.writerow([_csv_value(row[name]) for name in fields])
+        pending += 1
+        if pending >= chunk_size:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    yield buffer.getvalue()
+
+def export_response(rows, fields, fmt, filename):
+    """Stream `rows` (an iterable of mappings) as NDJSON or CSV without buffering the result set.
+
+    The generator runs inside the request context, so the server-side cursor behind
+    `rows` stays open until the last byte has been written.
+    """
+    if fmt == 'csv':
+        body = generate_csv(rows, fields)
+    else:
+        body = generate_ndjson(rows)
+    response = Response(stream_with_context(body), mimetype=EXPORT_FORMATS[fmt])
+    response.headers['Content-Disposition'] = f'attachment; filename={filename}.{fmt}'
+    return response
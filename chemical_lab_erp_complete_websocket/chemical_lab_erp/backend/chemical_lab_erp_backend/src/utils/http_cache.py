@@ -0,0 +1,111 @@
+import hashlib
+import logging
+from datetime import datetime, timezone
+from functools import wraps
+from flask import current_app, jsonify, make_response, request
+from sqlalchemy import func, select
+
+logger = logging.getLogger(__name__)
+
+def _etag(*parts):
+    return hashlib.sha1('|'.join(str(part) for part in parts).encode('utf-8')).hexdigest()[:20]
+
+def _as_utc(value):
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    # updated_at columns hold naive UTC (datetime.utcnow)
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+def table_versions(session, *tables):
+    """(table name, row count, last change) per table, one aggregate query each.
+
+    The last change is max(updated_at), or the newest tombstone for the table when
+    a delete came later, so deletes move Last-Modified too. The row count is in the
+    ETag as well. Neither aggregate materializes rows.
+    """
+    versions = []
+    for table in tables:
+        columns = [func.max(table.c.updated_at), func.count()]
+        tombstones = table.metadata.tables.get('tombstones')
+        if tombstones is not None and tombstones is not table:
+            columns.append(select(func.max(tombstones.c.deleted_at))
+                           .where(tombstones.c.entity == table.name).scalar_subquery())
+        row = session.execute(select(*columns).select_from(table)).one()
+        changes = [value for value in (row[0], *row[2:]) if value is not None]
+        versions.append((table.name, row[1], max(changes) if changes else None))
+    return versions
+
+def collection_validators(*tables):
+    """ETag and Last-Modified for the current request over `tables`, from their table_versions().
+
+    The query string is part of the ETag, so every page/field selection validates separately.
+    """
+    parts = [request.path, request.query_string.decode('utf-8', 'replace')]
+    last_modified = None
+    session = current_app.extensions['sqlalchemy'].session
+    for name, count, newest in table_versions(session, *tables):
+        parts.extend((name, count, newest.isoformat() if newest else ''))
+        newest = _as_utc(newest)
+        if newest is not None and (last_modified is None or newest > last_modified):
+            last_modified = newest
+    return _etag(*parts), last_modified
+
+def is_not_modified(etag, last_modified):
+    if request.if_none_match:
+        # If-None-Match wins over If-Modified-Since (RFC 9110 13.2.2)
+        return request.if_none_match.contains_weak(etag)
+    since = request.if_modified_since
+    return since is not None and last_modified is not None and last_modified.replace(microsecond=0) <= since
+
+def not_modified_response(etag, last_modified):
+    response = make_response('', 304)
+    return add_validators(response, etag, last_modified)
+
+def add_validators(response, etag, last_modified):
+    # Weak: the same representation may be sent gzip- or brotli-encoded
+    response.set_etag(etag, weak=True)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    # Clients may keep the body but must revalidate before using it
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+def conditional_collection(*tables, expand=None):
+    """Answer 304 for an unchanged collection before the view loads any rows.
+
+    `expand` maps `?expand=` names to the extra table whose changes show up in
+    the embedded objects, or None when that relationship has no updated_at and
+    the response cannot be validated.
+    """
+    def decorator(f):
+        @wraps(f)
+        def wrapped(*args, **kwargs):
+            watched = list(tables)
+            for name in filter(None, (n.strip() for n in request.args.get('expand', '').split(','))):
+                table = (expand or {}).get(name)
+                if table is None:
+                    return f(*args, **kwargs)
+                watched.append(table)
+            try:
+                etag, last_modified = collection_validators(*watched)
+            except Exception as e:
+                logger.warning(f"Could not compute validators for {request.path}: {e}")
+                return f(*args, **kwargs)
+            if is_not_modified(etag, last_modified):
+                return not_modified_response(etag, last_modified)
+            response = make_response(f(*args, **kwargs))
+            if response.status_code == 200:
+                add_validators(response, etag, last_modified)
+            return response
+        return wrapped
+    return decorator
+
+def item_response(kind, data):
+    """jsonify(data) for one serialized row, or 304 when the client already has this version."""
+    etag = _etag(kind, data['id'], data.get('updated_at'), request.query_string.decode('utf-8', 'replace'))
+    last_modified = _as_utc(data.get('updated_at'))
+    if is_not_modified(etag, last_modified):
+        return not_modified_response(etag, last_modified)
+    return add_validators(jsonify(data), etag, last_modified)
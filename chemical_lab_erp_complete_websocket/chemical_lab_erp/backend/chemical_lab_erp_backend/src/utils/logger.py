@@ -1,19 +1,113 @@
+import atexit
+import datetime as dt
 import logging
+import queue
+import random
+import sys
+from logging.handlers import QueueHandler, QueueListener
+from utils.serialization import dumps
 
-def setup_logger(name):
-    logger = logging.getLogger(name)
-    logger.setLevel(logging.DEBUG)
+# Attributes every LogRecord has; anything else was passed through `extra=` and is emitted as a field
+_RECORD_ATTRIBUTES = frozenset(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime', 'taskName'}
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message, any `extra=` fields and the traceback.
+
+    Records logged with `extra={'sample': key}` also get the `sample_rate` they
+    were kept at, so counts can be scaled back up.
+    """
+
+    def __init__(self, sample_rates=None):
+        super().__init__()
+        self.sample_rates = sample_rates or {}
+
+    def format(self, record):
+        entry = {
+            'time': dt.datetime.fromtimestamp(record.created, dt.timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = value
+        if 'sample' in entry:
+            entry['sample_rate'] = self.sample_rates.get(entry['sample'], 1.0)
+        if record.exc_info:
+            entry['exc_info'] = self.formatException(record.exc_info)
+        try:
+            return dumps(entry)
+        except TypeError:
+            return dumps({key: value if isinstance(value, (str, int, float, bool, type(None))) else repr(value)
+                          for key, value in entry.items()})
+
+class _QueueHandler(QueueHandler):
+    def prepare(self, record):
+        # Same-process queue: merge the arguments now (cheap, and safe if they are mutated
+        # later) but leave exc_info so the traceback is rendered on the listener thread
+        record.msg = record.message = record.getMessage()
+        record.args = None
+        return record
+
+_sample_rates = {}
+
+def sampled(key):
+    """Whether to log this occurrence of high-volume message `key` (see LOG_SAMPLE_RATES).
 
-    # Console handler
-    ch = logging.StreamHandler()
-    ch.setLevel(logging.DEBUG)
+    Checked before the logging call, so a skipped message costs no LogRecord.
+    Keys without a configured rate are always logged.
+    """
+    rate = _sample_rates.get(key)
+    return rate is None or rate >= 1 or random.random() < rate
 
-    # Formatter
-    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-    ch.setFormatter(formatter)
+def parse_sample_rates(value):
+    """'request=0.1,chat.room=0.5' -> {'request': 0.1, 'chat.room': 0.5}"""
+    rates = {}
+    for item in filter(None, (part.strip() for part in (value or '').split(','))):
+        key, _, rate = item.partition('=')
+        rates[key.strip()] = float(rate)
+    return rates
 
-    # Add handler
-    if not logger.hasHandlers():
-        logger.addHandler(ch)
+_listener = None
 
-    return logger
+def configure_logging(level='INFO', fmt='json', sample_rates=None, stream=None):
+    """Route every logger through one queue drained by a background thread.
+
+    Callers only build the record and put it on the queue; formatting and the
+    write to `stream` (stdout by default) happen on the listener thread. Calling
+    it again replaces the previous setup. The queue is drained at exit.
+    """
+    global _listener, _sample_rates
+    if _listener is not None:
+        _listener.stop()
+    _sample_rates = dict(sample_rates or {})
+    root = logging.getLogger()
+    for handler in [h for h in root.handlers if isinstance(h, QueueHandler)]:
+        root.removeHandler(handler)
+
+    output = logging.StreamHandler(stream or sys.stdout)
+    if fmt == 'json':
+        output.setFormatter(JsonFormatter(_sample_rates))
+    else:
+        output.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+
+    records = queue.SimpleQueue()
+    root.addHandler(_QueueHandler(records))
+    root.setLevel(level)
+
+    _listener = QueueListener(records, output, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+def stop_logging():
+    """Flush queued records and stop the listener thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+atexit.register(stop_logging)
+
+def setup_logger(name):
+    # Level and output come from configure_logging() on the root logger
+    return logging.getLogger(name)
@@ -1,16 +1,291 @@
+import cProfile
 import logging
-from flask import request
-from time import time
+import pstats
+import threading
+from bisect import bisect_left
+from time import perf_counter
+from flask import g, has_app_context, has_request_context, jsonify, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from utils.auth import token_verifier
+from utils.logger import sampled
+
+logger = logging.getLogger(__name__)
+# One line per request; fast successful ones are sampled with the 'request' rate of LOG_SAMPLE_RATES
+access_logger = logging.getLogger('access')
+
+# Histogram upper bounds in seconds (Prometheus `le`), log-spaced from 1 ms to 10 s
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.0075, 0.01, 0.025, 0.05, 0.075,
+                   0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0)
+
+class Histogram:
+    """Fixed-bucket histogram; percentiles are interpolated inside the bucket holding the rank."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q):
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                if i == len(self.buckets):
+                    # Beyond the last bound: all we know is that it is larger
+                    return self.buckets[-1]
+                lower = self.buckets[i - 1] if i else 0.0
+                return lower + (self.buckets[i] - lower) * (rank - seen) / count
+            seen += count
+        return self.buckets[-1]
+
+    def cumulative(self):
+        total = 0
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            total += count
+            yield bound, total
+
+class QueryStats:
+    """SQL issued while serving the current request; `statements` is only kept when profiling."""
+
+    __slots__ = ('count', 'seconds', 'statements')
+
+    def __init__(self, keep_statements=False):
+        self.count = 0
+        self.seconds = 0.0
+        self.statements = [] if keep_statements else None
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _labels(**labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + '}'
+
+def histogram_lines(name, help_text, histograms):
+    """Prometheus text lines for `histograms`, an iterable of (labels dict, Histogram) pairs."""
+    yield f'# HELP {name} {help_text}'
+    yield f'# TYPE {name} histogram'
+    for labels, histogram in histograms:
+        for bound, total in histogram.cumulative():
+            le = '+Inf' if bound == float('inf') else repr(bound)
+            yield f'{name}_bucket{_labels(**labels, le=le)} {total}'
+        yield f'{name}_sum{_labels(**labels)} {histogram.sum!r}'
+        yield f'{name}_count{_labels(**labels)} {histogram.count}'
+
+class RequestMetrics:
+    """Per-process request latency, status and SQL counters, keyed by URL rule rather than raw path."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+        self.slow_query_threshold = 0.2
+        self.slow_request_threshold = 1.0
+        self.profile_roles = ('Admin',)
+        self.profile_limit = 40
+
+    def reset(self):
+        with self.lock:
+            self.latency = {}
+            self.responses = {}
+            self.queries = {}
+            self.slow_queries = 0
+
+    def observe(self, method, endpoint, status, duration, query_stats):
+        key = (method, endpoint)
+        with self.lock:
+            histogram = self.latency.get(key)
+            if histogram is None:
+                histogram = self.latency[key] = Histogram()
+            histogram.observe(duration)
+            status_key = (method, endpoint, status)
+            self.responses[status_key] = self.responses.get(status_key, 0) + 1
+            count, seconds = self.queries.get(key, (0, 0.0))
+            self.queries[key] = (count + query_stats.count, seconds + query_stats.seconds)
+
+    def record_slow_query(self):
+        with self.lock:
+            self.slow_queries += 1
+
+    def summary(self):
+        """Count, p50/p95/p99 latency and average SQL per endpoint, slowest p95 first."""
+        with self.lock:
+            rows = []
+            for (method, endpoint), histogram in self.latency.items():
+                queries, seconds = self.queries.get((method, endpoint), (0, 0.0))
+                rows.append({
+                    'method': method,
+                    'endpoint': endpoint,
+                    'count': histogram.count,
+                    'p50_ms': histogram.quantile(0.5) * 1000,
+                    'p95_ms': histogram.quantile(0.95) * 1000,
+                    'p99_ms': histogram.quantile(0.99) * 1000,
+                    'avg_queries': queries / histogram.count,
+                    'avg_db_ms': seconds / histogram.count * 1000,
+                })
+            slow_queries = self.slow_queries
+        rows.sort(key=lambda row: row['p95_ms'], reverse=True)
+        return {'endpoints': rows, 'slow_queries': slow_queries}
+
+    def render_prometheus(self, gauges=None):
+        """Prometheus text exposition (format 0.0.4); `gauges` maps extra metric names to values."""
+        lines = []
+        with self.lock:
+            lines.extend(histogram_lines(
+                'http_request_duration_seconds', 'Request latency by endpoint.',
+                [({'method': method, 'endpoint': endpoint}, histogram)
+                 for (method, endpoint), histogram in sorted(self.latency.items())]
+            ))
+            lines.append('# HELP http_requests_total Responses by endpoint and status code.')
+            lines.append('# TYPE http_requests_total counter')
+            for (method, endpoint, status), count in sorted(self.responses.items()):
+                lines.append(f'http_requests_total{_labels(method=method, endpoint=endpoint, status=status)} {count}')
+            lines.append('# HELP db_queries_total SQL statements executed while serving each endpoint.')
+            lines.append('# TYPE db_queries_total counter')
+            for (method, endpoint), (count, _) in sorted(self.queries.items()):
+                lines.append(f'db_queries_total{_labels(method=method, endpoint=endpoint)} {count}')
+            lines.append('# HELP db_query_duration_seconds_total Time spent in SQL while serving each endpoint.')
+            lines.append('# TYPE db_query_duration_seconds_total counter')
+            for (method, endpoint), (_, seconds) in sorted(self.queries.items()):
+                lines.append(f'db_query_duration_seconds_total{_labels(method=method, endpoint=endpoint)} {seconds!r}')
+            lines.append('# HELP db_slow_queries_total Statements slower than the slow query threshold.')
+            lines.append('# TYPE db_slow_queries_total counter')
+            lines.append(f'db_slow_queries_total {self.slow_queries}')
+        for name, value in (gauges or {}).items():
+            lines.append(f'# TYPE {name} gauge')
+            lines.append(f'{name} {float(value)!r}')
+        return '\n'.join(lines) + '\n'
+
+request_metrics = RequestMetrics()
+
+# Only one cProfile profiler can be active per process on recent Pythons
+_profile_lock = threading.Lock()
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._monitoring_start = perf_counter()
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = getattr(context, '_monitoring_start', None)
+    if start is None:
+        return
+    elapsed = perf_counter() - start
+    if has_request_context():
+        stats = g.get('query_stats')
+        if stats is not None:
+            stats.count += 1
+            stats.seconds += elapsed
+            if stats.statements is not None:
+                stats.statements.append({'statement': statement, 'duration_ms': elapsed * 1000})
+    if elapsed >= request_metrics.slow_query_threshold:
+        request_metrics.record_slow_query()
+        logger.warning(
+            "Slow query (%.1f ms)%s: %s parameters=%.500r",
+            elapsed * 1000, f" on {request.method} {request.path}" if has_request_context() else '',
+            statement, parameters
+        )
+
+def _profile_allowed():
+    # Runs ahead of the token verifier's own hook; verification is cached, so the second pass is cheap
+    token_verifier.load_current_user()
+    claims = g.get('current_user')
+    return claims is not None and claims.get('role') in request_metrics.profile_roles
+
+def _profile_response(profiler, response, duration, query_stats):
+    stats = pstats.Stats(profiler)
+    functions = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)
+    return jsonify({
+        'method': request.method,
+        'path': request.full_path,
+        'status': response.status_code,
+        'duration_ms': duration * 1000,
+        'sql': {
+            'queries': query_stats.count,
+            'duration_ms': query_stats.seconds * 1000,
+            'statements': query_stats.statements,
+        },
+        'profile': [
+            {
+                'function': f"{filename}:{line}({name})",
+                'calls': calls,
+                'primitive_calls': primitive_calls,
+                'self_ms': self_time * 1000,
+                'cumulative_ms': cumulative * 1000,
+            }
+            for (filename, line, name), (primitive_calls, calls, self_time, cumulative, _) in functions[:request_metrics.profile_limit]
+        ],
+    })
 
 def setup_monitoring(app):
+    """Per-endpoint latency histograms, per-request SQL counts and a slow query log.
+
+    Every response carries a Server-Timing header with its SQL count and time.
+    An admin can add `?_profile=1` to any request to get a cProfile breakdown of
+    it, plus the statements it ran, instead of the normal body.
+    """
+    request_metrics.slow_query_threshold = app.config.get('SLOW_QUERY_THRESHOLD_MS', 200) / 1000.0
+    request_metrics.slow_request_threshold = app.config.get('SLOW_REQUEST_THRESHOLD_MS', 1000) / 1000.0
+    request_metrics.profile_roles = tuple(app.config.get('PROFILE_ROLES', ('Admin',)))
+    request_metrics.profile_limit = app.config.get('PROFILE_FUNCTION_LIMIT', 40)
+    # On the Engine class, so every engine (replicas included) is instrumented
+    if not event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+
     @app.before_request
     def start_timer():
-        request.start_time = time()
+        g.request_start = perf_counter()
+        g.profiler = None
+        profiling = request.args.get('_profile') == '1' and _profile_allowed()
+        g.query_stats = QueryStats(keep_statements=profiling)
+        if profiling and _profile_lock.acquire(blocking=False):
+            g.profiler = cProfile.Profile()
+            g.profiler.enable()
 
     @app.after_request
     def log_request(response):
-        if not hasattr(request, 'start_time'):
+        start = g.get('request_start')
+        if start is None:
             return response
-        duration = time() - request.start_time
-        logging.info(f"{request.method} {request.path} {response.status_code} {duration:.4f}s")
+        profiler = g.pop('profiler', None)
+        if profiler is not None:
+            profiler.disable()
+            _profile_lock.release()
+        duration = perf_counter() - start
+        query_stats = g.query_stats
+        endpoint = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        request_metrics.observe(request.method, endpoint, response.status_code, duration, query_stats)
+        if access_logger.isEnabledFor(logging.INFO):
+            # Errors and slow responses are always logged; only fast successes are sampled
+            fields = {'method': request.method, 'path': request.path,
+                      'status': response.status_code, 'duration_ms': round(duration * 1000, 2)}
+            if response.status_code >= 400 or duration >= request_metrics.slow_request_threshold:
+                access_logger.info("%s %s %s %.4fs", request.method, request.path, response.status_code, duration,
+                                   extra=fields)
+            elif sampled('request'):
+                access_logger.info("%s %s %s %.4fs", request.method, request.path, response.status_code, duration,
+                                   extra=dict(fields, sample='request'))
+        if profiler is not None:
+            response = _profile_response(profiler, response, duration, query_stats)
+        response.headers['Server-Timing'] = (
+            f'db;dur={query_stats.seconds * 1000:.2f};desc="{query_stats.count} queries", '
+            f'app;dur={duration * 1000:.2f}'
+        )
         return response
+
+    @app.teardown_request
+    def stop_profiler(exc):
+        # after_request is skipped when an exception propagates; never leave the profiler running
+        profiler = g.pop('profiler', None) if has_app_context() else None
+        if profiler is not None:
+            profiler.disable()
+            _profile_lock.release()
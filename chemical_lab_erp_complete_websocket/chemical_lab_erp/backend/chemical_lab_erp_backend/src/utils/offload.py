@@ -0,0 +1,75 @@
+import logging
+from flask import current_app
+
+logger = logging.getLogger(__name__)
+
+# eventlet is not supported: its native thread pool deadlocks on monkey-patched locks as soon
+# as two offloaded database calls overlap
+SUPPORTED_MODES = ('threading', 'gevent')
+GREEN_MODES = ('gevent',)
+
+def resolve_async_mode(mode):
+    """The Socket.IO async mode for SOCKETIO_ASYNC_MODE `mode`.
+
+    Unset means gevent when the process is already gevent-patched (e.g. under
+    gunicorn -k gevent) and threading otherwise, rather than Flask-SocketIO's
+    auto-detection, which picks eventlet whenever it is installed.
+    """
+    if mode is None:
+        try:
+            from gevent import monkey
+        except ImportError:
+            return 'threading'
+        return 'gevent' if monkey.is_module_patched('socket') else 'threading'
+    if mode not in SUPPORTED_MODES:
+        raise ValueError(f"Unsupported SOCKETIO_ASYNC_MODE {mode!r}; use one of: {', '.join(SUPPORTED_MODES)}")
+    return mode
+
+class BlockingExecutor:
+    """Runs blocking database work off the event loop when Socket.IO runs on gevent.
+
+    In those modes every handler is a green thread on one hub, so a blocking
+    SQLAlchemy call stalls every client connected to the worker until it returns.
+    `call()` hands the function to the hub's pool of native threads and yields
+    until it finishes. In threading mode the function runs on the calling thread.
+    Either way it runs in a fresh app context, with its own session, so it should
+    return plain data rather than ORM instances.
+    """
+
+    def __init__(self):
+        self.app = None
+        self.async_mode = 'threading'
+        self.threads = 20
+
+    def init_app(self, app, async_mode):
+        self.app = app
+        self.async_mode = async_mode
+        self.threads = app.config.get('DB_OFFLOAD_THREADS', 20)
+        if async_mode == 'gevent':
+            import gevent
+            gevent.get_hub().threadpool.maxsize = self.threads
+        if self.green:
+            logger.info(f"Offloading blocking calls to {self.threads} native threads ({async_mode})")
+        app.extensions['db_executor'] = self
+
+    @property
+    def green(self):
+        return self.async_mode in GREEN_MODES
+
+    def native(self, fn, *args, **kwargs):
+        """Run `fn` on a native thread in gevent mode (inline otherwise), without an app context."""
+        if self.async_mode == 'gevent':
+            import gevent
+            return gevent.get_hub().threadpool.apply(fn, args, kwargs)
+        return fn(*args, **kwargs)
+
+    def call(self, fn, *args, **kwargs):
+        app = self.app or current_app._get_current_object()
+
+        def run():
+            with app.app_context():
+                return fn(*args, **kwargs)
+
+        return self.native(run)
+
+db_executor = BlockingExecutor()
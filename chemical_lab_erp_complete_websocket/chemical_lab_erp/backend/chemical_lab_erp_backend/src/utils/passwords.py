@@ -0,0 +1,134 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import bcrypt
+from werkzeug.security import check_password_hash
+
+class HashingOverloaded(Exception):
+    """Raised when the hashing queue is full; callers answer 503 instead of waiting."""
+
+class PasswordHasher:
+    """Runs bcrypt off the request thread in a bounded pool.
+
+    bcrypt (and werkzeug's hashlib-based pbkdf2/scrypt) release the GIL while
+    hashing, so a thread pool gives real parallelism without pickling overhead.
+    At most `workers + max_queue` jobs are admitted; anything beyond that fails
+    fast with HashingOverloaded so a login storm cannot pile up behind the pool.
+
+    Under gevent the pool's threads would be green threads, and bcrypt would
+    hold the hub for the whole hash. Given a gevent BlockingExecutor,
+    jobs run on the hub's native threads instead, `workers` at a time.
+    """
+
+    def __init__(self, rounds=12, workers=None, max_queue=None, timeout=10.0):
+        self.rounds = rounds
+        self.workers = workers or os.cpu_count() or 2
+        self.max_queue = self.workers * 8 if max_queue is None else max_queue
+        self.timeout = timeout
+        self.executor = None
+        self.offload = None
+        self.slots = threading.BoundedSemaphore(self.workers + self.max_queue)
+        self.running = threading.BoundedSemaphore(self.workers)
+        self.lock = threading.Lock()
+        self.counters = {'submitted': 0, 'shed': 0, 'rehashed': 0}
+
+    def init_app(self, app, offload=None):
+        config = app.config
+        self.shutdown()
+        self.rounds = config.get('PASSWORD_BCRYPT_ROUNDS', 12)
+        self.workers = config.get('PASSWORD_HASH_WORKERS') or os.cpu_count() or 2
+        max_queue = config.get('PASSWORD_HASH_MAX_QUEUE')
+        self.max_queue = self.workers * 8 if max_queue is None else max_queue
+        self.timeout = config.get('PASSWORD_HASH_TIMEOUT', 10.0)
+        self.slots = threading.BoundedSemaphore(self.workers + self.max_queue)
+        self.running = threading.BoundedSemaphore(self.workers)
+        self.offload = offload if offload is not None and offload.green else None
+        app.extensions['password_hasher'] = self
+
+    def _submit(self, fn, *args):
+        if not self.slots.acquire(blocking=False):
+            with self.lock:
+                self.counters['shed'] += 1
+            raise HashingOverloaded("Password hashing queue is full")
+        if self.offload is not None:
+            return self._run_native(fn, *args)
+        with self.lock:
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='password-hash')
+            self.counters['submitted'] += 1
+        slots = self.slots
+        future = self.executor.submit(fn, *args)
+        future.add_done_callback(lambda _: slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except TimeoutError:
+            raise HashingOverloaded("Password hashing timed out")
+
+    def _run_native(self, fn, *args):
+        with self.lock:
+            self.counters['submitted'] += 1
+        try:
+            # Green semaphore: waiting here yields to the hub
+            if not self.running.acquire(timeout=self.timeout):
+                raise HashingOverloaded("Password hashing timed out")
+            try:
+                return self.offload.native(fn, *args)
+            finally:
+                self.running.release()
+        finally:
+            self.slots.release()
+
+    def _hash(self, password):
+        return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds=self.rounds)).decode('utf-8')
+
+    def _verify(self, password, hashed):
+        if hashed.startswith('$2'):
+            return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
+        # Legacy werkzeug hashes (pbkdf2:/scrypt:) are still accepted and upgraded on login
+        return check_password_hash(hashed, password)
+
+    def needs_rehash(self, hashed):
+        if not hashed.startswith('$2'):
+            return True
+        try:
+            return int(hashed.split('$')[2]) != self.rounds
+        except (IndexError, ValueError):
+            return True
+
+    def _verify_and_update(self, password, hashed):
+        if not self._verify(password, hashed):
+            return False, None
+        if self.needs_rehash(hashed):
+            return True, self._hash(password)
+        return True, None
+
+    def hash(self, password):
+        return self._submit(self._hash, password)
+
+    def verify(self, password, hashed):
+        return self._submit(self._verify, password, hashed)
+
+    def verify_and_update(self, password, hashed):
+        """Check `password`; returns (ok, new_hash), where new_hash is set when the stored hash is outdated.
+
+        Both steps run in one pool job so a rehash costs no extra queue slot.
+        """
+        ok, new_hash = self._submit(self._verify_and_update, password, hashed)
+        if new_hash is not None:
+            with self.lock:
+                self.counters['rehashed'] += 1
+        return ok, new_hash
+
+    def stats(self):
+        with self.lock:
+            stats = dict(self.counters)
+        stats.update(workers=self.workers, max_queue=self.max_queue, rounds=self.rounds)
+        return stats
+
+    def shutdown(self):
+        with self.lock:
+            executor, self.executor = self.executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+password_hasher = PasswordHasher()
@@ -0,0 +1,236 @@
+import json
+import threading
+import time
+from collections import defaultdict
+
+class MemoryPresence:
+    """Connected Socket.IO sids per user and per room, held in this process.
+
+    Every event is O(1); `expire` scans the live sessions once per sweep. Users
+    coming online or going offline are recorded in `changes` for the periodic
+    database write-back.
+    """
+
+    def __init__(self, ttl=60):
+        self.ttl = ttl
+        self.sessions = {}
+        self.user_sids = defaultdict(set)
+        self.room_sids = defaultdict(dict)
+        self.expiries = {}
+        self.changes = {}
+        self.lock = threading.Lock()
+
+    def join(self, sid, room, user_id, username, now):
+        with self.lock:
+            session = self.sessions.get(sid)
+            if session is None:
+                session = self.sessions[sid] = {'user_id': user_id, 'username': username, 'rooms': set()}
+                sids = self.user_sids[user_id]
+                sids.add(sid)
+                if len(sids) == 1:
+                    self.changes[user_id] = (True, now)
+            session['rooms'].add(room)
+            self.room_sids[room][sid] = (session['user_id'], session['username'])
+            self.expiries[sid] = now + self.ttl
+
+    def leave(self, sid, room, now):
+        with self.lock:
+            session = self.sessions.get(sid)
+            if session is None:
+                return
+            session['rooms'].discard(room)
+            self._drop_from_room(sid, room)
+
+    def heartbeat(self, sid, now):
+        with self.lock:
+            if sid in self.sessions:
+                self.expiries[sid] = now + self.ttl
+                return True
+            return False
+
+    def refresh(self, sids, now):
+        """Push back the expiry of every tracked sid in `sids` (sockets still connected to this worker)."""
+        with self.lock:
+            for sid in sids:
+                if sid in self.sessions:
+                    self.expiries[sid] = now + self.ttl
+
+    def disconnect(self, sid, now):
+        with self.lock:
+            self._disconnect(sid, now)
+
+    def expire(self, now):
+        with self.lock:
+            expired = [sid for sid, expires_at in self.expiries.items() if expires_at <= now]
+            for sid in expired:
+                self._disconnect(sid, now)
+            return expired
+
+    def room_members(self, room):
+        with self.lock:
+            members = {}
+            for user_id, username in self.room_sids.get(room, {}).values():
+                members[user_id] = username
+        return [{'user_id': user_id, 'username': username} for user_id, username in members.items()]
+
+    def drain_changes(self):
+        with self.lock:
+            changes, self.changes = self.changes, {}
+        return changes
+
+    def _drop_from_room(self, sid, room):
+        members = self.room_sids.get(room)
+        if members is not None:
+            members.pop(sid, None)
+            if not members:
+                del self.room_sids[room]
+
+    def _disconnect(self, sid, now):
+        session = self.sessions.pop(sid, None)
+        self.expiries.pop(sid, None)
+        if session is None:
+            return
+        for room in session['rooms']:
+            self._drop_from_room(sid, room)
+        sids = self.user_sids.get(session['user_id'])
+        if sids is not None:
+            sids.discard(sid)
+            if not sids:
+                del self.user_sids[session['user_id']]
+                self.changes[session['user_id']] = (False, now)
+
+class RedisPresence:
+    """The same bookkeeping in Redis, so every worker sees every connection.
+
+    Keys: `<prefix>sid:<sid>` (hash: user_id, username, rooms), `<prefix>user:<id>`
+    (set of sids), `<prefix>room:<room>` (hash sid -> member json), `<prefix>expiry`
+    (zset sid -> expiry) and `<prefix>changes` (hash user id -> online flag and time).
+    """
+
+    def __init__(self, client, ttl=60, prefix='presence:'):
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def _key(self, *parts):
+        return self.prefix + ':'.join(str(part) for part in parts)
+
+    def join(self, sid, room, user_id, username, now):
+        session_key = self._key('sid', sid)
+        session = self.client.hgetall(session_key)
+        if not session:
+            pipe = self.client.pipeline()
+            pipe.hset(session_key, mapping={'user_id': user_id, 'username': username, 'rooms': '[]'})
+            pipe.sadd(self._key('user', user_id), sid)
+            pipe.scard(self._key('user', user_id))
+            added, count = pipe.execute()[1:3]
+            if added and count == 1:
+                self.client.hset(self._key('changes'), user_id, json.dumps([True, now]))
+            rooms = []
+        else:
+            user_id, username = int(session[b'user_id']), session[b'username'].decode('utf-8')
+            rooms = json.loads(session[b'rooms'])
+        if room not in rooms:
+            rooms.append(room)
+        pipe = self.client.pipeline()
+        pipe.hset(session_key, 'rooms', json.dumps(rooms))
+        pipe.hset(self._key('room', room), sid, json.dumps({'user_id': user_id, 'username': username}))
+        pipe.zadd(self._key('expiry'), {sid: now + self.ttl})
+        pipe.execute()
+
+    def leave(self, sid, room, now):
+        session_key = self._key('sid', sid)
+        raw = self.client.hget(session_key, 'rooms')
+        if raw is None:
+            return
+        rooms = [r for r in json.loads(raw) if r != room]
+        pipe = self.client.pipeline()
+        pipe.hset(session_key, 'rooms', json.dumps(rooms))
+        pipe.hdel(self._key('room', room), sid)
+        pipe.execute()
+
+    def heartbeat(self, sid, now):
+        return bool(self.client.zadd(self._key('expiry'), {sid: now + self.ttl}, xx=True, ch=True))
+
+    def refresh(self, sids, now):
+        if sids:
+            self.client.zadd(self._key('expiry'), {sid: now + self.ttl for sid in sids}, xx=True)
+
+    def disconnect(self, sid, now):
+        session_key = self._key('sid', sid)
+        session = self.client.hgetall(session_key)
+        self.client.zrem(self._key('expiry'), sid)
+        if not session:
+            return
+        user_id = int(session[b'user_id'])
+        pipe = self.client.pipeline()
+        for room in json.loads(session[b'rooms']):
+            pipe.hdel(self._key('room', room), sid)
+        pipe.delete(session_key)
+        pipe.srem(self._key('user', user_id), sid)
+        pipe.scard(self._key('user', user_id))
+        removed, count = pipe.execute()[-2:]
+        if removed and count == 0:
+            self.client.hset(self._key('changes'), user_id, json.dumps([False, now]))
+
+    def expire(self, now):
+        expired = [sid.decode('utf-8') for sid in self.client.zrangebyscore(self._key('expiry'), '-inf', now)]
+        for sid in expired:
+            self.disconnect(sid, now)
+        return expired
+
+    def room_members(self, room):
+        members = {}
+        for raw in self.client.hvals(self._key('room', room)):
+            member = json.loads(raw)
+            members[member['user_id']] = member['username']
+        return [{'user_id': user_id, 'username': username} for user_id, username in members.items()]
+
+    def drain_changes(self):
+        pipe = self.client.pipeline()
+        pipe.hgetall(self._key('changes'))
+        pipe.delete(self._key('changes'))
+        raw = pipe.execute()[0]
+        return {int(user_id): tuple(json.loads(value)) for user_id, value in raw.items()}
+
+class Presence:
+    """Facade chosen from config (PRESENCE_REDIS_URL) and used by the Socket.IO handlers."""
+
+    def __init__(self):
+        self.backend = MemoryPresence()
+
+    def init_app(self, app):
+        ttl = app.config.get('PRESENCE_TTL', 60)
+        redis_url = app.config.get('PRESENCE_REDIS_URL')
+        if redis_url:
+            import redis
+            self.backend = RedisPresence(redis.Redis.from_url(redis_url), ttl=ttl)
+        else:
+            self.backend = MemoryPresence(ttl=ttl)
+        app.extensions['presence'] = self
+
+    def join(self, sid, room, user_id, username):
+        self.backend.join(sid, room, user_id, username, time.time())
+
+    def leave(self, sid, room):
+        self.backend.leave(sid, room, time.time())
+
+    def heartbeat(self, sid):
+        return self.backend.heartbeat(sid, time.time())
+
+    def refresh(self, sids):
+        self.backend.refresh(sids, time.time())
+
+    def disconnect(self, sid):
+        self.backend.disconnect(sid, time.time())
+
+    def expire(self):
+        return self.backend.expire(time.time())
+
+    def room_members(self, room):
+        return self.backend.room_members(room)
+
+    def drain_changes(self):
+        return self.backend.drain_changes()
+
+presence = Presence()
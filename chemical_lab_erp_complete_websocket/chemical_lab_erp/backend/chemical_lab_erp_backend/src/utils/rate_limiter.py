@@ -1,31 +1,109 @@
+import logging
+import threading
 import time
+import uuid
+from collections import OrderedDict
 from flask import request, jsonify
 from functools import wraps
 
+logger = logging.getLogger(__name__)
+
+class MemoryBackend:
+    """Per-process token buckets, O(1) per hit.
+
+    Buckets live in an LRU-ordered dict. A bucket untouched for a whole period is
+    full again, so dropping it is indistinguishable from keeping it; such buckets
+    are evicted as new hits arrive, and `max_clients` caps the dict regardless.
+    """
+
+    def __init__(self, max_clients=100000):
+        self.max_clients = max_clients
+        self.buckets = OrderedDict()
+        self.lock = threading.Lock()
+
+    def is_allowed(self, key, calls, period):
+        now = time.monotonic()
+        rate = calls / period
+        with self.lock:
+            bucket = self.buckets.pop(key, None)
+            if bucket is None:
+                tokens = float(calls)
+            else:
+                tokens, last = bucket
+                tokens = min(float(calls), tokens + (now - last) * rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self.buckets[key] = (tokens, now)
+            self._evict(now - period)
+            return allowed
+
+    def _evict(self, idle_before):
+        while self.buckets:
+            oldest_key, (_, last) = next(iter(self.buckets.items()))
+            if last > idle_before and len(self.buckets) <= self.max_clients:
+                break
+            del self.buckets[oldest_key]
+
+class RedisBackend:
+    """Sliding window shared by every worker, kept in one Redis sorted set per client."""
+
+    # Trims the window, counts it and records the hit in a single atomic step
+    SCRIPT = """
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now - window)
+if redis.call('ZCARD', KEYS[1]) < tonumber(ARGV[3]) then
+    redis.call('ZADD', KEYS[1], now, ARGV[4])
+    redis.call('PEXPIRE', KEYS[1], window)
+    return 1
+end
+return 0
+"""
+
+    def __init__(self, client=None, url='redis://localhost:6379/0', prefix='ratelimit:'):
+        if client is None:
+            import redis
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self.prefix = prefix
+        self.script = client.register_script(self.SCRIPT)
+
+    def is_allowed(self, key, calls, period):
+        now_ms = int(time.time() * 1000)
+        member = f"{now_ms}-{uuid.uuid4().hex[:12]}"
+        try:
+            return bool(self.script(keys=[self.prefix + key], args=[now_ms, int(period * 1000), calls, member]))
+        except Exception as e:
+            # Fail open: an unreachable Redis should not take the API down with it
+            logger.warning(f"Rate limiter backend unavailable, allowing request: {e}")
+            return True
+
+def make_backend(config):
+    """Build the backend named by RATELIMIT_BACKEND ('memory' or 'redis')."""
+    name = config.get('RATELIMIT_BACKEND', 'memory')
+    if name == 'memory':
+        return MemoryBackend(max_clients=config.get('RATELIMIT_MAX_CLIENTS', 100000))
+    if name == 'redis':
+        return RedisBackend(url=config.get('RATELIMIT_REDIS_URL', 'redis://localhost:6379/0'))
+    raise ValueError(f"Unknown rate limiter backend: {name}")
+
 class RateLimiter:
-    def __init__(self, calls=100, period=60):
+    def __init__(self, calls=100, period=60, backend=None):
         self.calls = calls
         self.period = period
-        self.clients = {}
+        self.backend = backend or MemoryBackend()
 
     def is_allowed(self, client_id):
-        now = time.time()
-        if client_id not in self.clients:
-            self.clients[client_id] = []
-        # Remove timestamps older than period
-        self.clients[client_id] = [t for t in self.clients[client_id] if t > now - self.period]
-        if len(self.clients[client_id]) < self.calls:
-            self.clients[client_id].append(now)
-            return True
-        return False
+        return self.backend.is_allowed(str(client_id), self.calls, self.period)
 
-def rate_limit(calls=100, period=60):
-    limiter = RateLimiter(calls, period)
+def rate_limit(calls=100, period=60, backend=None):
+    limiter = RateLimiter(calls, period, backend)
     def decorator(f):
         @wraps(f)
         def wrapped(*args, **kwargs):
             client_ip = request.remote_addr
-            if not limiter.is_allowed(client_ip):
+            if not limiter.is_allowed(f"{f.__name__}:{client_ip}"):
                 return jsonify({'error': 'Too many requests'}), 429
             return f(*args, **kwargs)
         return wrapped
@@ -0,0 +1,102 @@
+import re
+import threading
+import unicodedata
+from collections import defaultdict
+
+TOKEN_RE = re.compile(r'[a-z0-9]+')
+MIN_PREFIX = 2
+PREFIX_FACTOR = 0.5
+EXACT_BOOST = 10.0
+
+def normalize(text):
+    # NFKC folds subscripts such as 'H₂SO₄' into 'H2SO4' so formulas can be typed plainly
+    return unicodedata.normalize('NFKC', text or '').lower().strip()
+
+def tokenize(text):
+    return TOKEN_RE.findall(normalize(text))
+
+class InvertedIndex:
+    """In-process inverted index, used when the database has no trigram support (e.g. SQLite).
+
+    Every token is stored with its prefixes so that partial words still match. A
+    query matches a document when each of its tokens does; documents are ranked by
+    the summed field weights, with a boost when a whole field equals the query.
+    """
+
+    def __init__(self, weights, exact_fields=()):
+        self.weights = weights
+        self.exact_fields = exact_fields
+        self.postings = defaultdict(dict)
+        self.exact = defaultdict(set)
+        self.documents = {}
+        self.loaded = False
+        self.lock = threading.RLock()
+
+    def add(self, doc_id, fields):
+        with self.lock:
+            self._remove(doc_id)
+            entries = defaultdict(float)
+            for field, weight in self.weights.items():
+                for token in tokenize(fields.get(field)):
+                    entries[token] += weight
+                    for end in range(MIN_PREFIX, len(token)):
+                        entries[token[:end]] += weight * PREFIX_FACTOR
+            exact = set()
+            for field in self.exact_fields:
+                value = normalize(fields.get(field))
+                if value:
+                    exact.add(value)
+            for token, score in entries.items():
+                self.postings[token][doc_id] = score
+            for value in exact:
+                self.exact[value].add(doc_id)
+            self.documents[doc_id] = (tuple(entries), tuple(exact))
+
+    def remove(self, doc_id):
+        with self.lock:
+            self._remove(doc_id)
+
+    def _remove(self, doc_id):
+        tokens, exact = self.documents.pop(doc_id, ((), ()))
+        for token in tokens:
+            postings = self.postings.get(token)
+            if postings is not None:
+                postings.pop(doc_id, None)
+                if not postings:
+                    del self.postings[token]
+        for value in exact:
+            ids = self.exact.get(value)
+            if ids is not None:
+                ids.discard(doc_id)
+                if not ids:
+                    del self.exact[value]
+
+    def clear(self):
+        with self.lock:
+            self.postings.clear()
+            self.exact.clear()
+            self.documents.clear()
+            self.loaded = False
+
+    def search(self, query, limit=20):
+        """Return up to `limit` (doc_id, score) pairs, best first."""
+        with self.lock:
+            scores = None
+            for token in set(tokenize(query)):
+                postings = self.postings.get(token)
+                if not postings:
+                    return []
+                if scores is None:
+                    scores = dict(postings)
+                else:
+                    scores = {doc_id: score + postings[doc_id]
+                              for doc_id, score in scores.items() if doc_id in postings}
+                if not scores:
+                    return []
+            if scores is None:
+                return []
+            for doc_id in self.exact.get(normalize(query), ()):
+                if doc_id in scores:
+                    scores[doc_id] += EXACT_BOOST
+            ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+            return ranked[:limit]
@@ -0,0 +1,130 @@
+import datetime as dt
+import decimal
+import json
+import uuid
+from flask import current_app
+from flask.json.provider import JSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised only where orjson is not installed
+    orjson = None
+
+def _default(value):
+    if isinstance(value, (dt.datetime, dt.date, dt.time)):
+        return value.isoformat()
+    if isinstance(value, decimal.Decimal):
+        return str(value)
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if hasattr(value, 'to_dict'):
+        return value.to_dict()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+if orjson is not None:
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+    def dumps_bytes(obj):
+        return orjson.dumps(obj, default=_default, option=_ORJSON_OPTIONS)
+
+    def dumps(obj):
+        return dumps_bytes(obj).decode('utf-8')
+
+    loads = orjson.loads
+else:
+    def dumps(obj):
+        return json.dumps(obj, default=_default, ensure_ascii=False, separators=(',', ':'))
+
+    def dumps_bytes(obj):
+        return dumps(obj).encode('utf-8')
+
+    loads = json.loads
+
+class FastJSONProvider(JSONProvider):
+    """Flask JSON provider backed by orjson when it is installed, the stdlib otherwise.
+
+    Datetimes are written as ISO 8601 (Flask's default provider uses HTTP dates)
+    and keys keep their insertion order instead of being sorted.
+    """
+
+    mimetype = 'application/json'
+
+    def dumps(self, obj, **kwargs):
+        return dumps(obj)
+
+    def loads(self, s, **kwargs):
+        return loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(dumps_bytes(obj), mimetype=self.mimetype)
+
+class SocketIOJSON:
+    """`json` module stand-in for python-socketio, which calls dumps(obj, separators=...)."""
+
+    @staticmethod
+    def dumps(obj, *args, **kwargs):
+        return dumps(obj)
+
+    @staticmethod
+    def loads(s, *args, **kwargs):
+        return loads(s)
+
+_TEMPORAL_TYPES = (dt.datetime, dt.date, dt.time)
+
+def _is_temporal(column):
+    try:
+        return issubclass(column.type.python_type, _TEMPORAL_TYPES)
+    except NotImplementedError:
+        return False
+
+def _dict_literal(columns, read):
+    items = []
+    for column in columns:
+        value = read(column.key)
+        if _is_temporal(column):
+            items.append(f"{column.key!r}: (_v.isoformat() if (_v := {value}) is not None else None)")
+        else:
+            items.append(f"{column.key!r}: {value}")
+    return '{' + ', '.join(items) + '}'
+
+def model_serializer(model, exclude=()):
+    """Compile `obj -> dict` for `model`'s columns once, instead of walking them per row.
+
+    The generated function is a single dict literal. Loaded instances are read
+    straight from their `__dict__`, skipping the instrumented attribute
+    descriptors; expired or deferred ones (a missing key) fall back to attribute
+    access so the ORM can load them. Temporal columns are converted with
+    isoformat() inline, and keys follow the table's column order, which is what
+    the hand-written to_dict() methods returned.
+    """
+    columns = [column for column in model.__table__.columns if column.key not in exclude]
+    source = (
+        "def serialize(obj):\n"
+        "    state = obj.__dict__\n"
+        "    try:\n"
+        f"        return {_dict_literal(columns, lambda key: f'state[{key!r}]')}\n"
+        "    except KeyError:\n"
+        f"        return {_dict_literal(columns, lambda key: f'obj.{key}')}\n"
+    )
+    namespace = {}
+    exec(compile(source, f"<serializer {model.__name__}>", 'exec'), namespace)
+    serialize = namespace['serialize']
+    serialize.fields = [column.key for column in columns]
+    return serialize
+
+def row_serializer(columns, offset=0):
+    """Compile `row -> dict` for result rows whose values for `columns` start at position `offset`.
+
+    Used by the read-only list paths, which select plain column tuples instead of
+    hydrating ORM instances; the output matches the model's to_dict().
+    """
+    positions = {column.key: offset + i for i, column in enumerate(columns)}
+    source = f"def serialize(row):\n    return {_dict_literal(columns, lambda key: f'row[{positions[key]}]')}\n"
+    namespace = {}
+    exec(compile(source, '<row serializer>', 'exec'), namespace)
+    return namespace['serialize']
+
+def row_mode(endpoint):
+    """Whether list `endpoint` serves plain rows instead of ORM instances (ROW_MODE_ENDPOINTS)."""
+    return endpoint in current_app.config.get('ROW_MODE_ENDPOINTS', ())
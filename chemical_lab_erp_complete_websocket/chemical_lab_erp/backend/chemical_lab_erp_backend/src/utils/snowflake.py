@@ -0,0 +1,137 @@
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+# 2024-01-01T00:00:00Z; 41 bits of milliseconds from here last until 2093
+EPOCH_MS = 1704067200000
+# 41 + 5 + 7 = 53 bits, so ids stay exact as JavaScript numbers
+WORKER_BITS = 5
+SEQUENCE_BITS = 7
+MAX_SEQUENCE = (1 << SEQUENCE_BITS) - 1
+MAX_WORKERS = 1 << WORKER_BITS
+
+class WorkerIdLease:
+    """One of the MAX_WORKERS worker ids, held in Redis with a TTL and renewed in the background.
+
+    Each process (gunicorn worker, Celery worker) takes the first free id with
+    SET NX, so no two live processes share one. If a renewal finds the key gone
+    or owned by someone else, a new id is leased before the next id is issued.
+    """
+    KEY = 'snowflake:worker:{}'
+
+    def __init__(self, client, ttl=60):
+        self.client = client
+        self.ttl = ttl
+        self.token = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.worker_id = None
+        self.lost = threading.Event()
+        self.thread = None
+
+    def acquire(self):
+        for worker_id in range(MAX_WORKERS):
+            if self.client.set(self.KEY.format(worker_id), self.token, nx=True, ex=self.ttl):
+                self.worker_id = worker_id
+                self.lost.clear()
+                if self.thread is None:
+                    self.thread = threading.Thread(target=self._renew, name='snowflake-lease', daemon=True)
+                    self.thread.start()
+                return worker_id
+        raise RuntimeError(f"All {MAX_WORKERS} snowflake worker ids are leased")
+
+    def renew(self):
+        key = self.KEY.format(self.worker_id)
+        owner = self.client.get(key)
+        if isinstance(owner, bytes):
+            owner = owner.decode('utf-8')
+        if owner != self.token or not self.client.set(key, self.token, xx=True, ex=self.ttl):
+            logger.error("Lost snowflake worker id %s lease, a new one will be leased", self.worker_id)
+            self.lost.set()
+
+    def _renew(self):
+        while True:
+            time.sleep(self.ttl / 3)
+            try:
+                self.renew()
+            except Exception as e:
+                logger.warning("Could not renew snowflake worker id lease: %s", e)
+
+class SnowflakeGenerator:
+    """Integer ids that sort by creation time: timestamp | worker id | per-millisecond sequence.
+
+    The worker id must be unique per process: either set explicitly
+    (SNOWFLAKE_WORKER_ID) or leased from Redis (SNOWFLAKE_REDIS_URL). With
+    neither, init_app() falls back to worker id 0 and warns, which is only safe
+    for a single process. A generator that was never configured raises in
+    next_id() rather than guess.
+    """
+
+    def __init__(self, worker_id=None):
+        self.worker_id = None
+        self.lease = None
+        self.pid = None
+        self.last_ms = -1
+        self.sequence = 0
+        self.lock = threading.Lock()
+        if worker_id is not None:
+            self.configure(worker_id)
+
+    def init_app(self, app):
+        worker_id = app.config.get('SNOWFLAKE_WORKER_ID')
+        redis_url = app.config.get('SNOWFLAKE_REDIS_URL')
+        if worker_id is not None:
+            self.configure(worker_id)
+        elif redis_url:
+            import redis
+            self.lease = WorkerIdLease(redis.Redis.from_url(redis_url), ttl=app.config.get('SNOWFLAKE_LEASE_TTL', 60))
+            # Leased lazily so processes forked after import (gunicorn --preload) each get their own
+            self.worker_id, self.pid = None, None
+        else:
+            logger.warning("Neither SNOWFLAKE_WORKER_ID nor SNOWFLAKE_REDIS_URL is set: using snowflake worker id 0. "
+                           "This is only safe with a single process; ids will collide across several workers")
+            self.configure(0)
+        app.extensions['snowflake'] = self
+
+    def configure(self, worker_id):
+        worker_id = int(worker_id)
+        if not 0 <= worker_id < MAX_WORKERS:
+            raise ValueError(f"Snowflake worker id must be between 0 and {MAX_WORKERS - 1}")
+        self.worker_id = worker_id
+        self.lease = None
+
+    def _worker_id(self):
+        if self.lease is not None and (self.pid != os.getpid() or self.lease.lost.is_set()):
+            if self.pid != os.getpid():
+                # A forked child must not keep its parent's lease
+                self.lease = WorkerIdLease(self.lease.client, ttl=self.lease.ttl)
+            self.worker_id = self.lease.acquire()
+            self.pid = os.getpid()
+            logger.info("Leased snowflake worker id %s", self.worker_id)
+        if self.worker_id is None:
+            raise RuntimeError("No snowflake worker id: set SNOWFLAKE_WORKER_ID (unique per process) "
+                               "or SNOWFLAKE_REDIS_URL to lease one")
+        return self.worker_id
+
+    def next_id(self):
+        with self.lock:
+            worker_id = self._worker_id()
+            now = int(time.time() * 1000)
+            # Never go backwards, even if the wall clock does
+            now = max(now, self.last_ms)
+            if now == self.last_ms:
+                self.sequence = (self.sequence + 1) & MAX_SEQUENCE
+                if self.sequence == 0:
+                    now = self.last_ms + 1
+            else:
+                self.sequence = 0
+            self.last_ms = now
+            return ((now - EPOCH_MS) << (WORKER_BITS + SEQUENCE_BITS)) | (worker_id << SEQUENCE_BITS) | self.sequence
+
+snowflake = SnowflakeGenerator()
+
+def next_id():
+    return snowflake.next_id()
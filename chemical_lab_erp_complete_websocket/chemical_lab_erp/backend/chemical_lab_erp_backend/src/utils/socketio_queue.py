@@ -0,0 +1,44 @@
+import pickle
+import queue
+import threading
+from collections import defaultdict
+import socketio
+
+class LocalManager(socketio.PubSubManager):
+    """In-process stand-in for the Redis message queue.
+
+    Every manager created on the same channel in this process receives the
+    others' messages, so several Socket.IO servers in one test run behave like
+    workers sharing a Redis queue. Messages are pickled as Redis would.
+    """
+    name = 'local'
+    subscribers = defaultdict(list)
+    subscribers_lock = threading.Lock()
+
+    def __init__(self, channel='socketio', write_only=False, logger=None):
+        super().__init__(channel=channel, write_only=write_only, logger=logger)
+        self.inbox = queue.Queue()
+        if not write_only:
+            with self.subscribers_lock:
+                self.subscribers[channel].append(self.inbox)
+
+    def _publish(self, data):
+        payload = pickle.dumps(data)
+        with self.subscribers_lock:
+            inboxes = list(self.subscribers[self.channel])
+        for inbox in inboxes:
+            inbox.put(payload)
+
+    def _listen(self):
+        while True:
+            yield self.inbox.get()
+
+def make_client_manager(url, channel='flask-socketio', write_only=False):
+    """Build the Socket.IO client manager for SOCKETIO_MESSAGE_QUEUE; None keeps rooms process-local."""
+    if not url:
+        return None
+    if url.startswith('local://'):
+        return LocalManager(channel=channel, write_only=write_only)
+    if url.startswith(('redis://', 'rediss://', 'unix://')):
+        return socketio.RedisManager(url, channel=channel, write_only=write_only)
+    return socketio.KombuManager(url, channel=channel, write_only=write_only)
@@ -0,0 +1,51 @@
+import threading
+from collections import defaultdict
+
+class TypingTracker:
+    """Coalesces per-keystroke `user_typing` events into one snapshot per room.
+
+    Only changes to the set of people typing in a room matter: repeated
+    "still typing" events just push back that user's expiry, and a room is
+    marked dirty only when someone starts, stops or times out. `collect()`
+    returns the rooms whose set changed since the previous call.
+    """
+
+    def __init__(self, ttl=5.0):
+        self.ttl = ttl
+        self.rooms = defaultdict(dict)
+        self.dirty = set()
+        self.lock = threading.Lock()
+
+    def update(self, room, username, is_typing, now):
+        with self.lock:
+            typers = self.rooms[room]
+            if is_typing:
+                changed = username not in typers
+                typers[username] = now + self.ttl
+            else:
+                changed = typers.pop(username, None) is not None
+            if not typers:
+                del self.rooms[room]
+            if changed:
+                self.dirty.add(room)
+            return changed
+
+    def collect(self, now, refresh=False):
+        """Expire stale typers and return [(room, sorted usernames)] for every room that changed.
+
+        With `refresh`, rooms where someone is still typing are returned too, so
+        clients can tell a quiet source from a dead one and expire its snapshot.
+        """
+        with self.lock:
+            for room, typers in list(self.rooms.items()):
+                expired = [username for username, expires_at in typers.items() if expires_at <= now]
+                for username in expired:
+                    del typers[username]
+                if expired:
+                    self.dirty.add(room)
+                if not typers:
+                    del self.rooms[room]
+            rooms = self.dirty | set(self.rooms) if refresh else self.dirty
+            snapshots = [(room, sorted(self.rooms.get(room, ()))) for room in rooms]
+            self.dirty.clear()
+            return snapshots
@@ -1,7 +1,7 @@
 import re
 
 def validate_email(email):
-    pattern = r'^[\\w\\.-]+@[\\w\\.-]+\\.\\w+$'
+    pattern = r'^[\w\.-]+@[\w\.-]+\.\w+$'
     return re.match(pattern, email) is not None
 
 def validate_username(username):
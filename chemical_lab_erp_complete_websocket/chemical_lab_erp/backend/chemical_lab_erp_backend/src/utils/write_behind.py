@@ -0,0 +1,83 @@
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+class WriteBehindQueue:
+    """Buffers items and hands them to `flush` in batches from a background thread.
+
+    A batch is flushed when `batch_size` items are waiting or `interval_ms` has
+    passed since the last flush, whichever comes first. A failed flush is retried
+    on the next tick; if more than `max_pending` items pile up meanwhile, the
+    oldest are dropped and logged.
+    """
+
+    def __init__(self, flush, batch_size=200, interval_ms=50, max_pending=50000):
+        self.flush_fn = flush
+        self.batch_size = batch_size
+        self.interval = interval_ms / 1000.0
+        self.max_pending = max_pending
+        self.pending = []
+        self.condition = threading.Condition()
+        self.flush_lock = threading.Lock()
+        self.thread = None
+        self.stopped = False
+
+    def start(self):
+        with self.condition:
+            if self.thread is not None and self.thread.is_alive():
+                return
+            self.stopped = False
+            self.thread = threading.Thread(target=self._run, name='write-behind', daemon=True)
+            self.thread.start()
+
+    def put(self, item):
+        with self.condition:
+            self.pending.append(item)
+            if len(self.pending) > self.max_pending:
+                dropped = len(self.pending) - self.max_pending
+                del self.pending[:dropped]
+                logger.error(f"Write-behind queue full, dropped {dropped} item(s)")
+            if len(self.pending) >= self.batch_size:
+                self.condition.notify()
+        if self.thread is None:
+            self.start()
+
+    def flush(self):
+        """Write everything pending now, on the calling thread."""
+        with self.flush_lock:
+            with self.condition:
+                batch, self.pending = self.pending, []
+            if not batch:
+                return 0
+            try:
+                self.flush_fn(batch)
+            except Exception as e:
+                logger.error(f"Write-behind flush of {len(batch)} item(s) failed, will retry: {e}")
+                with self.condition:
+                    self.pending[:0] = batch
+                return 0
+            return len(batch)
+
+    def stop(self):
+        with self.condition:
+            self.stopped = True
+            self.condition.notify()
+        if self.thread is not None:
+            self.thread.join(timeout=5)
+            self.thread = None
+        self.flush()
+
+    def _run(self):
+        while True:
+            with self.condition:
+                deadline = time.monotonic() + self.interval
+                while not self.stopped and len(self.pending) < self.batch_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self.condition.wait(remaining)
+                if self.stopped:
+                    return
+            self.flush()
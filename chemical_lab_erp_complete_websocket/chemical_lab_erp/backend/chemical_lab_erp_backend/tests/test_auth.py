@@ -0,0 +1,73 @@
+import sys
+import os
+import time
+
+# Add the src directory to sys.path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+import jwt
+import pytest
+from main import app, db
+from services.user_service import UserService
+from utils.auth import MemoryRevocations, RedisRevocations, TokenVerifier
+
+@pytest.fixture(scope='module')
+def test_client():
+    app.config['TESTING'] = True
+    with app.test_client() as testing_client:
+        with app.app_context():
+            db.create_all()
+            yield testing_client
+            db.drop_all()
+
+def login(client, username, password):
+    response = client.post('/api/auth/login', json={'username': username, 'password': password})
+    assert response.status_code == 200
+    return {'Authorization': f"Bearer {response.get_json()['token']}"}
+
+def test_decoded_claims_are_cached_until_exp():
+    verifier = TokenVerifier(secret='s', max_entries=2)
+    token = verifier.encode({'user_id': 1, 'jti': 'a', 'iat': time.time(), 'exp': time.time() + 60})
+    assert verifier.verify(token)['user_id'] == 1
+    assert len(verifier.entries) == 1
+    assert verifier.verify(token)['user_id'] == 1
+    for i in range(3):
+        verifier.verify(verifier.encode({'user_id': 2, 'jti': str(i), 'exp': time.time() + 60}))
+    assert len(verifier.entries) == 2
+    with pytest.raises(jwt.InvalidTokenError):
+        verifier.verify(verifier.encode({'user_id': 3, 'exp': time.time() - 1}))
+    with pytest.raises(jwt.InvalidTokenError):
+        verifier.verify(jwt.encode({'user_id': 1, 'exp': time.time() + 60}, 'other', algorithm='HS256'))
+
+@pytest.mark.parametrize('backend', ['memory', 'redis'])
+def test_revocation_backends(backend):
+    if backend == 'redis':
+        fakeredis = pytest.importorskip('fakeredis')
+        revocations = RedisRevocations(fakeredis.FakeRedis(), max_age=60)
+    else:
+        revocations = MemoryRevocations()
+    now = time.time()
+    claims = {'user_id': 1, 'jti': 'a', 'iat': now - 10, 'exp': now + 60}
+    assert not revocations.is_revoked(claims)
+    revocations.revoke('a', now + 60)
+    assert revocations.is_revoked(claims)
+    revocations.revoke_user(2, now)
+    assert revocations.is_revoked({'user_id': 2, 'jti': 'b', 'iat': now - 1})
+    assert not revocations.is_revoked({'user_id': 2, 'jti': 'c', 'iat': now + 1})
+
+def test_current_user_logout_and_password_change(test_client):
+    user = UserService.create_user('auth_user', 'auth@example.com', 'Auth User', 'Visiteur', 's3cret')
+    headers = login(test_client, 'auth_user', 's3cret')
+    me = test_client.get('/api/auth/me', headers=headers)
+    assert me.status_code == 200
+    assert me.get_json()['username'] == 'auth_user'
+    assert test_client.get('/api/auth/me').status_code == 401
+
+    assert test_client.post('/api/auth/logout', headers=headers).status_code == 200
+    assert test_client.get('/api/auth/me', headers=headers).status_code == 401
+
+    headers = login(test_client, 'auth_user', 's3cret')
+    UserService.update_user(user.id, password='n3w-secret')
+    assert test_client.get('/api/auth/me', headers=headers).status_code == 401
+    headers = login(test_client, 'auth_user', 'n3w-secret')
+    assert test_client.get('/api/auth/me', headers=headers).status_code == 200
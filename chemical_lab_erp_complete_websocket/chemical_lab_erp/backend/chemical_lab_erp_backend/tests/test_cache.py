@@ -0,0 +1,54 @@
+import sys
+import os
+import pytest
+
+# Add the src directory to sys.path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from utils import cache as cache_module
+from utils.cache import Cache, TTLCache, RedisTier
+
+def test_ttl_cache_expires_and_evicts(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(cache_module.time, 'monotonic', lambda: now[0])
+    local = TTLCache(max_entries=2, ttl=10)
+    local.set('a', 1)
+    local.set('b', 2)
+    local.get('a')
+    local.set('c', 3)
+    assert local.get('b') is None
+    assert local.get('a') == 1
+    now[0] += 11
+    assert local.get('a') is None
+
+def test_cache_read_through_and_invalidation():
+    cache = Cache()
+    calls = []
+    def load():
+        calls.append(1)
+        return {'id': 1, 'name': 'Acetone'}
+    assert cache.get_or_load('product', 1, load) == {'id': 1, 'name': 'Acetone'}
+    assert cache.get_or_load('product', 1, load) == {'id': 1, 'name': 'Acetone'}
+    assert len(calls) == 1
+    cache.invalidate('product', 1)
+    cache.get_or_load('product', 1, load)
+    assert len(calls) == 2
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses']) == (1, 2)
+
+def test_cache_does_not_store_missing_rows():
+    cache = Cache()
+    assert cache.get_or_load('product', 404, lambda: None) is None
+    assert cache.get_or_load('product', 404, lambda: {'id': 404}) == {'id': 404}
+
+def test_cache_redis_tier_shared_between_workers():
+    fakeredis = pytest.importorskip('fakeredis')
+    client = fakeredis.FakeRedis()
+    first, second = Cache(), Cache()
+    first.remote = RedisTier(client)
+    second.remote = RedisTier(client)
+    first.get_or_load('user', 7, lambda: {'id': 7})
+    assert second.get_or_load('user', 7, lambda: None) == {'id': 7}
+    assert second.stats()['remote_hits'] == 1
+    first.invalidate('user', 7)
+    assert client.get('cache:user:7') is None
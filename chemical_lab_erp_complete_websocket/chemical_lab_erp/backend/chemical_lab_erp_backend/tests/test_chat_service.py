@@ -0,0 +1,109 @@
+import sys
+import os
+import pytest
+from datetime import datetime
+
+# Add the src directory to sys.path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from services.chat_service import ChatService, message_writer
+from utils.snowflake import SnowflakeGenerator, WorkerIdLease, snowflake
+from models.chat_message import ChatMessage
+from models.user import User
+from main import app, db, socketio
+
+@pytest.fixture(scope='module')
+def test_client():
+    app.config['TESTING'] = True
+    with app.test_client() as testing_client:
+        with app.app_context():
+            db.create_all()
+            db.session.add(User(username='chemist', email='chemist@lab.com', full_name='Chemist', password_hash='x'))
+            db.session.commit()
+            yield testing_client
+            db.drop_all()
+
+def test_post_message_write_behind(test_client, monkeypatch):
+    monkeypatch.setattr(ChatService, 'durability', 'write_behind')
+    payloads = [ChatService.post_message(1, 'general', f'message {i}') for i in range(5)]
+    ids = [p['id'] for p in payloads]
+    assert ids == sorted(ids)
+    ChatService.flush_pending()
+    stored = ChatMessage.query.filter(ChatMessage.id.in_(ids)).order_by(ChatMessage.id).all()
+    assert [m.message for m in stored] == [f'message {i}' for i in range(5)]
+    assert stored[0].to_dict() == payloads[0]
+
+def test_post_message_sync(test_client, monkeypatch):
+    monkeypatch.setattr(ChatService, 'durability', 'sync')
+    payload = ChatService.post_message(1, 'lab', 'written now')
+    assert db.session.get(ChatMessage, payload['id']).message == 'written now'
+
+def test_get_history_pages_backwards(test_client, monkeypatch):
+    monkeypatch.setattr(ChatService, 'durability', 'sync')
+    for i in range(5):
+        ChatService.post_message(1, 'history', f'line {i}')
+    messages, cursor = ChatService.get_history(room='history', limit=2)
+    assert [m.message for m in messages] == ['line 4', 'line 3']
+    messages, cursor = ChatService.get_history(room='history', limit=2, before=cursor)
+    assert [m.message for m in messages] == ['line 2', 'line 1']
+    messages, cursor = ChatService.get_history(room='history', limit=2, before=cursor)
+    assert [m.message for m in messages] == ['line 0']
+    assert cursor is None
+
+def test_get_messages_endpoint_caps_limit(test_client):
+    body = test_client.get('/api/chat/messages?room=history&limit=100000').get_json()
+    assert [m['message'] for m in body['messages']] == [f'line {i}' for i in range(5)]
+    assert body['next_cursor'] is None
+    assert test_client.get('/api/chat/messages?before=garbage').status_code == 400
+
+def test_write_behind_drops_only_poison_rows(test_client, monkeypatch):
+    monkeypatch.setattr(ChatService, 'durability', 'write_behind')
+    good = ChatService.post_message(1, 'poison', 'kept')
+    row = dict(good, timestamp=datetime.utcnow())
+    message_writer.put(dict(row, id=good['id'] + 1, message=None))
+    message_writer.put(dict(row, message='duplicate id'))
+    after = ChatService.post_message(1, 'poison', 'also kept')
+    ChatService.flush_pending()
+    assert message_writer.pending == []
+    stored = ChatMessage.query.filter_by(room='poison').order_by(ChatMessage.id).all()
+    assert [m.message for m in stored] == ['kept', 'also kept']
+    assert stored[1].id == after['id']
+
+def test_snowflake_requires_a_worker_id():
+    with pytest.raises(RuntimeError):
+        SnowflakeGenerator().next_id()
+    with pytest.raises(ValueError):
+        SnowflakeGenerator(worker_id=32)
+    ids = [SnowflakeGenerator(worker_id=3).next_id() for _ in range(3)]
+    assert all((i >> 7) & 31 == 3 for i in ids)
+
+def test_send_message_without_snowflake_configuration(test_client, monkeypatch):
+    monkeypatch.setattr(ChatService, 'durability', 'write_behind')
+    monkeypatch.setattr(snowflake, 'worker_id', None)
+    monkeypatch.setitem(app.config, 'SNOWFLAKE_WORKER_ID', None)
+    monkeypatch.setitem(app.config, 'SNOWFLAKE_REDIS_URL', None)
+    # The default deployment: a single process with no worker id configured
+    snowflake.init_app(app)
+    client = socketio.test_client(app)
+    client.emit('join_room', {'room': 'default', 'username': 'chemist'})
+    client.emit('send_message', {'user_id': 1, 'room': 'default', 'message': 'hello'})
+    received = [event['args'][0] for event in client.get_received() if event['name'] == 'receive_message']
+    assert [m['message'] for m in received] == ['hello']
+    ChatService.flush_pending()
+    assert db.session.get(ChatMessage, received[0]['id']).message == 'hello'
+    client.disconnect()
+
+def test_snowflake_worker_ids_are_leased(monkeypatch):
+    fakeredis = pytest.importorskip('fakeredis')
+    client = fakeredis.FakeRedis()
+    monkeypatch.setattr(WorkerIdLease, '_renew', lambda self: None)
+    first, second = WorkerIdLease(client), WorkerIdLease(client)
+    assert (first.acquire(), second.acquire()) == (0, 1)
+    client.delete(WorkerIdLease.KEY.format(0))
+    first.renew()
+    assert first.lost.is_set()
+    assert first.acquire() == 0
+    for _ in range(30):
+        WorkerIdLease(client).acquire()
+    with pytest.raises(RuntimeError):
+        WorkerIdLease(client).acquire()
@@ -0,0 +1,90 @@
+import sys
+import os
+
+# Add the src directory to sys.path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+import pytest
+from flask import g
+from sqlalchemy import create_engine, exc
+from main import app, db
+from models.product import Product
+from models.supplier import Supplier
+from models.user import User
+from utils.cache import cache
+from utils.database import TimedQueuePool, engine_options, pool_metrics
+
+CONFIG = {
+    'DB_POOL_SIZE': 4, 'DB_MAX_OVERFLOW': 2, 'DB_POOL_TIMEOUT': 3.0,
+    'DB_POOL_RECYCLE': 600, 'DB_POOL_PRE_PING': True, 'DB_STATEMENT_TIMEOUT_MS': 5000,
+}
+
+@pytest.fixture
+def replica(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'replica.db'}")
+    previous = app.extensions.get('db_replica')
+    app.extensions['db_replica'] = engine
+    yield engine
+    app.extensions['db_replica'] = previous
+    engine.dispose()
+
+def test_engine_options_from_config():
+    options = engine_options(CONFIG, 'postgresql://u:p@db/erp')
+    assert options['poolclass'] is TimedQueuePool
+    assert (options['pool_size'], options['max_overflow'], options['pool_timeout']) == (4, 2, 3.0)
+    assert options['pool_pre_ping'] and options['pool_recycle'] == 600
+    assert options['connect_args'] == {'options': '-c statement_timeout=5000'}
+    assert 'connect_args' not in engine_options(dict(CONFIG, DB_STATEMENT_TIMEOUT_MS=0), 'postgresql://u:p@db/erp')
+    assert engine_options(CONFIG, 'sqlite:///erp.db') == {}
+
+def test_checkout_waits_and_timeouts_are_recorded(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}", poolclass=TimedQueuePool, pool_logging_name='bounded',
+        pool_size=1, max_overflow=0, pool_timeout=0.05
+    )
+    held = engine.connect()
+    with pytest.raises(exc.TimeoutError):
+        engine.connect()
+    stats = pool_metrics.stats()['bounded']
+    assert stats['checked_out'] == 1 and stats['timeouts'] == 1 and stats['checkouts'] == 2
+    assert 'db_pool_checkout_timeouts_total{pool="bounded"} 1' in pool_metrics.render_prometheus()
+    held.close()
+    engine.dispose()
+
+def test_get_requests_read_from_replica(replica):
+    with app.test_request_context('/api/products', method='GET'):
+        assert db.session.get_bind(mapper=Product) is replica
+        assert db.session.get_bind(clause=Product.__table__.update()) is db.engine
+        g.use_primary = True
+        assert db.session.get_bind(mapper=Product) is db.engine
+    with app.test_request_context('/api/products', method='POST'):
+        assert db.session.get_bind(mapper=Product) is db.engine
+    with app.app_context():
+        assert db.session.get_bind(mapper=Product) is db.engine
+
+def test_cache_fills_and_report_polls_read_the_primary(replica):
+    # The replica has no tables at all, so any read routed to it fails
+    with app.app_context():
+        db.create_all()
+        try:
+            supplier = Supplier(name='Primary Supplier', code='PRI001')
+            db.session.add(supplier)
+            db.session.commit()
+            product = Product(name='Primary only', reference='PRI-1', supplier_id=supplier.id)
+            db.session.add(product)
+            db.session.commit()
+            user = User(username='primary_user', email='primary@lab.com', full_name='Primary', password_hash='x')
+            db.session.add(user)
+            db.session.commit()
+            ids = {'product': product.id, 'supplier': supplier.id, 'user': user.id}
+            for namespace, key in ids.items():
+                cache.invalidate(namespace, key)
+            # Loaded instances would be answered from the identity map without any SQL
+            db.session.expire_all()
+            client = app.test_client()
+            assert client.get(f"/api/users/{ids['user']}").get_json()['username'] == 'primary_user'
+            assert client.get(f"/api/products/{ids['product']}").get_json()['name'] == 'Primary only'
+            assert client.get(f"/api/suppliers/{ids['supplier']}").get_json()['code'] == 'PRI001'
+            assert client.get('/api/reports/jobs/missing').status_code == 404
+        finally:
+            db.drop_all()
@@ -0,0 +1,72 @@
+import sys
+import os
+import csv
+import io
+import json
+from datetime import datetime
+
+# Add the src directory to sys.path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+import pytest
+from main import app, db
+from models.product import Product
+from models.supplier import Supplier
+from utils.export import generate_csv, parse_format
+
+@pytest.fixture(scope='module')
+def test_client():
+    app.config['TESTING'] = True
+    with app.test_client() as testing_client:
+        with app.app_context():
+            db.create_all()
+            supplier = Supplier(name='Export Supplier', code='EXP001')
+            db.session.add(supplier)
+            db.session.commit()
+            db.session.add_all([
+                Product(name=f'Export {i}', reference=f'EXP-{i:04d}', supplier_id=supplier.id,
+                        unit_price=1.5, created_at=datetime(2024, 1, 2, 3, 4, 5))
+                for i in range(1200)
+            ])
+            db.session.commit()
+            yield testing_client
+            db.drop_all()
+
+def test_csv_export_header_and_fields(test_client):
+    response = test_client.get('/api/products?format=csv&fields=id,reference,created_at')
+    assert response.status_code == 200
+    assert response.mimetype == 'text/csv'
+    assert response.headers['Content-Disposition'] == 'attachment; filename=products.csv'
+    rows = list(csv.reader(io.StringIO(response.get_data(as_text=True))))
+    assert rows[0] == ['id', 'reference', 'created_at']
+    assert rows[1] == ['1', 'EXP-0000', '2024-01-02T03:04:05']
+    assert len(rows) == 1201
+
+def test_ndjson_export_lines(test_client):
+    response = test_client.get('/api/suppliers?format=ndjson')
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+    lines = response.get_data(as_text=True).splitlines()
+    assert len(lines) == 1
+    supplier = json.loads(lines[0])
+    assert supplier['code'] == 'EXP001'
+    # Dates are ISO 8601, as in the JSON API
+    datetime.fromisoformat(supplier['created_at'])
+
+def test_large_export_streams_in_chunks(test_client):
+    response = test_client.get('/api/products?format=csv')
+    assert response.is_streamed
+    chunks = [chunk for chunk in response.response if chunk]
+    # 1200 rows in chunks of 500 plus the remainder
+    assert len(chunks) == 3
+
+def test_generate_csv_writes_empty_cells_for_none():
+    rows = [{'id': 1, 'name': None}, {'id': 2, 'name': 'b'}]
+    assert ''.join(generate_csv(rows, ['id', 'name'])).splitlines() == ['id,name', '1,', '2,b']
+
+def test_unknown_format_is_rejected(test_client):
+    with pytest.raises(ValueError):
+        parse_format('xml')
+    assert parse_format(None) == 'json'
+    for path in ('/api/products', '/api/orders', '/api/suppliers'):
+        assert test_client.get(f'{path}?format=xml').status_code == 400
@@ -0,0 +1,114 @@
+import sys
+import os
+import json
+import subprocess
+import importlib.util
+
+# Add the src directory to sys.path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+import pytest
+from utils.offload import resolve_async_mode
+
+SRC = os.path.abspath(os.path.join(os.path.dirname(__file__), '../src'))
+
+# Runs in a child process: monkey-patching cannot be undone in the test session
+SMOKE = """
+import io, json, logging, time
+import serve
+from main import app, db, socketio
+from models.user import User
+from services.user_service import UserService
+from utils.logger import configure_logging, stop_logging
+from utils.offload import db_executor
+from utils.passwords import password_hasher
+
+HASHES, WRITES, READS = 4, 5, 10
+
+with app.app_context():
+    db.create_all()
+    db.session.add(User(username='smoke', email='smoke@lab.com', full_name='Smoke', password_hash='x'))
+    db.session.commit()
+
+gaps, hashed, written, read, stopped = [], [], [], [], []
+
+def ticker():
+    last = time.monotonic()
+    while not stopped:
+        socketio.sleep(0.01)
+        now = time.monotonic()
+        gaps.append(now - last)
+        last = now
+
+def hash_one():
+    if password_hasher.verify('secret', password_hasher.hash('secret')):
+        hashed.append(True)
+
+def write(i):
+    db_executor.call(UserService.apply_presence, {1: (i % 2 == 0, 1700000000 + i)})
+    written.append(i)
+
+def count_users():
+    return User.query.count()
+
+def read_one():
+    read.append(db_executor.call(count_users))
+
+stream = io.StringIO()
+configure_logging('INFO', 'json', stream=stream)
+socketio.start_background_task(ticker)
+socketio.sleep(0.05)
+for _ in range(HASHES):
+    socketio.start_background_task(hash_one)
+for i in range(WRITES):
+    socketio.start_background_task(write, i)
+for _ in range(READS):
+    socketio.start_background_task(read_one)
+# Wait on the results themselves: a task handle may report done before its work ran
+deadline = time.monotonic() + 30
+while (len(hashed), len(written), len(read)) != (HASHES, WRITES, READS) and time.monotonic() < deadline:
+    socketio.sleep(0.01)
+stopped.append(True)
+socketio.sleep(0.05)
+for i in range(100):
+    logging.getLogger('smoke').info('line %s', i)
+stop_logging()
+print(json.dumps({
+    'async_mode': socketio.async_mode,
+    'hashed': len(hashed),
+    'written': len(written),
+    'read': read,
+    'ticks': len(gaps),
+    'max_gap': max(gaps),
+    'log_lines': len(stream.getvalue().splitlines()),
+}))
+"""
+
+def run_smoke(mode, database):
+    env = dict(os.environ, SOCKETIO_ASYNC_MODE=mode, DATABASE_URL=f'sqlite:///{database}',
+               PASSWORD_BCRYPT_ROUNDS='12', PASSWORD_HASH_WORKERS='2')
+    result = subprocess.run([sys.executable, '-c', SMOKE], cwd=SRC, env=env,
+                            capture_output=True, text=True, timeout=120)
+    assert result.returncode == 0, result.stderr
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+@pytest.mark.parametrize('mode', ['threading', 'gevent'])
+def test_hashing_database_calls_and_logging_keep_the_loop_responsive(mode, tmp_path):
+    if mode != 'threading' and importlib.util.find_spec(mode) is None:
+        pytest.skip(f"{mode} is not installed")
+    result = run_smoke(mode, tmp_path / 'smoke.db')
+    assert result['async_mode'] == mode
+    # Every hash and every concurrent db_executor call finished
+    assert (result['hashed'], result['written']) == (4, 5)
+    assert result['read'] == [1] * 10
+    # Two rounds of 12-round bcrypt hashes take ~0.5 s, so the ticker ran all along
+    assert result['ticks'] >= 20
+    # One hash takes ~250 ms; run on the hub it would stall the ticker that long
+    assert result['max_gap'] < 0.15
+    assert result['log_lines'] == 100
+
+def test_async_mode_resolution():
+    assert resolve_async_mode('gevent') == 'gevent'
+    assert resolve_async_mode(None) == 'threading'
+    with pytest.raises(ValueError):
+        resolve_async_mode('eventlet')
@@ -0,0 +1,92 @@
+import sys
+import os
+import gzip
+from datetime import datetime
+
+# Add the src directory to sys.path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+import pytest
+from sqlalchemy import event
+from main import app, db
+from models.product import Product
+from models.supplier import Supplier
+from services.product_service import ProductService
+from services.supplier_service import SupplierService
+
+@pytest.fixture(scope='module')
+def test_client():
+    app.config['TESTING'] = True
+    with app.test_client() as testing_client:
+        with app.app_context():
+            db.create_all()
+            db.session.add(Supplier(name='Cache Supplier', code='ETAG001'))
+            db.session.commit()
+            db.session.add_all([
+                Product(name=f'Etag product {i}', reference=f'ETAG-{i}', supplier_id=1, safety_info='x' * 200)
+                for i in range(20)
+            ])
+            db.session.commit()
+            yield testing_client
+            db.drop_all()
+
+def capture_queries(func):
+    statements = []
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        result = func()
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+    return result, statements
+
+def test_unchanged_collection_is_304_without_loading_rows(test_client):
+    first = test_client.get('/api/products?limit=5')
+    etag = first.headers['ETag']
+    assert first.status_code == 200 and first.headers['Last-Modified']
+
+    response, statements = capture_queries(
+        lambda: test_client.get('/api/products?limit=5', headers={'If-None-Match': etag})
+    )
+    assert response.status_code == 304
+    assert len(statements) == 1 and 'max(' in statements[0].lower()
+
+    # Another page is a different representation
+    assert test_client.get('/api/products?limit=6', headers={'If-None-Match': etag}).status_code == 200
+
+    ProductService.update_product(1, name='Renamed')
+    assert test_client.get('/api/products?limit=5', headers={'If-None-Match': etag}).status_code == 200
+
+def test_if_modified_since(test_client):
+    last_modified = test_client.get('/api/suppliers').headers['Last-Modified']
+    assert test_client.get('/api/suppliers', headers={'If-Modified-Since': last_modified}).status_code == 304
+    assert test_client.get('/api/suppliers', headers={'If-Modified-Since': 'Mon, 01 Jan 2001 00:00:00 GMT'}).status_code == 200
+
+def test_delete_moves_last_modified(test_client):
+    # Last-Modified has one-second resolution; start from rows last written long ago
+    db.session.execute(db.update(Supplier.__table__).values(updated_at=datetime(2024, 1, 1)))
+    doomed = Supplier(name='Doomed Supplier', code='ETAG002', updated_at=datetime(2024, 1, 1))
+    db.session.add(doomed)
+    db.session.commit()
+    last_modified = test_client.get('/api/suppliers').headers['Last-Modified']
+    assert test_client.get('/api/suppliers', headers={'If-Modified-Since': last_modified}).status_code == 304
+    SupplierService.delete_supplier(doomed.id)
+    response = test_client.get('/api/suppliers', headers={'If-Modified-Since': last_modified})
+    assert response.status_code == 200
+    assert [s['code'] for s in response.get_json()['suppliers']] == ['ETAG001']
+
+def test_item_etag(test_client):
+    etag = test_client.get('/api/products/2').headers['ETag']
+    assert test_client.get('/api/products/2', headers={'If-None-Match': etag}).status_code == 304
+    ProductService.update_product(2, stock_quantity=3)
+    assert test_client.get('/api/products/2', headers={'If-None-Match': etag}).status_code == 200
+
+def test_large_bodies_are_compressed(test_client):
+    response = test_client.get('/api/products', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert b'ETAG-19' in gzip.decompress(response.data)
+    small = test_client.get('/api/products/3', headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in small.headers
+    assert 'Content-Encoding' not in test_client.get('/api/products').headers
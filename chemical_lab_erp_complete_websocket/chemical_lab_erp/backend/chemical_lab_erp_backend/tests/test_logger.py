@@ -0,0 +1,52 @@
+import sys
+import os
+import io
+import json
+import logging
+
+# Add the src directory to sys.path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+import pytest
+from utils.logger import configure_logging, parse_sample_rates, sampled, stop_logging
+
+@pytest.fixture
+def output():
+    root = logging.getLogger()
+    handlers, level = list(root.handlers), root.level
+    stream = io.StringIO()
+    yield stream
+    stop_logging()
+    root.handlers[:] = handlers
+    root.setLevel(level)
+
+def lines(stream):
+    stop_logging()
+    return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+def test_records_are_written_as_json_by_the_listener(output):
+    configure_logging('INFO', 'json', stream=output)
+    log = logging.getLogger('tests.logger')
+    log.debug("hidden %s", 1)
+    log.info("order %s created", 42, extra={'order_id': 42})
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        log.exception("failed")
+    first, second = lines(output)
+    assert first['message'] == 'order 42 created' and first['order_id'] == 42
+    assert first['level'] == 'INFO' and first['logger'] == 'tests.logger'
+    assert second['level'] == 'ERROR' and 'ValueError: boom' in second['exc_info']
+
+def test_sampling_by_key(output):
+    configure_logging('INFO', 'json', sample_rates=parse_sample_rates('request=0, chat.room=1'), stream=output)
+    log = logging.getLogger('tests.logger')
+    for _ in range(50):
+        if sampled('request'):
+            log.info("GET /", extra={'sample': 'request'})
+    if sampled('chat.room'):
+        log.info("alice joined", extra={'sample': 'chat.room'})
+    assert sampled('unconfigured')
+    records = lines(output)
+    assert [r['message'] for r in records] == ['alice joined']
+    assert records[0]['sample_rate'] == 1.0
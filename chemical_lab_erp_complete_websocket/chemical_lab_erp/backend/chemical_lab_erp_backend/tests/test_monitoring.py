@@ -0,0 +1,91 @@
+import sys
+import os
+import time
+import uuid
+import logging
+
+# Add the src directory to sys.path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+import pytest
+from main import app, db
+from models.supplier import Supplier
+from utils.auth import token_verifier
+import utils.logger
+from utils.monitoring import Histogram, request_metrics
+
+@pytest.fixture(scope='module')
+def test_client():
+    app.config['TESTING'] = True
+    with app.test_client() as testing_client:
+        with app.app_context():
+            db.create_all()
+            db.session.add(Supplier(name='Monitored Supplier', code='MON001'))
+            db.session.commit()
+            request_metrics.reset()
+            yield testing_client
+            db.drop_all()
+
+def bearer(role):
+    token = token_verifier.encode({
+        'user_id': 1, 'role': role, 'jti': uuid.uuid4().hex, 'iat': time.time(), 'exp': time.time() + 60
+    })
+    return {'Authorization': f'Bearer {token}'}
+
+def test_histogram_interpolates_percentiles():
+    histogram = Histogram(buckets=(0.01, 0.1, 1.0))
+    for _ in range(90):
+        histogram.observe(0.005)
+    for _ in range(10):
+        histogram.observe(0.5)
+    assert histogram.quantile(0.5) == pytest.approx(0.01 * 50 / 90)
+    assert 0.1 < histogram.quantile(0.95) < 1.0
+    histogram.observe(30)
+    assert histogram.quantile(1.0) == 1.0
+    assert list(histogram.cumulative())[-1] == (float('inf'), 101)
+
+def test_requests_are_recorded_per_rule(test_client):
+    for _ in range(3):
+        response = test_client.get('/api/suppliers/1')
+        assert response.status_code == 200
+        assert 'queries' in response.headers['Server-Timing']
+    test_client.get('/api/suppliers/999')
+    test_client.get('/api/suppliers')
+    text = test_client.get('/api/metrics').get_data(as_text=True)
+    labels = 'method="GET",endpoint="/api/suppliers/<int:supplier_id>"'
+    assert f'http_request_duration_seconds_count{{{labels}}} 4' in text
+    assert f'http_requests_total{{{labels},status="200"}} 3' in text
+    assert f'http_requests_total{{{labels},status="404"}} 1' in text
+    assert 'db_queries_total{method="GET",endpoint="/api/suppliers"}' in text
+    summary = test_client.get('/api/metrics/requests').get_json()
+    row = next(r for r in summary['endpoints'] if r['endpoint'] == '/api/suppliers/<int:supplier_id>')
+    assert row['count'] == 4
+    assert row['p50_ms'] <= row['p95_ms'] <= row['p99_ms']
+    row = next(r for r in summary['endpoints'] if r['endpoint'] == '/api/suppliers')
+    assert row['avg_queries'] >= 1
+
+def test_slow_queries_are_logged_with_parameters(test_client, caplog, monkeypatch):
+    monkeypatch.setattr(request_metrics, 'slow_query_threshold', 0)
+    with caplog.at_level(logging.WARNING, logger='utils.monitoring'):
+        test_client.get('/api/suppliers')
+    assert any('Slow query' in r.getMessage() and 'suppliers' in r.getMessage() for r in caplog.records)
+    assert request_metrics.summary()['slow_queries'] > 0
+
+def test_profile_is_admin_only(test_client):
+    assert 'profile' not in test_client.get('/api/suppliers?_profile=1').get_json()
+    assert 'profile' not in test_client.get('/api/suppliers?_profile=1', headers=bearer('Visiteur')).get_json()
+    body = test_client.get('/api/suppliers?_profile=1', headers=bearer('Admin')).get_json()
+    assert body['status'] == 200
+    assert body['sql']['queries'] == len(body['sql']['statements']) >= 1
+    assert body['profile'] and body['profile'][0]['cumulative_ms'] >= body['profile'][-1]['cumulative_ms']
+
+def test_only_fast_successes_are_sampled(test_client, caplog, monkeypatch):
+    monkeypatch.setattr(utils.logger, '_sample_rates', {'request': 0})
+    with caplog.at_level(logging.INFO, logger='access'):
+        test_client.get('/api/suppliers/1')
+        test_client.get('/api/suppliers/999')
+        monkeypatch.setattr(request_metrics, 'slow_request_threshold', 0)
+        test_client.get('/api/suppliers')
+    records = [r for r in caplog.records if r.name == 'access']
+    assert [(r.path, r.status) for r in records] == [('/api/suppliers/999', 404), ('/api/suppliers', 200)]
+    assert not any(hasattr(r, 'sample') for r in records)
@@ -0,0 +1,39 @@
+import sys
+import os
+
+# Add the src directory to sys.path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+import pytest
+from flask import current_app, g
+from main import app, db
+from models.supplier import Supplier
+from utils.offload import BlockingExecutor
+
+@pytest.fixture(scope='module')
+def executor():
+    executor = BlockingExecutor()
+    executor.init_app(app, 'threading')
+    with app.app_context():
+        db.create_all()
+        yield executor
+        db.drop_all()
+
+def test_call_runs_in_its_own_app_context(executor):
+    g.marker = 'caller'
+
+    def work(name):
+        db.session.add(Supplier(name=name, code=name.upper()))
+        db.session.commit()
+        return current_app.name, g.get('marker'), Supplier.query.filter_by(name=name).count()
+
+    assert executor.call(work, 'offloaded') == (app.name, None, 1)
+    # The caller's session sees the committed row
+    assert Supplier.query.filter_by(code='OFFLOADED').one().name == 'offloaded'
+
+def test_call_propagates_exceptions(executor):
+    def fail():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError, match="boom"):
+        executor.call(fail)
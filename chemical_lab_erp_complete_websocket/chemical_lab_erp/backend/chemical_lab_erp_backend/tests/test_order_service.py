@@ -0,0 +1,181 @@
+import sys
+import os
+import pytest
+from sqlalchemy import event
+
+# Add the src directory to sys.path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from services.order_service import OrderService, InsufficientStockError
+from models.order import Order
+from models.product import Product
+from models.supplier import Supplier
+from models.user import User
+from main import app, db, celery
+import tasks.inventory as inventory
+
+@pytest.fixture(scope='module')
+def test_client():
+    app.config['TESTING'] = True
+    # Low stock checks run in-process instead of through the broker
+    celery.conf.task_always_eager = True
+    with app.test_client() as testing_client:
+        with app.app_context():
+            db.create_all()
+            db.session.add(Supplier(name='Test Supplier', code='TST001'))
+            db.session.commit()
+            yield testing_client
+            db.drop_all()
+    celery.conf.task_always_eager = app.config.get('TASKS_ALWAYS_EAGER', False)
+
+@pytest.fixture
+def low_stock_events(monkeypatch):
+    events = []
+    monkeypatch.setattr(inventory.socketio, 'emit', lambda event, data, **kwargs: events.append((event, data)))
+    return events
+
+def add_orders(count):
+    start = Order.query.count()
+    for i in range(start, start + count):
+        user = User(username=f'user{i}', email=f'user{i}@lab.com', full_name=f'User {i}', password_hash='x')
+        product = Product(name=f'Product {i}', reference=f'REF-{i}', supplier_id=1)
+        db.session.add(Order(user=user, product=product, quantity=1))
+    db.session.commit()
+    db.session.expunge_all()
+
+def count_queries(func):
+    statements = []
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        func()
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+    return len(statements)
+
+def list_expanded():
+    orders = OrderService.get_all_orders(expand=('product', 'user'))
+    return [o.to_dict(('product', 'user')) for o in orders]
+
+def test_expanded_orders_use_constant_queries(test_client):
+    add_orders(3)
+    small = count_queries(list_expanded)
+    add_orders(30)
+    large = count_queries(list_expanded)
+    assert small == large
+    assert len(list_expanded()) == 33
+
+def test_expanded_order_embeds_product_and_user(test_client):
+    order = OrderService.get_order_by_id(1, expand=('product',))
+    data = order.to_dict(('product',))
+    assert data['product']['reference'] == 'REF-0'
+    assert 'user' not in data
+
+def test_expand_rejects_unknown_relationship(test_client):
+    with pytest.raises(ValueError):
+        OrderService.get_all_orders(expand=('supplier',))
+    assert test_client.get('/api/orders?expand=supplier').status_code == 400
+    body = test_client.get('/api/orders/1?expand=product,user').get_json()
+    assert body['user']['username'] == 'user0'
+
+def test_row_mode_matches_orm_serialization(test_client):
+    for expand in ((), ('product',), ('user', 'product')):
+        expected = [o.to_dict(expand) for o in OrderService.get_all_orders(expand=expand)]
+        assert OrderService.get_all_orders(expand=expand, as_rows=True) == expected
+    assert count_queries(lambda: OrderService.get_all_orders(expand=('product', 'user'), as_rows=True)) == 1
+    assert test_client.get('/api/orders?expand=user').get_json()['orders'][0]['user']['username'] == 'user0'
+
+def stock_of(product_id):
+    db.session.expire_all()
+    return db.session.get(Product, product_id).stock_quantity
+
+def test_create_order_reserves_stock(test_client, low_stock_events):
+    product = Product(name='Acetone', reference='ACE-01', supplier_id=1, stock_quantity=5, min_stock_level=3)
+    db.session.add(product)
+    db.session.commit()
+    OrderService.create_order(user_id=1, product_id=product.id, quantity=3)
+    assert stock_of(product.id) == 2
+    assert [(event, data['reference'], data['stock_quantity']) for event, data in low_stock_events] == [('low_stock', 'ACE-01', 2)]
+    with pytest.raises(InsufficientStockError):
+        OrderService.create_order(user_id=1, product_id=product.id, quantity=3)
+    assert stock_of(product.id) == 2
+    response = test_client.post('/api/orders', json={'user_id': 1, 'product_id': product.id, 'quantity': 3})
+    assert response.status_code == 409
+
+def test_low_stock_alert_only_when_crossing_the_minimum(test_client, low_stock_events):
+    product = Product(name='Methanol', reference='MEOH-01', supplier_id=1, stock_quantity=5, min_stock_level=4)
+    db.session.add(product)
+    db.session.commit()
+    first = OrderService.create_order(user_id=1, product_id=product.id, quantity=2)
+    assert [data['reference'] for _, data in low_stock_events] == ['MEOH-01']
+    # Already low: further orders, releases and deletes stay quiet
+    second = OrderService.create_order(user_id=1, product_id=product.id, quantity=1)
+    OrderService.update_order(second.id, status='cancelled')
+    OrderService.delete_order(first.id)
+    assert stock_of(product.id) == 5
+    assert len(low_stock_events) == 1
+
+def test_untracked_stock_accepts_orders(test_client):
+    product = Product(name='Nitrogen', reference='N2-01', supplier_id=1)
+    db.session.add(product)
+    db.session.commit()
+    order = OrderService.create_order(user_id=1, product_id=product.id, quantity=50)
+    OrderService.update_order(order.id, status='cancelled')
+    assert stock_of(product.id) is None
+
+def test_create_orders_is_all_or_nothing(test_client):
+    plenty = Product(name='Water', reference='H2O-01', supplier_id=1, stock_quantity=100)
+    scarce = Product(name='Gold', reference='AU-01', supplier_id=1, stock_quantity=1)
+    db.session.add_all([plenty, scarce])
+    db.session.commit()
+    with pytest.raises(InsufficientStockError):
+        OrderService.create_orders(1, [
+            {'product_id': plenty.id, 'quantity': 10},
+            {'product_id': scarce.id, 'quantity': 2},
+        ])
+    assert stock_of(plenty.id) == 100
+    orders = OrderService.create_orders(1, [
+        {'product_id': plenty.id, 'quantity': 10},
+        {'product_id': scarce.id, 'quantity': 1},
+        {'product_id': plenty.id, 'quantity': 5},
+    ])
+    assert len(orders) == 3
+    assert stock_of(plenty.id) == 85
+    assert stock_of(scarce.id) == 0
+
+def test_cancelling_order_releases_stock(test_client):
+    product = Product(name='Benzene', reference='BZ-01', supplier_id=1, stock_quantity=10)
+    db.session.add(product)
+    db.session.commit()
+    order = OrderService.create_order(user_id=1, product_id=product.id, quantity=4)
+    OrderService.update_order(order.id, quantity=6)
+    assert stock_of(product.id) == 4
+    OrderService.update_order(order.id, status='cancelled')
+    assert stock_of(product.id) == 10
+
+def test_deleting_order_releases_stock(test_client):
+    product = Product(name='Toluene', reference='TOL-01', supplier_id=1, stock_quantity=10)
+    db.session.add(product)
+    db.session.commit()
+    active = OrderService.create_order(user_id=1, product_id=product.id, quantity=4)
+    cancelled = OrderService.create_order(user_id=1, product_id=product.id, quantity=3)
+    OrderService.update_order(cancelled.id, status='cancelled')
+    assert stock_of(product.id) == 6
+    OrderService.delete_order(active.id)
+    assert stock_of(product.id) == 10
+    # A cancelled order already gave its stock back
+    OrderService.delete_order(cancelled.id)
+    assert stock_of(product.id) == 10
+
+def test_orders_cannot_be_created_cancelled(test_client):
+    product = Product(name='Xylene', reference='XYL-01', supplier_id=1, stock_quantity=10)
+    db.session.add(product)
+    db.session.commit()
+    with pytest.raises(ValueError):
+        OrderService.create_order(user_id=1, product_id=product.id, quantity=4, status='cancelled')
+    response = test_client.post('/api/orders/batch', json={
+        'user_id': 1, 'status': 'cancelled', 'lines': [{'product_id': product.id, 'quantity': 4}]
+    })
+    assert response.status_code == 400
+    assert stock_of(product.id) == 10
@@ -0,0 +1,78 @@
+import sys
+import os
+import threading
+import time
+
+# Add the src directory to sys.path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+import pytest
+from werkzeug.security import generate_password_hash
+from main import app, db
+from models.user import User
+from services.user_service import UserService
+from utils.passwords import HashingOverloaded, PasswordHasher, password_hasher
+
+@pytest.fixture(scope='module')
+def test_client():
+    app.config['TESTING'] = True
+    with app.test_client() as testing_client:
+        with app.app_context():
+            db.create_all()
+            yield testing_client
+            db.drop_all()
+
+def test_hash_and_rehash_when_cost_changes():
+    hasher = PasswordHasher(rounds=4, workers=2)
+    hashed = hasher.hash('s3cret')
+    assert hasher.verify('s3cret', hashed)
+    assert not hasher.verify('wrong', hashed)
+    assert hasher.verify_and_update('s3cret', hashed) == (True, None)
+
+    hasher.rounds = 5
+    ok, new_hash = hasher.verify_and_update('s3cret', hashed)
+    assert ok and new_hash.startswith('$2b$05$')
+    assert hasher.verify_and_update('wrong', hashed) == (False, None)
+
+def test_legacy_werkzeug_hash_is_accepted_and_upgraded():
+    hasher = PasswordHasher(rounds=4, workers=1)
+    ok, new_hash = hasher.verify_and_update('s3cret', generate_password_hash('s3cret'))
+    assert ok and new_hash.startswith('$2b$04$')
+
+def test_full_queue_is_shed():
+    hasher = PasswordHasher(rounds=4, workers=1, max_queue=0)
+    release = threading.Event()
+    blocker = threading.Thread(target=hasher._submit, args=(release.wait,))
+    blocker.start()
+    try:
+        while hasher.stats()['submitted'] == 0:
+            time.sleep(0.001)
+        with pytest.raises(HashingOverloaded):
+            hasher.hash('s3cret')
+        assert hasher.stats()['shed'] == 1
+    finally:
+        release.set()
+        blocker.join()
+    assert hasher.hash('s3cret').startswith('$2b$04$')
+
+def test_authenticate_upgrades_stored_hash(test_client):
+    user = UserService.create_user('hash_user', 'hash@example.com', 'Hash User', 'Visiteur', 's3cret')
+    user.password_hash = generate_password_hash('s3cret')
+    db.session.commit()
+    assert UserService.authenticate('hash_user', 'wrong') is None
+    assert UserService.authenticate('hash_user', 's3cret') is not None
+    stored = db.session.get(User, user.id).password_hash
+    assert stored.startswith(f'$2b${password_hasher.rounds:02d}$')
+
+def test_user_routes_shed_when_hashing_is_overloaded(test_client, monkeypatch):
+    def overloaded(password):
+        raise HashingOverloaded()
+    monkeypatch.setattr(password_hasher, 'hash', overloaded)
+    response = test_client.post('/api/users', json={'username': 'busy_user', 'email': 'busy@example.com',
+                                                    'full_name': 'Busy', 'password': 'Str0ngPass!'})
+    assert response.status_code == 503 and response.headers['Retry-After'] == '1'
+    user = User(username='busy_existing', email='busy2@example.com', full_name='Busy', password_hash='x')
+    db.session.add(user)
+    db.session.commit()
+    response = test_client.put(f'/api/users/{user.id}', json={'password': 'Str0ngPass!'})
+    assert response.status_code == 503 and response.headers['Retry-After'] == '1'
@@ -0,0 +1,93 @@
+import sys
+import os
+from datetime import datetime
+
+# Add the src directory to sys.path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+import time
+import pytest
+from main import app, db, socketio
+from utils.auth import token_verifier
+from utils.presence import presence
+from models.user import User
+from services.user_service import UserService
+from utils.presence import MemoryPresence, RedisPresence
+
+@pytest.fixture(scope='module')
+def test_client():
+    app.config['TESTING'] = True
+    with app.test_client() as testing_client:
+        with app.app_context():
+            db.create_all()
+            yield testing_client
+            db.drop_all()
+
+def exercise(tracker):
+    tracker.join('sid-1', 'general', 1, 'alice', now=0)
+    tracker.join('sid-2', 'general', 1, 'alice', now=0)
+    tracker.join('sid-3', 'general', 2, 'bob', now=0)
+    tracker.join('sid-3', 'lab', 2, 'bob', now=0)
+    assert sorted(m['username'] for m in tracker.room_members('general')) == ['alice', 'bob']
+    assert tracker.drain_changes() == {1: (True, 0), 2: (True, 0)}
+
+    tracker.disconnect('sid-1', now=5)
+    tracker.leave('sid-3', 'general', now=5)
+    assert tracker.room_members('general') == [{'user_id': 1, 'username': 'alice'}]
+    assert tracker.drain_changes() == {}
+
+    assert tracker.heartbeat('sid-3', now=30)
+    assert tracker.expire(now=61) == ['sid-2']
+    assert tracker.room_members('general') == []
+    assert tracker.room_members('lab') == [{'user_id': 2, 'username': 'bob'}]
+    assert tracker.drain_changes() == {1: (False, 61)}
+
+def test_memory_presence():
+    tracker = MemoryPresence(ttl=60)
+    exercise(tracker)
+    assert tracker.sessions.keys() == {'sid-3'}
+
+def test_redis_presence_shared_between_workers():
+    fakeredis = pytest.importorskip('fakeredis')
+    exercise(RedisPresence(fakeredis.FakeRedis(), ttl=60))
+
+def test_apply_presence_batches_user_updates(test_client):
+    alice = UserService.create_user('presence_alice', 'pa@example.com', 'Alice', 'Visiteur', 'pw')
+    bob = UserService.create_user('presence_bob', 'pb@example.com', 'Bob', 'Visiteur', 'pw')
+    bob.is_online = True
+    db.session.commit()
+    UserService.apply_presence({alice.id: (True, 1700000000), bob.id: (False, 1700000000)})
+    db.session.expire_all()
+    assert db.session.get(User, alice.id).is_online
+    assert db.session.get(User, alice.id).last_login == datetime.utcfromtimestamp(1700000000)
+    assert not db.session.get(User, bob.id).is_online
+
+def refresh_keeps_alive(tracker):
+    tracker.join('sid-1', 'general', 1, 'alice', now=0)
+    tracker.join('sid-2', 'general', 2, 'bob', now=0)
+    tracker.refresh(['sid-1', 'unknown'], now=50)
+    assert tracker.expire(now=61) == ['sid-2']
+    assert tracker.room_members('general') == [{'user_id': 1, 'username': 'alice'}]
+
+def test_refresh_keeps_connected_sockets_alive():
+    refresh_keeps_alive(MemoryPresence(ttl=60))
+    fakeredis = pytest.importorskip('fakeredis')
+    refresh_keeps_alive(RedisPresence(fakeredis.FakeRedis(), ttl=60))
+
+def test_socket_presence_comes_from_the_token(test_client):
+    db.session.add(User(id=7, username='carol', email='carol@lab.com', full_name='Carol', password_hash='x'))
+    db.session.commit()
+    token = token_verifier.encode({'user_id': 7, 'username': 'carol', 'exp': time.time() + 60})
+    client = socketio.test_client(app, auth={'token': token})
+    # The bundled client sends neither user_id nor heartbeats
+    client.emit('join_room', {'room': 'presence', 'username': 'someone-else'})
+    assert presence.room_members('presence') == [{'user_id': 7, 'username': 'carol'}]
+
+    anonymous = socketio.test_client(app, auth={'token': 'not-a-jwt'})
+    assert anonymous.is_connected()
+    anonymous.emit('join_room', {'room': 'presence', 'username': 'mallory', 'user_id': 1})
+    assert presence.room_members('presence') == [{'user_id': 7, 'username': 'carol'}]
+
+    client.disconnect()
+    anonymous.disconnect()
+    assert presence.room_members('presence') == []
@@ -0,0 +1,124 @@
+import sys
+import os
+import pytest
+
+# Add the src directory to sys.path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from services.product_service import ProductService
+from models.product import Product
+from models.supplier import Supplier
+from main import app, db, celery
+import tasks.inventory as inventory
+
+@pytest.fixture(scope='module')
+def test_client():
+    app.config['TESTING'] = True
+    # Low stock checks run in-process instead of through the broker
+    celery.conf.task_always_eager = True
+    with app.test_client() as testing_client:
+        with app.app_context():
+            db.create_all()
+            db.session.add(Supplier(name='Test Supplier', code='TST001'))
+            for i in range(5):
+                db.session.add(Product(
+                    name=f'Product {i}',
+                    reference=f'REF-{i}',
+                    supplier_id=1,
+                    safety_info='H314'
+                ))
+            db.session.commit()
+            yield testing_client
+            db.drop_all()
+    celery.conf.task_always_eager = app.config.get('TASKS_ALWAYS_EAGER', False)
+
+def test_get_products_page_walks_all_rows(test_client):
+    seen = []
+    cursor = None
+    while True:
+        products, cursor = ProductService.get_products_page(limit=2, after=cursor)
+        seen.extend(p['reference'] for p in products)
+        if cursor is None:
+            break
+    assert seen == [f'REF-{i}' for i in range(5)]
+
+def test_get_products_page_projects_fields(test_client):
+    products, _ = ProductService.get_products_page(limit=1, fields=['name'])
+    assert products == [{'id': 1, 'name': 'Product 0'}]
+
+def test_get_products_page_sorted_by_updated_at(test_client):
+    products, cursor = ProductService.get_products_page(limit=3, fields=['name'], sort='updated_at')
+    assert [p['id'] for p in products] == [1, 2, 3]
+    products, cursor = ProductService.get_products_page(limit=3, after=cursor, fields=['name'], sort='updated_at')
+    assert [p['id'] for p in products] == [4, 5]
+    assert cursor is None
+
+def test_get_products_page_rejects_bad_cursor(test_client):
+    with pytest.raises(ValueError):
+        ProductService.get_products_page(after='not-a-cursor')
+
+def test_get_products_endpoint(test_client):
+    response = test_client.get('/api/products?limit=2&fields=name,reference')
+    assert response.status_code == 200
+    body = response.get_json()
+    assert len(body['products']) == 2
+    assert set(body['products'][0]) == {'id', 'name', 'reference'}
+    assert body['next_cursor']
+    assert test_client.get('/api/products?fields=bogus').status_code == 400
+
+def test_search_products_by_cas_number(test_client):
+    product = ProductService.create_product(
+        name='Acide Sulfurique',
+        reference='H2SO4-98',
+        cas_number='7664-93-9',
+        formula='H₂SO₄',
+        supplier_id=1
+    )
+    results = ProductService.search_products('7664-93-9')
+    assert [p['id'] for p in results] == [product.id]
+
+def test_search_products_ranks_and_tracks_updates(test_client):
+    results = ProductService.search_products('sulf')
+    assert results[0]['reference'] == 'H2SO4-98'
+    assert ProductService.search_products('h2so4')[0]['reference'] == 'H2SO4-98'
+    product = results[0]
+    ProductService.update_product(product['id'], name='Sulfuric Acid')
+    assert ProductService.search_products('sulfuric')[0]['id'] == product['id']
+    ProductService.delete_product(product['id'])
+    assert ProductService.search_products('sulfuric') == []
+
+def test_bulk_upsert_products(test_client):
+    result = ProductService.bulk_upsert_products([
+        {'name': 'Acetone', 'reference': 'ACE-01', 'supplier_id': 1, 'unit_price': '12.5'},
+        {'name': 'Toluene', 'reference': 'TOL-01', 'supplier_id': 1},
+        {'reference': 'BAD-01'},
+        {'name': 'Acetone HPLC', 'reference': 'ACE-01', 'supplier_id': 1},
+    ], batch_size=1)
+    assert result['received'] == 4
+    assert result['upserted'] == 2
+    assert [e['index'] for e in result['errors']] == [2]
+
+    acetone = Product.query.filter_by(reference='ACE-01').one()
+    assert acetone.name == 'Acetone HPLC'
+
+    result = ProductService.bulk_upsert_products([{'name': 'Toluene', 'reference': 'TOL-01', 'supplier_id': 1, 'stock_quantity': 4}])
+    assert result['upserted'] == 1
+    db.session.expire_all()
+    assert Product.query.filter_by(reference='TOL-01').one().stock_quantity == 4.0
+
+def test_low_stock_page_only_returns_products_below_minimum(test_client, monkeypatch):
+    events = []
+    monkeypatch.setattr(inventory.socketio, 'emit', lambda event, data, **kwargs: events.append((event, data)))
+    low = ProductService.create_product(name='Ethanol', reference='ETH-01', supplier_id=1,
+                                        stock_quantity=2, min_stock_level=10)
+    methanol = ProductService.create_product(name='Methanol', reference='MET-01', supplier_id=1,
+                                             stock_quantity=20, min_stock_level=10)
+    products, cursor = ProductService.get_products_page(fields=['reference'], low_stock=True)
+    assert [p['reference'] for p in products] == ['ETH-01']
+    assert cursor is None
+    ProductService.update_product(low.id, stock_quantity=12)
+    products, _ = ProductService.get_products_page(fields=['reference'], low_stock=True)
+    assert products == []
+    assert events == []
+    ProductService.update_product(methanol.id, stock_quantity=5)
+    assert [(event, data['reference'], data['stock_quantity']) for event, data in events] == [('low_stock', 'MET-01', 5)]
@@ -0,0 +1,58 @@
+import sys
+import os
+import pytest
+
+# Add the src directory to sys.path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from utils import rate_limiter
+from utils.rate_limiter import RateLimiter, MemoryBackend, RedisBackend, make_backend
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(rate_limiter.time, 'monotonic', fake)
+    monkeypatch.setattr(rate_limiter.time, 'time', fake)
+    return fake
+
+def test_memory_backend_limits_and_refills(clock):
+    limiter = RateLimiter(calls=3, period=60)
+    assert [limiter.is_allowed('1.2.3.4') for _ in range(4)] == [True, True, True, False]
+    clock.now += 20
+    assert limiter.is_allowed('1.2.3.4')
+    assert not limiter.is_allowed('1.2.3.4')
+    assert limiter.is_allowed('5.6.7.8')
+
+def test_memory_backend_evicts_idle_and_excess_clients(clock):
+    backend = MemoryBackend(max_clients=2)
+    limiter = RateLimiter(calls=1, period=10, backend=backend)
+    for client in ('a', 'b', 'c'):
+        limiter.is_allowed(client)
+    assert list(backend.buckets) == ['b', 'c']
+    clock.now += 11
+    limiter.is_allowed('d')
+    assert list(backend.buckets) == ['d']
+
+def test_redis_backend_shares_window_between_limiters(clock):
+    fakeredis = pytest.importorskip('fakeredis')
+    pytest.importorskip('lupa')
+    client = fakeredis.FakeRedis()
+    first = RateLimiter(calls=2, period=60, backend=RedisBackend(client=client))
+    second = RateLimiter(calls=2, period=60, backend=RedisBackend(client=client))
+    assert first.is_allowed('1.2.3.4')
+    assert second.is_allowed('1.2.3.4')
+    assert not first.is_allowed('1.2.3.4')
+    clock.now += 61
+    assert second.is_allowed('1.2.3.4')
+
+def test_make_backend_from_config():
+    assert isinstance(make_backend({}), MemoryBackend)
+    with pytest.raises(ValueError):
+        make_backend({'RATELIMIT_BACKEND': 'bogus'})
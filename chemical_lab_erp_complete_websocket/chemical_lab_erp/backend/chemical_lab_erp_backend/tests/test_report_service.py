@@ -0,0 +1,102 @@
+import sys
+import os
+from datetime import datetime
+
+# Add the src directory to sys.path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+import pytest
+from main import app, db, celery
+from models.order import Order
+from models.product import Product
+from models.supplier import Supplier
+from models.user import User
+from services.product_service import ProductService
+from services.report_service import ReportService, SUCCEEDED, FAILED
+
+@pytest.fixture(scope='module')
+def test_client():
+    app.config['TESTING'] = True
+    # Report tasks run in-process instead of through the broker
+    celery.conf.task_always_eager = True
+    with app.test_client() as testing_client:
+        with app.app_context():
+            db.create_all()
+            acme = Supplier(name='Acme', code='RPT001')
+            lab = Supplier(name='Lab Co', code='RPT002')
+            user = User(username='reporter', email='reporter@lab.com', full_name='Reporter', password_hash='x')
+            db.session.add_all([acme, lab, user])
+            db.session.commit()
+            products = [
+                Product(name='Ethanol', reference='RPT-1', category='Solvent', supplier_id=acme.id, unit_price=10.0, stock_quantity=5),
+                Product(name='Acetone', reference='RPT-2', category='Solvent', supplier_id=lab.id, unit_price=4.0, stock_quantity=10),
+                Product(name='NaCl', reference='RPT-3', category='Salt', supplier_id=lab.id, unit_price=2.0, stock_quantity=3),
+                Product(name='Unpriced', reference='RPT-4', category='Salt', supplier_id=acme.id),
+            ]
+            db.session.add_all(products)
+            db.session.commit()
+            db.session.add_all([
+                Order(user_id=user.id, product_id=products[0].id, quantity=2, order_date=datetime(2024, 3, 1, 9)),
+                Order(user_id=user.id, product_id=products[0].id, quantity=3, order_date=datetime(2024, 3, 2, 9)),
+                Order(user_id=user.id, product_id=products[2].id, quantity=7, order_date=datetime(2024, 3, 2, 10)),
+                Order(user_id=user.id, product_id=products[1].id, quantity=50, order_date=datetime(2024, 3, 2, 11), status='cancelled'),
+                Order(user_id=user.id, product_id=products[1].id, quantity=9, order_date=datetime(2024, 4, 1)),
+            ])
+            db.session.commit()
+            yield testing_client
+            db.drop_all()
+    celery.conf.task_always_eager = app.config.get('TASKS_ALWAYS_EAGER', False)
+
+def test_inventory_valuation(test_client):
+    report = ReportService.inventory_valuation()
+    assert report['total'] == {'products': 4, 'value': 96.0}
+    by_category = {row['category']: row for row in report['by_category']}
+    assert by_category['Solvent']['value'] == 90.0 and by_category['Solvent']['products'] == 2
+    assert by_category['Salt']['value'] == 6.0 and by_category['Salt']['products'] == 2
+    assert [(row['supplier'], row['value']) for row in report['by_supplier']] == [('Acme', 50.0), ('Lab Co', 46.0)]
+
+def test_order_consumption_window_excludes_cancelled(test_client):
+    report = ReportService.order_consumption(datetime(2024, 3, 1), datetime(2024, 4, 1))
+    assert [(row['name'], row['quantity']) for row in report['by_product']] == [('NaCl', 7), ('Ethanol', 5)]
+    assert [(row['day'], row['orders'], row['quantity']) for row in report['by_day']] == [('2024-03-01', 1, 2), ('2024-03-02', 2, 10)]
+    assert {row['category']: row['value'] for row in report['by_category']} == {'Salt': 14.0, 'Solvent': 50.0}
+
+def test_report_job_runs_and_is_reused_until_data_changes(test_client):
+    response = test_client.post('/api/reports/inventory_valuation')
+    # Celery runs eagerly here, so the job is already done
+    assert response.status_code == 200
+    job = response.get_json()
+    assert job['status'] == SUCCEEDED and job['result']['total']['value'] == 96.0
+
+    polled = test_client.get(job['status_url'])
+    assert polled.status_code == 200 and polled.get_json()['result'] == job['result']
+    assert test_client.post('/api/reports/inventory_valuation').get_json()['id'] == job['id']
+
+    ProductService.update_product(1, stock_quantity=6)
+    fresh = test_client.post('/api/reports/inventory_valuation').get_json()
+    assert fresh['id'] != job['id'] and fresh['result']['total']['value'] == 106.0
+
+def test_consumption_job_is_keyed_by_params(test_client):
+    march = {'start': '2024-03-01', 'end': '2024-04-01'}
+    first = test_client.post('/api/reports/order_consumption', json=march).get_json()
+    assert [row['category'] for row in first['result']['by_category']] == ['Salt', 'Solvent']
+    assert test_client.post('/api/reports/order_consumption', json=march).get_json()['id'] == first['id']
+    april = test_client.post('/api/reports/order_consumption', json={'start': '2024-04-01', 'end': '2024-05-01'}).get_json()
+    assert april['id'] != first['id'] and april['result']['by_product'][0]['quantity'] == 9
+
+def test_report_errors(test_client):
+    assert test_client.post('/api/reports/nope').status_code == 400
+    assert test_client.post('/api/reports/order_consumption', json={'start': 'yesterday', 'end': '2024-05-01'}).status_code == 400
+    assert test_client.post('/api/reports/order_consumption', json={'start': '2024-05-01', 'end': '2024-04-01'}).status_code == 400
+    assert test_client.get('/api/reports/jobs/missing').status_code == 404
+
+def test_failed_job_is_polled_as_a_normal_response(test_client, monkeypatch):
+    tables, parse_params, _ = ReportService.REPORTS['order_consumption']
+    def run(params):
+        raise RuntimeError('canceling statement due to statement timeout')
+    monkeypatch.setitem(ReportService.REPORTS, 'order_consumption', (tables, parse_params, run))
+    job = test_client.post('/api/reports/order_consumption', json={'start': '2023-01-01', 'end': '2023-02-01'}).get_json()
+    polled = test_client.get(job['status_url'])
+    assert polled.status_code == 200
+    body = polled.get_json()
+    assert body['status'] == FAILED and 'statement timeout' in body['error'] and 'result' not in body
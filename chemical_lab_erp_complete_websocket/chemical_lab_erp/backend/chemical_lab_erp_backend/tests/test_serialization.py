@@ -0,0 +1,40 @@
+import sys
+import os
+from datetime import datetime
+
+# Add the src directory to sys.path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from flask import jsonify
+from main import app
+from models.chat_message import ChatMessage
+from models.product import Product
+from models.user import User
+from utils.serialization import dumps, loads, model_serializer
+
+def test_generated_serializer_matches_columns():
+    created = datetime(2024, 5, 1, 12, 30, 15, 250000)
+    product = Product(id=7, name='Acetone', reference='ACE-1', supplier_id=3, stock_quantity=2.5,
+                      created_at=created, updated_at=None)
+    data = product.to_dict()
+    assert list(data) == [column.key for column in Product.__table__.columns]
+    assert data['created_at'] == '2024-05-01T12:30:15.250000'
+    assert data['updated_at'] is None
+    assert data['stock_quantity'] == 2.5
+    # Attributes missing from the instance state take the attribute-access path
+    assert Product(id=8).to_dict()['name'] is None
+
+def test_excluded_columns_are_not_serialized():
+    user = User(id=1, username='alice', email='a@example.com', full_name='Alice', password_hash='secret')
+    assert 'password_hash' not in user.to_dict()
+    assert model_serializer(User).fields[-1] == 'is_online'
+
+def test_json_provider_round_trip():
+    message = ChatMessage(id=2 ** 52 + 1, user_id=1, room='général', message='¡hola!',
+                          timestamp=datetime(2024, 1, 1))
+    payload = {'message': message.to_dict(), 'at': datetime(2024, 1, 2, 3, 4, 5)}
+    assert loads(dumps(payload)) == {'message': message.to_dict(), 'at': '2024-01-02T03:04:05'}
+    with app.test_request_context():
+        response = jsonify(payload)
+    assert response.mimetype == 'application/json'
+    assert response.get_json()['message']['id'] == 2 ** 52 + 1
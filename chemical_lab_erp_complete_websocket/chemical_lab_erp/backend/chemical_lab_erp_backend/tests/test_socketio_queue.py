@@ -0,0 +1,52 @@
+import sys
+import os
+import time
+
+# Add the src directory to sys.path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+import socketio
+from utils.socketio_queue import LocalManager, make_client_manager
+
+def make_worker(channel):
+    server = socketio.Server(client_manager=LocalManager(channel=channel), async_mode='threading')
+    sent = []
+    server._send_packet = lambda eio_sid, pkt: sent.append((eio_sid, pkt.encode()))
+    server._send_eio_packet = lambda eio_sid, pkt: sent.append((eio_sid, pkt.data))
+    server.manager.initialize()
+    return server, sent
+
+def wait_for(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return predicate()
+
+def test_room_emit_reaches_clients_on_other_workers():
+    first, first_sent = make_worker('test-fanout')
+    second, second_sent = make_worker('test-fanout')
+    sid = first.manager.connect('eio-1', '/')
+    first.manager.enter_room(sid, '/', 'general')
+
+    second.emit('receive_message', {'message': 'hello'}, room='general')
+
+    assert wait_for(lambda: first_sent)
+    eio_sid, packet = first_sent[0]
+    assert eio_sid == 'eio-1'
+    assert 'hello' in packet
+    assert second_sent == []
+
+def test_channels_are_isolated():
+    first, first_sent = make_worker('test-channel-a')
+    second, _ = make_worker('test-channel-b')
+    sid = first.manager.connect('eio-1', '/')
+    first.manager.enter_room(sid, '/', 'general')
+    second.emit('receive_message', {'message': 'hello'}, room='general')
+    assert not wait_for(lambda: first_sent, timeout=0.2)
+
+def test_make_client_manager():
+    assert make_client_manager(None) is None
+    assert isinstance(make_client_manager('local://'), LocalManager)
+    assert isinstance(make_client_manager('redis://localhost:6379/1'), socketio.RedisManager)
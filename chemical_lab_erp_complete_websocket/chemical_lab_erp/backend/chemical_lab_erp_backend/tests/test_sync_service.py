@@ -0,0 +1,70 @@
+import sys
+import os
+from datetime import datetime, timedelta
+
+# Add the src directory to sys.path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+import pytest
+from main import app, db
+from models.product import Product
+from models.supplier import Supplier
+from services.product_service import ProductService
+from services.supplier_service import SupplierService
+from services.sync_service import SyncService, SyncTokenExpired
+
+@pytest.fixture(scope='module')
+def test_client():
+    app.config['TESTING'] = True
+    with app.test_client() as testing_client:
+        with app.app_context():
+            db.create_all()
+            yield testing_client
+            db.drop_all()
+
+@pytest.fixture
+def no_safety_window(monkeypatch):
+    # Rows written a moment ago are otherwise held back until the next sync
+    monkeypatch.setattr(SyncService, 'SAFETY_WINDOW', timedelta(0))
+
+def test_sync_returns_changes_and_tombstones(test_client, no_safety_window):
+    supplier = Supplier(name='Sync Supplier', code='SYNC001')
+    other = Supplier(name='Doomed Supplier', code='SYNC002')
+    db.session.add_all([supplier, other])
+    db.session.commit()
+    db.session.add_all([Product(name=f'Sync {i}', reference=f'SYNC-{i}', supplier_id=supplier.id) for i in range(5)]
+                       + [Product(name='Orphan', reference='SYNC-ORPHAN', supplier_id=other.id)])
+    db.session.commit()
+
+    full = SyncService.changes_since(None)
+    assert len(full['products']) == 6 and len(full['suppliers']) == 2
+    assert full['has_more'] is False
+
+    empty = SyncService.changes_since(full['next'])
+    assert empty['products'] == [] and empty['deleted'] == {'products': [], 'suppliers': [], 'orders': []}
+
+    ProductService.update_product(1, name='Renamed')
+    ProductService.delete_product(2)
+    SupplierService.delete_supplier(other.id)
+    delta = SyncService.changes_since(empty['next'])
+    assert [p['name'] for p in delta['products']] == ['Renamed']
+    assert sorted(delta['deleted']['products']) == [2, 6]
+    assert delta['deleted']['suppliers'] == [other.id]
+
+def test_sync_pages_with_limit(test_client, no_safety_window):
+    token, seen = None, []
+    while True:
+        page = SyncService.changes_since(token, limit=2)
+        seen.extend(p['id'] for p in page['products'])
+        token = page['next']
+        if not page['has_more']:
+            break
+    assert sorted(seen) == sorted(set(seen)) == [1, 3, 4, 5]
+
+def test_sync_endpoint_errors(test_client):
+    assert test_client.get('/api/sync?since=not-a-token').status_code == 400
+    token = SyncService.changes_since(None, now=datetime.utcnow() - timedelta(days=60))['next']
+    with pytest.raises(SyncTokenExpired):
+        SyncService.changes_since(token)
+    assert test_client.get(f'/api/sync?since={token}').status_code == 410
+    assert test_client.get('/api/sync').status_code == 200
@@ -0,0 +1,41 @@
+import sys
+import os
+
+# Add the src directory to sys.path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from utils.typing_tracker import TypingTracker
+
+def test_repeated_keystrokes_produce_one_snapshot():
+    tracker = TypingTracker(ttl=5)
+    for i in range(20):
+        tracker.update('general', 'alice', True, now=i * 0.1)
+    tracker.update('general', 'bob', True, now=1.0)
+    assert tracker.collect(now=1.5) == [('general', ['alice', 'bob'])]
+    tracker.update('general', 'alice', True, now=1.6)
+    assert tracker.collect(now=2.0) == []
+
+def test_stop_and_expiry_mark_room_dirty():
+    tracker = TypingTracker(ttl=5)
+    tracker.update('general', 'alice', True, now=0)
+    tracker.update('lab', 'bob', True, now=0)
+    tracker.collect(now=0.5)
+    tracker.update('general', 'alice', False, now=1)
+    assert tracker.collect(now=1.5) == [('general', [])]
+    assert tracker.collect(now=5.5) == [('lab', [])]
+    assert tracker.rooms == {}
+
+def test_redundant_stop_is_dropped():
+    tracker = TypingTracker(ttl=5)
+    assert not tracker.update('general', 'alice', False, now=0)
+    assert tracker.collect(now=1) == []
+
+def test_refresh_resends_active_rooms():
+    tracker = TypingTracker(ttl=5)
+    tracker.update('general', 'alice', True, now=0)
+    tracker.collect(now=0.5)
+    assert tracker.collect(now=1.0) == []
+    assert tracker.collect(now=1.5, refresh=True) == [('general', ['alice'])]
+    tracker.update('general', 'alice', False, now=2)
+    assert tracker.collect(now=2.5, refresh=True) == [('general', [])]
+    assert tracker.collect(now=3.0, refresh=True) == []
@@ -11,7 +11,8 @@ export default function Chat({ user, demoMode }) {
   const [messages, setMessages] = useState([])
   const [onlineUsers, setOnlineUsers] = useState([])
   const [isConnected, setIsConnected] = useState(false)
-  const [isTyping, setIsTyping] = useState({})
+  // Latest typing snapshot per server source: { [source]: { users, expiresAt } }
+  const [typingSnapshots, setTypingSnapshots] = useState({})
   const [loading, setLoading] = useState(true)
   const messagesEndRef = useRef(null)
   const typingTimeoutRef = useRef(null)
@@ -35,6 +36,18 @@ export default function Chat({ user, demoMode }) {
     scrollToBottom()
   }, [messages])
 
+  useEffect(() => {
+    // Drop snapshots from sources that stopped refreshing them (e.g. a worker that died)
+    const timer = setInterval(() => {
+      setTypingSnapshots(prev => {
+        const now = Date.now()
+        const live = Object.entries(prev).filter(([, snapshot]) => snapshot.expiresAt > now)
+        return live.length === Object.keys(prev).length ? prev : Object.fromEntries(live)
+      })
+    }, 1000)
+    return () => clearInterval(timer)
+  }, [])
+
   const loadInitialData = async () => {
     try {
       setLoading(true)
@@ -90,22 +103,15 @@ export default function Chat({ user, demoMode }) {
         setMessages(prev => [...prev, messageData])
       })
 
-      socket.on('user_typing', (data) => {
-        if (data.username !== user.username) {
-          setIsTyping(prev => ({
-            ...prev,
-            [data.username]: data.is_typing
-          }))
-          
-          if (data.is_typing) {
-            setTimeout(() => {
-              setIsTyping(prev => ({
-                ...prev,
-                [data.username]: false
-              }))
-            }, 3000)
+      socket.on('typing_snapshot', (data) => {
+        if (data.room !== 'general') return
+        setTypingSnapshots(prev => ({
+          ...prev,
+          [data.source]: {
+            users: data.users || [],
+            expiresAt: Date.now() + (data.expires_ms || 6000)
           }
-        }
+        }))
       })
 
       socket.on('status', (data) => {
@@ -178,9 +184,13 @@ export default function Chat({ user, demoMode }) {
   }
 
   const getTypingUsers = () => {
-    return Object.entries(isTyping)
-      .filter(([username, typing]) => typing && username !== user.username)
-      .map(([username]) => username)
+    // Each worker only reports its own clients, so the room's typers are the union over sources
+    const typers = new Set()
+    Object.values(typingSnapshots).forEach(snapshot => {
+      snapshot.users.forEach(username => typers.add(username))
+    })
+    typers.delete(user.username)
+    return [...typers]
   }
 
   if (loading) {
@@ -15,6 +15,8 @@ let socket = null
 export const initializeSocket = (user) => {
   if (!socket) {
     socket = io(SOCKET_URL, {
+      // The server takes the user's identity (and presence) from this token, not from event payloads
+      auth: (cb) => cb({ token: getToken() }),
       transports: ['websocket', 'polling'],
       timeout: 20000,
       forceNew: true